@@ -13,24 +13,27 @@ class DebugSocialAccountAdapter(DefaultSocialAccountAdapter):
 
     def pre_social_login(self, request, sociallogin):
         # log pre-login state
-        try:
-            logger.debug('adapter.pre_social_login: request.session=%s user=%s sociallogin=%s',
-                         getattr(getattr(request, 'session', None), 'session_key', None),
-                         getattr(getattr(request, 'user', None), 'is_authenticated', None),
-                         f'provider={getattr(sociallogin.provider, "id", None)} account={getattr(getattr(sociallogin.account, "extra_data", {}), "get", lambda k, d=None: d) }')
-        except Exception:
-            logger.exception('error logging pre_social_login')
+        if logger.isEnabledFor(logging.DEBUG):
+            try:
+                logger.debug('adapter.pre_social_login: request.session=%s user=%s provider=%s account=%s',
+                             getattr(getattr(request, 'session', None), 'session_key', None),
+                             getattr(getattr(request, 'user', None), 'is_authenticated', None),
+                             getattr(sociallogin.provider, 'id', None),
+                             getattr(sociallogin.account, 'extra_data', None))
+            except Exception:
+                logger.exception('error logging pre_social_login')
         return super().pre_social_login(request, sociallogin)
 
     def save_user(self, request, sociallogin, form=None):
         # log save_user state
-        try:
-            logger.debug('adapter.save_user: session=%s sociallogin.has_account=%s sociallogin.user=%s',
-                         getattr(getattr(request, 'session', None), 'session_key', None),
-                         bool(getattr(sociallogin, 'account', None)),
-                         getattr(getattr(sociallogin, 'user', None), 'email', None))
-        except Exception:
-            logger.exception('error logging save_user')
+        if logger.isEnabledFor(logging.DEBUG):
+            try:
+                logger.debug('adapter.save_user: session=%s sociallogin.has_account=%s sociallogin.user=%s',
+                             getattr(getattr(request, 'session', None), 'session_key', None),
+                             bool(getattr(sociallogin, 'account', None)),
+                             getattr(getattr(sociallogin, 'user', None), 'email', None))
+            except Exception:
+                logger.exception('error logging save_user')
         return super().save_user(request, sociallogin, form)
 
     def populate_user(self, request, sociallogin, data):
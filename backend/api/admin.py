@@ -1,5 +1,13 @@
 from django.contrib import admin
-from .models import PlayerData
+from .models import PlayerData, PredictionRecord
 
 admin.site.register(PlayerData)
 
+
+@admin.register(PredictionRecord)
+class PredictionRecordAdmin(admin.ModelAdmin):
+    list_display = ('created_at', 'player', 'risk_level', 'risk_score', 'model_version')
+    list_filter = ('risk_level',)
+    raw_id_fields = ('player',)
+    # COUNT(*) over the whole history table is slow once it grows large
+    show_full_result_count = False
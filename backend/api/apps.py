@@ -1,4 +1,9 @@
+import logging
+
 from django.apps import AppConfig
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
 
 
 class ApiConfig(AppConfig):
@@ -12,3 +17,34 @@ class ApiConfig(AppConfig):
         except Exception:
             pass
 
+
+def warm_up_model():
+    """Load the model once per server process, before the first request.
+
+    Saves the first prediction request the unpickling and first-call setup.
+    Called from wsgi.py and asgi.py (runserver loads wsgi.py too), so
+    management commands such as migrate never load the model or start the
+    registry watcher. INJURY_MODEL_WARMUP=False turns it off.
+    """
+    if not getattr(settings, 'INJURY_MODEL_WARMUP', True):
+        return
+    try:
+        from .ml.injury_predictor import injury_predictor
+
+        injury_predictor.warm_up()
+    except Exception:
+        logger.exception('Model warm-up failed; it will be loaded on first request')
+
+
+def start_rescoring():
+    """Start the squad re-scoring scheduler (INJURY_RESCORE_INTERVAL) in one worker.
+
+    Like warm_up_model(), only server processes call this, so management
+    commands and the test runner never start background re-scoring.
+    """
+    try:
+        from .rescoring import start_rescore_scheduler
+
+        start_rescore_scheduler()
+    except Exception:
+        logger.exception('Could not start squad re-scoring')
@@ -0,0 +1,89 @@
+import hashlib
+from typing import Optional
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+
+# Entries: token digest -> (user_id, created), user id -> User instance.
+# Tokens point at users, so changing or deleting a user drops one entry.
+TOKEN_KEY_PREFIX = 'injury.auth.token:'
+USER_KEY_PREFIX = 'injury.auth.user:'
+
+
+def auth_cache_ttl() -> float:
+    return getattr(settings, 'INJURY_AUTH_CACHE_TTL', 0.0)
+
+
+def _cache():
+    return caches[getattr(settings, 'INJURY_AUTH_CACHE_ALIAS', 'default')]
+
+
+def _token_cache_key(key: str) -> str:
+    # Never use the credential itself as a cache key
+    return TOKEN_KEY_PREFIX + hashlib.sha256(key.encode()).hexdigest()
+
+
+def get_cached_user(user_id):
+    """User ``user_id`` from the auth cache, loading and caching it on a miss"""
+    if auth_cache_ttl() <= 0:
+        return get_user_model()._default_manager.filter(pk=user_id).first()
+    cache = _cache()
+    user = cache.get(f"{USER_KEY_PREFIX}{user_id}")
+    if user is None:
+        user = get_user_model()._default_manager.filter(pk=user_id).first()
+        if user is not None:
+            cache.set(f"{USER_KEY_PREFIX}{user_id}", user, auth_cache_ttl())
+    return user
+
+
+def invalidate_user(user_id):
+    _cache().delete(f"{USER_KEY_PREFIX}{user_id}")
+
+
+def invalidate_token(key: str):
+    _cache().delete(_token_cache_key(key))
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication that keeps valid tokens in the auth cache
+    A cache hit authenticates without a query; a miss runs the usual
+    token + user lookup and caches the result for INJURY_AUTH_CACHE_TTL
+    seconds. Deleted tokens and changed or deleted users are evicted by
+    the receivers in api.signals, for every worker since the cache is
+    shared (settings refuse a TTL without INJURY_AUTH_CACHE_LOCATION).
+    """
+
+    def authenticate_credentials(self, key):
+        if auth_cache_ttl() <= 0:
+            return super().authenticate_credentials(key)
+
+        model = self.get_model()
+        cache = _cache()
+        cached = cache.get(_token_cache_key(key))
+        if cached is None:
+            user, token = super().authenticate_credentials(key)
+            cache.set(_token_cache_key(key), (token.user_id, token.created), auth_cache_ttl())
+            cache.set(f"{USER_KEY_PREFIX}{user.pk}", user, auth_cache_ttl())
+            return user, token
+
+        user_id, created = cached
+        user = get_cached_user(user_id)
+        if user is None or not user.is_active:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+        token = model(key=key, user_id=user_id, created=created)
+        token.user = user
+        return user, token
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend whose per-request get_user() is served from the auth cache"""
+
+    def get_user(self, user_id) -> Optional[object]:
+        user = get_cached_user(user_id)
+        return user if user is not None and self.user_can_authenticate(user) else None
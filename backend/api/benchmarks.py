@@ -0,0 +1,296 @@
+import contextlib
+import fnmatch
+import io
+import itertools
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from .ml.injury_predictor import InjuryPredictor, injury_predictor
+from .ml.model_registry import ModelRegistry
+
+ML_DIR = Path(__file__).resolve().parent / 'ml'
+
+POSITIONS = ['goalkeeper', 'defender', 'midfielder', 'forward']
+WEATHER = ['normal', 'rain', 'wet', 'hot', 'extreme heat', 'sunny']
+
+
+def random_players(count: int, seed: int = 42, request_fields: bool = False) -> List[Dict]:
+    """Distinct player payloads (more than the prediction cache holds, so calls miss it)
+
+    ``request_fields`` uses the /api/predict/ request names (minutes_played,
+    previous_injuries) instead of the model payload names.
+    """
+    rng = np.random.default_rng(seed)
+    players = []
+    for _ in range(count):
+        matches = int(rng.integers(1, 41))
+        player = {
+            'age': int(rng.integers(17, 37)),
+            'position': str(rng.choice(POSITIONS)),
+            'matches_played': matches,
+            'total_minutes_played': float(rng.uniform(0, 90) * matches),
+            'fatigue_level': float(rng.random()),
+            'training_load': float(rng.random()),
+            'recovery_time': float(rng.choice([6, 12, 24, 36, 48, 72, 96])),
+            'fitness_score': float(rng.random()),
+            'previous_injuries_count': int(rng.integers(0, 7)),
+            'weather_condition': str(rng.choice(WEATHER)),
+        }
+        if request_fields:
+            player['minutes_played'] = player.pop('total_minutes_played')
+            player['previous_injuries'] = player.pop('previous_injuries_count')
+        players.append(player)
+    return players
+
+
+def _expect_ok(response):
+    # A failing endpoint would otherwise be timed as a (fast) success
+    if response.status_code != 200:
+        raise RuntimeError(f"Request failed with HTTP {response.status_code}: {response.content[:200]!r}")
+    return response
+
+
+class Benchmark:
+    """
+    One timed operation
+    ``setup`` is a context manager factory yielding the zero-argument
+    callable to time; whatever it builds (clients, temp registries) is torn
+    down when it exits. ``items`` is how many predictions/rows one call
+    handles, for per-item rates.
+    """
+
+    def __init__(self, name: str, group: str, setup: Callable, items: int = 1,
+                 min_rounds: int = 5, max_rounds: int = 10_000, min_time: float = 1.0):
+        self.name = name
+        self.group = group
+        self.setup = setup
+        self.items = items
+        self.min_rounds = min_rounds
+        self.max_rounds = max_rounds
+        self.min_time = min_time
+
+
+BENCHMARKS: List[Benchmark] = []
+
+
+def benchmark(name: str, group: str, **options):
+    def register(setup):
+        BENCHMARKS.append(Benchmark(name, group, contextlib.contextmanager(setup), **options))
+        return setup
+    return register
+
+
+@benchmark('prepare_features', 'features')
+def _prepare_features():
+    players = itertools.cycle(random_players(4096))
+    yield lambda: injury_predictor._prepare_features(next(players))
+
+
+@benchmark('predict_single', 'predict')
+def _predict_single():
+    players = itertools.cycle(random_players(4096))
+    yield lambda: injury_predictor.predict_risk(next(players), use_cache=False)
+
+
+@benchmark('predict_single_cached', 'predict')
+def _predict_single_cached():
+    player = random_players(1)[0]
+    injury_predictor.predict_risk(player)
+    yield lambda: injury_predictor.predict_risk(player)
+
+
+for _size in (64, 1000):
+    @benchmark(f'predict_batch_{_size}', 'predict', items=_size)
+    def _predict_batch(size=_size):
+        players = random_players(size)
+        yield lambda: injury_predictor.predict_risk_batch(players, use_cache=False)
+
+
+@benchmark('django_predict_view', 'http')
+def _django_predict_view():
+    from django.test import Client
+
+    from . import views
+
+    # Measure the request path, not the background history writer
+    history_writer, views.history_writer = views.history_writer, None
+    client = Client(HTTP_HOST='localhost')
+    players = itertools.cycle(random_players(4096, request_fields=True))
+    try:
+        yield lambda: _expect_ok(client.post('/api/predict/', next(players), content_type='application/json'))
+    finally:
+        views.history_writer = history_writer
+
+
+@benchmark('fastapi_predict', 'http')
+def _fastapi_predict():
+    from fastapi.testclient import TestClient
+
+    # main.py imports its siblings as top-level modules
+    if str(ML_DIR) not in sys.path:
+        sys.path.insert(0, str(ML_DIR))
+    import main
+
+    players = itertools.cycle(random_players(4096))
+    # httpx logs every request at INFO
+    httpx_logger = logging.getLogger('httpx')
+    level = httpx_logger.level
+    httpx_logger.setLevel(logging.WARNING)
+    try:
+        with TestClient(main.app) as client:
+            yield lambda: _expect_ok(client.post('/predict', json=next(players)))
+    finally:
+        httpx_logger.setLevel(level)
+
+
+for _size in (1_000, 10_000, 100_000):
+    @benchmark(f'generate_training_data_{_size // 1000}k', 'training', items=_size,
+               min_rounds=3, max_rounds=50)
+    def _generate(size=_size):
+        predictor = InjuryPredictor()
+        yield lambda: predictor.generate_training_data(size)
+
+
+@benchmark('train_1500', 'training', items=1500, min_rounds=3, max_rounds=10)
+def _train():
+    # Versions go to a throwaway registry, never the served one
+    predictor = InjuryPredictor()
+    registry_dir = tempfile.mkdtemp(prefix='injury-bench-')
+    predictor.registry = ModelRegistry(registry_dir)
+    try:
+        yield lambda: predictor.train(n_samples=1500)
+    finally:
+        shutil.rmtree(registry_dir, ignore_errors=True)
+
+
+@benchmark('load_model_cold', 'model', min_rounds=3, max_rounds=20)
+def _load_model():
+    yield lambda: InjuryPredictor().load_model()
+
+
+def select(patterns: Optional[List[str]] = None) -> List[Benchmark]:
+    """Benchmarks whose name or group matches any of the glob ``patterns``"""
+    if not patterns:
+        return list(BENCHMARKS)
+    return [case for case in BENCHMARKS
+            if any(fnmatch.fnmatch(case.name, pattern) or fnmatch.fnmatch(case.group, pattern)
+                   for pattern in patterns)]
+
+
+def run_benchmark(case: Benchmark, min_time: Optional[float] = None) -> Dict:
+    """Time ``case`` for at least min_rounds calls and min_time seconds"""
+    min_time = case.min_time if min_time is None else min_time
+    # Model loading and training print progress; keep the report readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        try:
+            with case.setup() as call:
+                call()  # warm-up
+                timings = []
+                deadline = time.perf_counter() + min_time
+                while len(timings) < case.max_rounds and (
+                        len(timings) < case.min_rounds or time.perf_counter() < deadline):
+                    started = time.perf_counter()
+                    call()
+                    timings.append(time.perf_counter() - started)
+        except ImportError as exc:
+            return {'group': case.group, 'skipped': str(exc)}
+
+    timings_ms = np.array(timings) * 1000.0
+    median = float(np.median(timings_ms))
+    return {
+        'group': case.group,
+        'rounds': len(timings),
+        'items': case.items,
+        'min_ms': float(timings_ms.min()),
+        'median_ms': median,
+        'mean_ms': float(timings_ms.mean()),
+        'p95_ms': float(np.percentile(timings_ms, 95)),
+        'stddev_ms': float(statistics.stdev(timings_ms)) if len(timings_ms) > 1 else 0.0,
+        'items_per_second': case.items * 1000.0 / median if median else 0.0,
+    }
+
+
+def environment() -> Dict:
+    """What the numbers depend on, stored with every result file"""
+    import sklearn
+
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=Path(__file__).parent,
+                                capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    status = injury_predictor.status()
+    return {
+        'timestamp': datetime.now().isoformat(),
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'sklearn': sklearn.__version__,
+        'model_version': injury_predictor.model_version,
+        'backend': status.get('backend'),
+        'artifact': status.get('artifact'),
+    }
+
+
+def run_suite(patterns: Optional[List[str]] = None, min_time: Optional[float] = None,
+              progress: Optional[Callable[[str, Dict], None]] = None) -> Dict:
+    injury_predictor._ensure_model()
+    results = {}
+    for case in select(patterns):
+        results[case.name] = run_benchmark(case, min_time)
+        if progress is not None:
+            progress(case.name, results[case.name])
+    return {'environment': environment(), 'benchmarks': results}
+
+
+def compare(current: Dict, baseline: Dict, threshold: float = 0.25) -> List[Dict]:
+    """Median change of every benchmark present in both result files
+
+    A benchmark regressed when its median is more than ``threshold``
+    (a fraction) slower than the baseline's.
+    """
+    rows = []
+    for name, result in current['benchmarks'].items():
+        previous = baseline.get('benchmarks', {}).get(name)
+        if previous is None or 'median_ms' not in previous or 'median_ms' not in result:
+            continue
+        change = result['median_ms'] / previous['median_ms'] - 1.0 if previous['median_ms'] else 0.0
+        if change > threshold:
+            verdict = 'regression'
+        elif change < -threshold:
+            verdict = 'improvement'
+        else:
+            verdict = 'ok'
+        rows.append({
+            'name': name,
+            'baseline_ms': previous['median_ms'],
+            'current_ms': result['median_ms'],
+            'change': change,
+            'verdict': verdict,
+        })
+    return rows
+
+
+def load_results(path) -> Dict:
+    with open(path) as fh:
+        return json.load(fh)
+
+
+def save_results(results: Dict, path):
+    with open(path, 'w') as fh:
+        json.dump(results, fh, indent=2)
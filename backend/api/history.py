@@ -0,0 +1,192 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections
+from django.utils import timezone
+
+from .ml.metrics import HISTORY_DROPPED, HISTORY_QUEUED, get_metrics
+
+logger = logging.getLogger(__name__)
+
+
+class PredictionHistoryWriter:
+    """
+    Buffers predictions and stores them with bulk_create off the request path
+    record() only appends to a bounded queue; a background thread flushes
+    every ``flush_interval`` seconds or once ``batch_size`` records are
+    waiting. When the queue is full records are dropped (and counted in
+    injury_prediction_history_dropped_total) rather than slowing down the
+    prediction; record_many() for batch requests first waits at most
+    ``max_wait_ms`` for the writer to make room.
+    """
+
+    def __init__(self, batch_size: int = 500, flush_interval: float = 1.0, max_queue: int = 10000,
+                 max_wait_ms: float = 5.0):
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stats_lock = threading.Lock()
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def start(self):
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='prediction-history', daemon=True)
+                self._thread.start()
+
+    def record(self, payload: Dict, prediction: Dict, player_id: Optional[int] = None):
+        """Queue one prediction for storage (never blocks)"""
+        if self._thread is None:
+            self.start()
+        try:
+            self._queue.put_nowait((timezone.now(), player_id, payload, prediction))
+        except queue.Full:
+            self._count_dropped(1)
+            return
+        if self._queue.qsize() >= self.batch_size:
+            self._wake.set()
+
+    def record_many(self, records: List[Tuple[Dict, Dict, Optional[int]]]) -> int:
+        """Queue (payload, prediction, player_id) records; returns how many were dropped
+
+        When the queue fills up the writer is woken and the caller waits at
+        most ``max_wait_ms`` in total for room, so a batch request is never
+        held up by the database; whatever still does not fit is dropped.
+        """
+        if self._thread is None:
+            self.start()
+        created_at = timezone.now()
+        deadline = time.monotonic() + self.max_wait
+        dropped = 0
+        for index, (payload, prediction, player_id) in enumerate(records):
+            item = (created_at, player_id, payload, prediction)
+            try:
+                self._queue.put_nowait(item)
+            except queue.Full:
+                self._wake.set()
+                try:
+                    self._queue.put(item, timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Full:
+                    dropped = len(records) - index
+                    break
+            if self._queue.qsize() >= self.batch_size:
+                self._wake.set()
+
+        if dropped:
+            self._count_dropped(dropped)
+            logger.warning('Prediction history queue is full: dropped %d of %d records '
+                           '(raise INJURY_HISTORY_QUEUE above the largest batch)', dropped, len(records))
+        return dropped
+
+    def _count_dropped(self, count: int):
+        with self._stats_lock:
+            self.dropped += count
+        get_metrics().inc(HISTORY_DROPPED, count)
+
+    def flush(self) -> int:
+        """Write everything queued so far; returns the number of rows stored"""
+        stored = 0
+        with self._flush_lock:
+            while True:
+                batch = self._drain()
+                if not batch:
+                    return stored
+                stored += self._write(batch)
+
+    def close(self):
+        """Flush what is left at shutdown"""
+        try:
+            self.flush()
+        except Exception:
+            logger.exception('Could not store buffered predictions at shutdown')
+
+    def stats(self) -> Dict:
+        with self._stats_lock:
+            return {
+                'queued': self._queue.qsize(),
+                'written': self.written,
+                'dropped': self.dropped,
+                'failed': self.failed,
+            }
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                close_old_connections()
+                self.flush()
+            except Exception:
+                logger.exception('Prediction history flush failed')
+            finally:
+                close_old_connections()
+                get_metrics().set(HISTORY_QUEUED, self._queue.qsize())
+
+    def _drain(self) -> List:
+        batch = []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch: List) -> int:
+        from .ml.injury_predictor import injury_predictor
+        from .models import PlayerData, PredictionRecord
+
+        # Feature vectors are rebuilt here, vectorized, instead of per request
+        features, _ = injury_predictor._prepare_features_batch([payload for _, _, payload, _ in batch])
+        records = [
+            PredictionRecord(
+                created_at=created_at,
+                player_id=player_id,
+                inputs=payload,
+                features=row.tolist(),
+                risk_score=prediction['risk_score'],
+                risk_level=prediction['risk_level'],
+                model_version=prediction.get('model_version') or '',
+            )
+            for (created_at, player_id, payload, prediction), row in zip(batch, features)
+        ]
+        try:
+            PredictionRecord.objects.bulk_create(records, batch_size=self.batch_size)
+        except IntegrityError:
+            # A record names a player that does not exist: keep the rest
+            player_ids = {record.player_id for record in records if record.player_id is not None}
+            known = set(PlayerData.objects.filter(pk__in=player_ids).values_list('pk', flat=True))
+            valid = [record for record in records if record.player_id is None or record.player_id in known]
+            with self._stats_lock:
+                self.failed += len(records) - len(valid)
+            PredictionRecord.objects.bulk_create(valid, batch_size=self.batch_size)
+            records = valid
+        with self._stats_lock:
+            self.written += len(records)
+        return len(records)
+
+
+def build_history_writer() -> Optional[PredictionHistoryWriter]:
+    """Writer configured from the INJURY_HISTORY_* settings, or None when disabled"""
+    if not getattr(settings, 'INJURY_HISTORY_ENABLED', True):
+        return None
+    writer = PredictionHistoryWriter(
+        batch_size=getattr(settings, 'INJURY_HISTORY_BATCH_SIZE', 500),
+        flush_interval=getattr(settings, 'INJURY_HISTORY_FLUSH_INTERVAL', 1.0),
+        max_queue=getattr(settings, 'INJURY_HISTORY_QUEUE', 50000),
+        max_wait_ms=getattr(settings, 'INJURY_HISTORY_MAX_WAIT_MS', 5.0),
+    )
+    # Do not lose the last buffered predictions on a clean shutdown
+    atexit.register(writer.close)
+    return writer
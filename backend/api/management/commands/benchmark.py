@@ -0,0 +1,73 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.benchmarks import compare, load_results, run_suite, save_results, select
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the prediction, HTTP, training and model-load hot paths and write the "
+        "results as JSON. With --compare, medians are checked against a stored "
+        "baseline and the command fails when any regressed by more than --threshold."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('patterns', nargs='*',
+                            help='Only run benchmarks whose name or group matches these globs '
+                                 '(e.g. predict_* http)')
+        parser.add_argument('--output', help='Write the results JSON to this file')
+        parser.add_argument('--compare', metavar='BASELINE', help='Results JSON to compare against')
+        parser.add_argument('--threshold', type=float, default=0.25,
+                            help='Median slowdown (fraction) that counts as a regression')
+        parser.add_argument('--min-time', type=float,
+                            help='Seconds to keep repeating each benchmark (default: per benchmark)')
+        parser.add_argument('--list', action='store_true', help='List the benchmarks and exit')
+
+    def handle(self, *args, **options):
+        cases = select(options['patterns'])
+        if not cases:
+            raise CommandError(f"No benchmark matches {' '.join(options['patterns'])}")
+        if options['list']:
+            for case in cases:
+                self.stdout.write(f"{case.name:<28} {case.group}")
+            return
+
+        baseline = load_results(options['compare']) if options['compare'] else None
+
+        self.stdout.write(f"{'benchmark':<28} {'median ms':>11} {'p95 ms':>11} {'items/s':>12} {'rounds':>7}")
+        results = run_suite(options['patterns'], options['min_time'], progress=self._report)
+
+        if options['output']:
+            save_results(results, options['output'])
+            self.stdout.write(f"Results written to {options['output']}")
+
+        if baseline is None:
+            return
+        for key in ('cpu_count', 'python', 'backend', 'artifact'):
+            if baseline.get('environment', {}).get(key) != results['environment'].get(key):
+                self.stdout.write(self.style.WARNING(
+                    f"Baseline {key} differs ({baseline['environment'].get(key)} vs "
+                    f"{results['environment'].get(key)}); timings may not be comparable"
+                ))
+        rows = compare(results, baseline, options['threshold'])
+        self.stdout.write(f"\n{'benchmark':<28} {'baseline ms':>12} {'current ms':>11} {'change':>8}")
+        for row in rows:
+            line = (f"{row['name']:<28} {row['baseline_ms']:>12.3f} {row['current_ms']:>11.3f} "
+                    f"{row['change']:>+8.1%}  {row['verdict']}")
+            if row['verdict'] == 'regression':
+                line = self.style.ERROR(line)
+            elif row['verdict'] == 'improvement':
+                line = self.style.SUCCESS(line)
+            self.stdout.write(line)
+
+        regressions = [row['name'] for row in rows if row['verdict'] == 'regression']
+        if regressions:
+            raise CommandError(f"{len(regressions)} benchmark(s) regressed by more than "
+                               f"{options['threshold']:.0%}: {', '.join(regressions)}")
+        self.stdout.write(self.style.SUCCESS(f"No regressions beyond {options['threshold']:.0%}"))
+
+    def _report(self, name, result):
+        if 'skipped' in result:
+            self.stdout.write(self.style.WARNING(f"{name:<28} skipped: {result['skipped']}"))
+            return
+        self.stdout.write(f"{name:<28} {result['median_ms']:>11.3f} {result['p95_ms']:>11.3f} "
+                          f"{result['items_per_second']:>12.0f} {result['rounds']:>7}")
@@ -0,0 +1,43 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.ml.compiled_forest import CompiledForest
+from api.ml.injury_predictor import WARMUP_PLAYER, injury_predictor
+
+
+class Command(BaseCommand):
+    help = (
+        "Convert the current model pickle into the memory-mapped forest artifact "
+        "used when INJURY_MODEL_ARTIFACT=mmap."
+    )
+
+    def add_arguments(self, parser):
+        model_path, artifact_path = injury_predictor.current_paths()
+        parser.add_argument('--model', default=str(model_path),
+                            help='Source joblib pickle (default: the current registry version, '
+                                 'else injury_model.pkl)')
+        parser.add_argument('--output', default=str(artifact_path),
+                            help='Artifact directory (default: next to the current pickle)')
+
+    def handle(self, *args, **options):
+        import joblib
+
+        model_path = Path(options['model'])
+        if not model_path.exists():
+            raise CommandError(f"Model file not found: {model_path}")
+
+        model = joblib.load(model_path)
+        output = CompiledForest.from_sklearn(model).save(options['output'])
+
+        # Round-trip through the memory-mapped loader and compare with sklearn
+        reloaded = CompiledForest.load(output, mmap=True)
+        features, _ = injury_predictor._prepare_features_batch([dict(WARMUP_PLAYER)])
+        difference = abs(reloaded.predict_proba(features)[0] - model.predict_proba(features)[0, 1])
+        if difference > 1e-9:
+            raise CommandError(f"Artifact at {output} failed verification (|diff|={difference:.2e})")
+
+        size = sum(path.stat().st_size for path in CompiledForest.current_dir(output).iterdir())
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {output} ({size / 1024:.0f} KiB): {reloaded.summary()}"
+        ))
@@ -0,0 +1,40 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.roster_io import RosterImporter, detect_format
+
+
+class Command(BaseCommand):
+    help = (
+        "Import players from a CSV or Parquet roster file, streamed in chunks. Needs "
+        "name, age and position columns; matches_played, minutes_played and "
+        "previous_injuries are optional. Invalid rows are skipped and reported."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', dest='file_format', choices=['csv', 'parquet'],
+                            help='File format (default: from the file extension)')
+        parser.add_argument('--chunk-rows', type=int,
+                            help='Rows parsed and inserted per transaction '
+                                 '(default: INJURY_ROSTER_IMPORT_CHUNK_ROWS)')
+        parser.add_argument('--max-errors', type=int, default=20,
+                            help='Rejected rows to list')
+
+    def handle(self, *args, **options):
+        importer = RosterImporter(
+            chunk_rows=options['chunk_rows'] or getattr(settings, 'INJURY_ROSTER_IMPORT_CHUNK_ROWS', 50000),
+            max_errors=options['max_errors'],
+        )
+        try:
+            file_format = detect_format(options['path'], options['file_format'])
+            result = importer.run(options['path'], file_format)
+        except (ValueError, ImportError, OSError) as exc:
+            raise CommandError(str(exc))
+
+        for error in result['errors']:
+            self.stdout.write(self.style.WARNING(f"  row {error['row']}: {error['error']}"))
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {result['imported']} players in {result['chunks']} chunks "
+            f"({result['rows_per_second']:.0f} rows/s), rejected {result['rejected']}"
+        ))
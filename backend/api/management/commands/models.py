@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.ml.injury_predictor import injury_predictor
+
+
+class Command(BaseCommand):
+    help = (
+        "Inspect and manage the model registry: list versions, show metadata, "
+        "promote a version to current (serving workers hot-swap to it) or prune old ones."
+    )
+
+    def add_arguments(self, parser):
+        subcommands = parser.add_subparsers(dest='action', required=True)
+        subcommands.add_parser('list', help='List registered versions')
+        show = subcommands.add_parser('show', help='Print the metadata of a version')
+        show.add_argument('version', nargs='?', help='Version id (default: current)')
+        promote = subcommands.add_parser('promote', help='Make a version current')
+        promote.add_argument('version')
+        prune = subcommands.add_parser('prune', help='Delete old versions')
+        prune.add_argument('--keep', type=int, default=5,
+                           help='Versions to keep besides the current one')
+
+    def handle(self, *args, **options):
+        registry = injury_predictor.registry
+        current = registry.current_version()
+        action = options['action']
+
+        if action == 'list':
+            versions = registry.versions()
+            if not versions:
+                self.stdout.write(f"No versions in {registry.root} (serving {injury_predictor.model_path.name})")
+            for metadata in versions:
+                marker = '*' if metadata['version'] == current else ' '
+                accuracy = metadata.get('accuracy')
+                self.stdout.write(
+                    f"{marker} {metadata['version']}  {metadata.get('created_at', '')[:19]}  "
+                    f"accuracy={'n/a' if accuracy is None else f'{accuracy:.3f}'}  "
+                    f"trainer={metadata.get('trainer', '?')}"
+                )
+        elif action == 'show':
+            import json
+
+            version = options['version'] or current
+            if version is None:
+                raise CommandError("No current version; pass a version id")
+            try:
+                self.stdout.write(json.dumps(registry.metadata(version), indent=2))
+            except OSError:
+                raise CommandError(f"Unknown model version '{version}'")
+        elif action == 'promote':
+            try:
+                registry.promote(options['version'])
+            except ValueError as exc:
+                raise CommandError(str(exc))
+            self.stdout.write(self.style.SUCCESS(
+                f"Promoted {options['version']}; serving workers switch to it within "
+                f"INJURY_MODEL_RELOAD_INTERVAL seconds"
+            ))
+        elif action == 'prune':
+            removed = registry.prune(keep=options['keep'])
+            self.stdout.write(f"Removed {len(removed)} version(s): {', '.join(removed) or '-'}")
@@ -0,0 +1,51 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api.rescoring import RescoreScheduler, SquadRescorer
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-score players whose inputs changed since their last score (or that were "
+        "scored by another model version) and store the risk on PlayerData. Run it "
+        "nightly and after match data is loaded, or keep it running with --every."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Re-score every player, changed or not')
+        parser.add_argument('--chunk-size', type=int,
+                            help='Players read, scored and written per batch '
+                                 '(default: INJURY_RESCORE_CHUNK_SIZE)')
+        parser.add_argument('--every', type=float, metavar='SECONDS',
+                            help='Keep running and re-score every SECONDS')
+
+    def handle(self, *args, **options):
+        rescorer = SquadRescorer(
+            chunk_size=options['chunk_size'] or getattr(settings, 'INJURY_RESCORE_CHUNK_SIZE', 5000)
+        )
+        if not options['every']:
+            self._report(rescorer.run(full=options['all']))
+            return
+
+        if options['all']:
+            self._report(rescorer.run(full=True))
+            time.sleep(options['every'])
+        scheduler = RescoreScheduler(rescorer, options['every'])
+        self.stdout.write(f"Re-scoring changed players every {options['every']:g}s (Ctrl+C to stop)")
+        try:
+            while True:
+                result = scheduler.run_once()
+                if result is not None:
+                    self._report(result)
+                time.sleep(options['every'])
+        except KeyboardInterrupt:
+            pass
+
+    def _report(self, result):
+        self.stdout.write(self.style.SUCCESS(
+            f"Re-scored {result['rescored']} of {result['players']} players "
+            f"({result['skipped_unchanged']} unchanged) in {result['seconds']:.2f}s, "
+            f"{result['players_per_second']:.0f} players/s, model {result['model_version']}"
+        ))
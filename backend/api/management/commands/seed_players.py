@@ -0,0 +1,44 @@
+import random
+
+from django.core.management.base import BaseCommand
+
+from api.models import PlayerData
+
+POSITIONS = ['Goalkeeper', 'Defender', 'Midfielder', 'Forward']
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-create synthetic roster rows (benchmark fixture for the cursor-paginated "
+        "/api/players/ endpoint, see scripts/bench_roster_pages.py)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=1_000_000)
+        parser.add_argument('--batch-size', type=int, default=10_000)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--clear', action='store_true',
+                            help='Delete existing players (and their predictions) first')
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            PlayerData.objects.all().delete()
+
+        rng = random.Random(options['seed'])
+        created = 0
+        while created < options['count']:
+            size = min(options['batch_size'], options['count'] - created)
+            PlayerData.objects.bulk_create([
+                PlayerData(
+                    name=f"Player {created + index:07d}",
+                    age=rng.randint(17, 38),
+                    position=rng.choice(POSITIONS),
+                    matches_played=rng.randint(0, 40),
+                    minutes_played=rng.randint(0, 3600),
+                    previous_injuries=rng.randint(0, 6),
+                )
+                for index in range(size)
+            ], batch_size=size)
+            created += size
+            self.stdout.write(f"  {created}/{options['count']} players")
+        self.stdout.write(self.style.SUCCESS(f"Created {created} players"))
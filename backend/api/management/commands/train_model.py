@@ -0,0 +1,67 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.ml.data_sources import build_chunk_source, rows_for_memory_budget
+from api.ml.injury_predictor import injury_predictor
+
+
+class Command(BaseCommand):
+    help = (
+        "Train the injury model and register it as a new model version. Without --source "
+        "the synthetic dataset is trained in memory; with --source the data is "
+        "streamed in chunks sized to --memory-budget-mb."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--source', choices=['synthetic', 'csv', 'parquet'],
+                            help='Stream training data from this source instead of training in memory')
+        parser.add_argument('--path', nargs='+', default=[],
+                            help='CSV/Parquet file(s) with the model feature columns and injury_occurred')
+        parser.add_argument('--samples', type=int, default=1_000_000,
+                            help='Rows to generate for --source synthetic')
+        parser.add_argument('--memory-budget-mb', type=float, default=256,
+                            help='Approximate memory for one chunk; sets the chunk size')
+        parser.add_argument('--chunk-rows', type=int,
+                            help='Explicit rows per chunk (overrides --memory-budget-mb)')
+        parser.add_argument('--trees-per-chunk', type=int, default=10)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--n-jobs', type=int,
+                            help='Cores used to fit trees (default: INJURY_MODEL_TRAIN_N_JOBS, -1 = all)')
+        parser.add_argument('--in-memory-samples', type=int, default=1500,
+                            help='Rows generated for in-memory training (no --source)')
+
+    def handle(self, *args, **options):
+        source_kind = options['source']
+        if source_kind is None:
+            result = injury_predictor.train(
+                n_samples=options['in_memory_samples'],
+                n_jobs=options['n_jobs'],
+                random_state=options['seed'],
+            )
+        else:
+            chunk_rows = options['chunk_rows'] or rows_for_memory_budget(options['memory_budget_mb'])
+            try:
+                source = build_chunk_source(
+                    source_kind,
+                    paths=options['path'],
+                    n_samples=options['samples'],
+                    chunk_rows=chunk_rows,
+                    seed=options['seed'],
+                )
+                self.stdout.write(f"Streaming {source_kind} data in chunks of {chunk_rows} rows")
+                result = injury_predictor.train_streaming(
+                    source,
+                    trees_per_chunk=options['trees_per_chunk'],
+                    seed=options['seed'],
+                    n_jobs=options['n_jobs'],
+                )
+            except (ValueError, ImportError, FileNotFoundError) as exc:
+                raise CommandError(str(exc))
+
+        accuracy = result['accuracy']
+        self.stdout.write(self.style.SUCCESS(
+            f"Trained model {result['model_version']} on {result['training_samples']} rows, "
+            f"evaluated on {result['test_samples']} rows"
+            + (f", accuracy {accuracy:.3f}" if accuracy is not None else "")
+        ))
+        for stage, seconds in result.get('timings', {}).items():
+            self.stdout.write(f"  {stage:<16} {seconds:8.3f}s")
@@ -0,0 +1,97 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.ml.data_sources import TARGET_COLUMN
+from api.ml.injury_predictor import FEATURE_NAMES, injury_predictor
+from api.ml.tuning import DEFAULT_PARAM_GRID
+
+
+def parse_value(raw: str):
+    """Parse a grid value: int, float, none/null, true/false or a plain string"""
+    lowered = raw.strip().lower()
+    if lowered in ('none', 'null'):
+        return None
+    if lowered in ('true', 'false'):
+        return lowered == 'true'
+    for cast in (int, float):
+        try:
+            return cast(raw)
+        except ValueError:
+            pass
+    return raw.strip()
+
+
+class Command(BaseCommand):
+    help = (
+        "Cross-validated hyperparameter search for the injury model. Fold results "
+        "are cached on disk, so re-running resumes where the last run stopped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--param', action='append', default=[], metavar='NAME=V1,V2',
+                            help='Grid values for one forest parameter (repeatable), '
+                                 'e.g. --param max_depth=6,10,none')
+        parser.add_argument('--n-iter', type=int,
+                            help='Random search: sample this many candidates instead of the full grid')
+        parser.add_argument('--cv', type=int, default=5)
+        parser.add_argument('--samples', type=int, default=1500,
+                            help='Synthetic rows to tune on (ignored with --path)')
+        parser.add_argument('--path', help='CSV file with the model feature columns and injury_occurred')
+        parser.add_argument('--n-jobs', type=int,
+                            help='Worker processes (default: INJURY_MODEL_TRAIN_N_JOBS, -1 = all cores)')
+        parser.add_argument('--cache-dir', help='Fold result cache directory')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--promote', action='store_true',
+                            help='Retrain with the best parameters and register the result as a new '
+                                 'model version (promoted to CURRENT unless INJURY_MODEL_AUTO_PROMOTE is off)')
+        parser.add_argument('--output', help='Write the full search result to this JSON file')
+
+    def handle(self, *args, **options):
+        param_grid = None
+        if options['param']:
+            param_grid = {}
+            for spec in options['param']:
+                name, sep, values = spec.partition('=')
+                if not sep or not values:
+                    raise CommandError(f"Invalid --param '{spec}', expected NAME=V1,V2")
+                param_grid[name.strip()] = [parse_value(value) for value in values.split(',')]
+
+        data = None
+        if options['path']:
+            import pandas as pd
+
+            frame = pd.read_csv(options['path'], usecols=FEATURE_NAMES + [TARGET_COLUMN])
+            data = (frame[FEATURE_NAMES], frame[TARGET_COLUMN])
+
+        try:
+            result = injury_predictor.tune(
+                param_grid=param_grid,
+                n_iter=options['n_iter'],
+                cv=options['cv'],
+                n_samples=options['samples'],
+                n_jobs=options['n_jobs'],
+                cache_dir=options['cache_dir'],
+                promote=options['promote'],
+                seed=options['seed'],
+                data=data,
+            )
+        except (TypeError, ValueError) as exc:
+            raise CommandError(str(exc))
+
+        for rank, candidate in enumerate(result['results'][:10], start=1):
+            tuned = {key: candidate['params'][key] for key in (param_grid or DEFAULT_PARAM_GRID)}
+            self.stdout.write(
+                f"{rank:>2}. {candidate['mean_accuracy']:.4f} ± {candidate['std_accuracy']:.4f}  {tuned}"
+            )
+        self.stdout.write(
+            f"{result['computed_folds']} folds fitted, {result['cached_folds']} from cache "
+            f"in {result['seconds']:.1f}s"
+        )
+        if options['promote']:
+            self.stdout.write(self.style.SUCCESS(
+                f"Registered best configuration as model {result['promoted']['model_version']}"
+            ))
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump(result, fh, indent=2, default=str)
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-18 13:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='playerdata',
+            index=models.Index(fields=['created_at', 'id'], name='player_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='playerdata',
+            index=models.Index(fields=['position', 'created_at', 'id'], name='player_position_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='playerdata',
+            index=models.Index(fields=['name'], name='player_name_idx'),
+        ),
+    ]
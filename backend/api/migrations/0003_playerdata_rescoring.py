@@ -0,0 +1,38 @@
+# Generated by Django 4.2.7 on 2026-10-18 13:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_playerdata_player_created_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='playerdata',
+            name='risk_level',
+            field=models.CharField(blank=True, max_length=10),
+        ),
+        migrations.AddField(
+            model_name='playerdata',
+            name='risk_model_version',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='playerdata',
+            name='risk_score',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='playerdata',
+            name='scored_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='playerdata',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-18 13:39
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    # PredictionRecord is created here rather than in 0001_initial, so
+    # databases that already have api_playerdata (created before the app
+    # had migrations) can run `migrate --fake-initial`
+    dependencies = [
+        ('api', '0003_playerdata_rescoring'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PredictionRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField()),
+                ('inputs', models.JSONField()),
+                ('features', models.JSONField()),
+                ('risk_score', models.FloatField()),
+                ('risk_level', models.CharField(max_length=10)),
+                ('model_version', models.CharField(max_length=64)),
+                ('player', models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='predictions', to='api.playerdata')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['player', 'created_at', 'id'], name='prediction_player_time_idx'), models.Index(fields=['created_at'], name='prediction_time_idx')],
+            },
+        ),
+    ]
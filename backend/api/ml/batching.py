@@ -0,0 +1,190 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Dict, List, Optional
+
+try:
+    from .injury_predictor import _get_setting, _to_bool, injury_predictor
+except ImportError:
+    # Imported as a top-level module (FastAPI app run from api/ml)
+    from injury_predictor import _get_setting, _to_bool, injury_predictor
+
+# Upper bounds of the batch-size histogram buckets
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+
+class BatcherFull(RuntimeError):
+    """Raised when the batching queue is at capacity"""
+
+
+class PredictionBatcher:
+    """
+    Coalesces concurrent single-player predictions into vectorized batches
+    Callers submit payloads from any thread; a background thread collects
+    requests for up to ``max_wait_ms`` (or until ``max_batch_size`` are
+    waiting), scores them with one predict_risk_batch call and resolves
+    each caller's future with its own result.
+    """
+
+    def __init__(self, predictor, max_batch_size: int = 64, max_wait_ms: float = 2.0,
+                 max_queue: int = 1024):
+        self.predictor = predictor
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stopping = False
+
+        # Metrics
+        self.batches = 0
+        self.items = 0
+        self.rejected = 0
+        self.errors = 0
+        self.size_histogram = {bucket: 0 for bucket in BATCH_SIZE_BUCKETS}
+        self.size_histogram['+Inf'] = 0
+        self.queue_delay_total = 0.0
+        self.queue_delay_max = 0.0
+        self.inference_seconds_total = 0.0
+
+    def start(self):
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping = False
+                self._thread = threading.Thread(target=self._run, name='prediction-batcher', daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stopping = True
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def submit(self, payload: Dict, explain: str = 'top3') -> Future:
+        """Queue one payload; the future resolves to its predict_risk-style dict"""
+        if self._thread is None:
+            self.start()
+        future = Future()
+        try:
+            self._queue.put_nowait((payload, explain, future, time.perf_counter()))
+        except queue.Full:
+            with self._stats_lock:
+                self.rejected += 1
+            raise BatcherFull("Prediction queue is full")
+        return future
+
+    def predict(self, payload: Dict, timeout: Optional[float] = None, explain: str = 'top3') -> Dict:
+        """Blocking convenience wrapper around submit()"""
+        future = self.submit(payload, explain)
+        try:
+            return future.result(timeout)
+        except FutureTimeoutError:
+            # Drop it if the worker has not picked it up yet
+            future.cancel()
+            raise
+
+    def _collect(self) -> List:
+        """Block for the first request, then gather more until the window closes"""
+        try:
+            batch = [self._queue.get(timeout=0.1)]
+        except queue.Empty:
+            return []
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not self._stopping:
+            batch = self._collect()
+            if not batch:
+                continue
+
+            # Callers that gave up (cancelled) are skipped
+            batch = [item for item in batch if item[2].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            started = time.perf_counter()
+            # One model call per explanation mode present in the batch
+            groups = {}
+            for item in batch:
+                groups.setdefault(item[1], []).append(item)
+            for explain, items in groups.items():
+                try:
+                    results = self.predictor.predict_risk_batch(
+                        [payload for payload, _, _, _ in items], use_cache=True, explain=explain
+                    )
+                except Exception as exc:
+                    if len(items) == 1:
+                        self._fail(items[0][2], exc)
+                    else:
+                        self._score_one_by_one(items, explain)
+                    continue
+                for (_, _, future, _), result in zip(items, results):
+                    future.set_result(result)
+            self._record(batch, started, time.perf_counter())
+
+    def _score_one_by_one(self, items: List, explain: str):
+        # A failed batch is retried per request so only the bad ones fail
+        for payload, _, future, _ in items:
+            try:
+                result = self.predictor.predict_risk_batch([payload], use_cache=True, explain=explain)[0]
+            except Exception as exc:
+                self._fail(future, exc)
+            else:
+                future.set_result(result)
+
+    def _fail(self, future: Future, exc: Exception):
+        with self._stats_lock:
+            self.errors += 1
+        future.set_exception(exc)
+
+    def _record(self, batch: List, started: float, finished: float):
+        size = len(batch)
+        bucket = next((bound for bound in BATCH_SIZE_BUCKETS if size <= bound), '+Inf')
+        delays = [started - enqueued_at for _, _, _, enqueued_at in batch]
+        with self._stats_lock:
+            self.batches += 1
+            self.items += size
+            self.size_histogram[bucket] += 1
+            self.queue_delay_total += sum(delays)
+            self.queue_delay_max = max(self.queue_delay_max, max(delays))
+            self.inference_seconds_total += finished - started
+
+    def stats(self) -> Dict:
+        with self._stats_lock:
+            return {
+                'max_batch_size': self.max_batch_size,
+                'max_wait_ms': self.max_wait * 1000.0,
+                'queued': self._queue.qsize(),
+                'batches': self.batches,
+                'items': self.items,
+                'mean_batch_size': self.items / self.batches if self.batches else 0.0,
+                'batch_size_histogram': {str(k): v for k, v in self.size_histogram.items()},
+                'mean_queue_delay_ms': 1000.0 * self.queue_delay_total / self.items if self.items else 0.0,
+                'max_queue_delay_ms': 1000.0 * self.queue_delay_max,
+                'inference_seconds_total': self.inference_seconds_total,
+                'rejected': self.rejected,
+                'errors': self.errors
+            }
+
+
+def build_batcher(predictor=injury_predictor) -> Optional[PredictionBatcher]:
+    """Create a batcher from the INJURY_PREDICTION_BATCH_* settings, or None when disabled"""
+    if not _get_setting('INJURY_PREDICTION_BATCHING', False, cast=_to_bool):
+        return None
+    return PredictionBatcher(
+        predictor,
+        max_batch_size=_get_setting('INJURY_PREDICTION_BATCH_MAX_SIZE', 64, cast=int),
+        max_wait_ms=_get_setting('INJURY_PREDICTION_BATCH_WINDOW_MS', 2.0, cast=float),
+        max_queue=_get_setting('INJURY_PREDICTION_BATCH_QUEUE', 1024, cast=int)
+    )
@@ -0,0 +1,285 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+import numpy as np
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Version of the on-disk artifact layout written by CompiledForest.save
+ARTIFACT_FORMAT = 1
+ARRAY_FIELDS = ('feature', 'threshold', 'children', 'value', 'roots')
+# Pointer file naming the artifact's current version subdirectory
+CURRENT_FILE = "CURRENT"
+METADATA_FILE = "metadata.json"
+
+
+class CompiledForest:
+    """
+    Flat-array inference engine for a fitted RandomForestClassifier
+    Every tree is exported into shared node tables and all trees are
+    traversed together with vectorized NumPy indexing, skipping sklearn's
+    per-call input validation and joblib dispatch.
+    """
+
+    def __init__(self, feature: np.ndarray, threshold: np.ndarray, children: np.ndarray,
+                 value: np.ndarray, roots: np.ndarray, max_depth: int, n_features: int,
+                 feature_names: Optional[List[str]] = None,
+                 feature_importances: Optional[np.ndarray] = None):
+        self.feature = feature          # split feature per node (0 for leaves)
+        self.threshold = threshold      # split threshold per node
+        self.children = children        # (n_nodes, 2) left/right child; leaves point to themselves
+        self.value = value              # positive-class probability per node
+        self.roots = roots              # root node index of every tree
+        self.max_depth = max_depth
+        self.n_features = n_features
+        self.feature_names = feature_names or []
+        self.feature_importances = feature_importances
+
+    @classmethod
+    def from_sklearn(cls, forest, positive_class=1) -> 'CompiledForest':
+        """Export the trees of a fitted forest into flat node arrays"""
+        classes = list(forest.classes_)
+        class_index = classes.index(positive_class) if positive_class in classes else len(classes) - 1
+
+        trees = [estimator.tree_ for estimator in forest.estimators_]
+        node_counts = np.array([tree.node_count for tree in trees])
+        offsets = np.concatenate([[0], np.cumsum(node_counts)[:-1]])
+
+        feature, threshold, children, value = [], [], [], []
+        for tree, offset in zip(trees, offsets):
+            node_ids = np.arange(tree.node_count) + offset
+            is_leaf = tree.children_left == -1
+
+            feature.append(np.where(is_leaf, 0, tree.feature))
+            threshold.append(np.where(is_leaf, 0.0, tree.threshold))
+            # Leaves loop back to themselves so every tree can be walked for
+            # max_depth steps without checking which rows already finished
+            children.append(np.column_stack([
+                np.where(is_leaf, node_ids, tree.children_left + offset),
+                np.where(is_leaf, node_ids, tree.children_right + offset),
+            ]))
+
+            # Same normalisation as DecisionTreeClassifier.predict_proba
+            counts = tree.value[:, 0, :]
+            totals = counts.sum(axis=1)
+            totals[totals == 0] = 1.0
+            value.append(counts[:, class_index] / totals)
+
+        return cls(
+            feature=np.concatenate(feature).astype(np.intp),
+            threshold=np.concatenate(threshold).astype(np.float64),
+            children=np.concatenate(children).astype(np.intp),
+            value=np.concatenate(value).astype(np.float64),
+            roots=offsets.astype(np.intp),
+            max_depth=int(max(tree.max_depth for tree in trees)),
+            n_features=int(forest.n_features_in_),
+            feature_names=[str(name) for name in getattr(forest, 'feature_names_in_', [])],
+            feature_importances=np.asarray(forest.feature_importances_, dtype=np.float64)
+        )
+
+    def save(self, directory) -> Path:
+        """Write the node tables as uncompressed .npy files plus metadata.json
+
+        Each save goes to a new version subdirectory, then the CURRENT
+        pointer file is replaced atomically to name it, so ``directory``
+        always holds a complete artifact. Processes that already
+        memory-mapped an older version keep reading intact (unlinked) files;
+        the previous version is kept for readers that resolved the pointer
+        just before the swap, and older ones are removed.
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(prefix=".staging-", dir=directory))
+        # mkdtemp is owner-only; workers may run as another user
+        staging.chmod(0o755)
+
+        try:
+            for field in ARRAY_FIELDS:
+                np.save(staging / f"{field}.npy", np.ascontiguousarray(getattr(self, field)))
+            with open(staging / METADATA_FILE, 'w') as fh:
+                json.dump({
+                    'format': ARTIFACT_FORMAT,
+                    'max_depth': self.max_depth,
+                    'n_features': self.n_features,
+                    'feature_names': self.feature_names,
+                    'feature_importances': (
+                        None if self.feature_importances is None else self.feature_importances.tolist()
+                    ),
+                    'summary': self.summary()
+                }, fh, indent=2)
+            version = f"v{time.time_ns()}"
+            os.replace(staging, directory / version)
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        previous = self.current_dir(directory)
+        pointer = directory / CURRENT_FILE
+        tmp_path = pointer.with_name(f".{CURRENT_FILE}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w') as fh:
+            fh.write(version + "\n")
+        os.replace(tmp_path, pointer)
+
+        keep = {version, previous.name if previous is not None and previous != directory else None}
+        for path in directory.iterdir():
+            if path.is_dir() and path.name.startswith('v') and path.name not in keep:
+                shutil.rmtree(path, ignore_errors=True)
+        if previous == directory:
+            # Flat layout written before versioned saves: drop the old tables
+            for name in ARRAY_FIELDS:
+                (directory / f"{name}.npy").unlink(missing_ok=True)
+            (directory / METADATA_FILE).unlink(missing_ok=True)
+        return directory
+
+    @staticmethod
+    def current_dir(directory) -> Optional[Path]:
+        """Directory holding the current tables of the artifact at ``directory``
+
+        Follows the CURRENT pointer; artifacts saved before versioned saves
+        keep their tables directly in ``directory``.
+        """
+        directory = Path(directory)
+        try:
+            with open(directory / CURRENT_FILE) as fh:
+                version = fh.read().strip()
+        except OSError:
+            version = ''
+        if version:
+            return directory / version
+        if (directory / METADATA_FILE).exists():
+            return directory
+        return None
+
+    @classmethod
+    def load(cls, directory, mmap: bool = True) -> 'CompiledForest':
+        """Open a saved artifact; with ``mmap`` the node tables are memory-mapped
+
+        Memory-mapped arrays are shared through the OS page cache, so every
+        worker on a host reads the same physical pages. If the version read
+        from CURRENT is removed by later saves while it is being opened, the
+        pointer is read again.
+        """
+        for _ in range(5):
+            current = cls.current_dir(directory)
+            if current is None:
+                raise FileNotFoundError(f"No forest artifact in '{directory}'")
+            try:
+                return cls._load_tables(current, mmap)
+            except FileNotFoundError:
+                if cls.current_dir(directory) == current:
+                    raise
+        return cls._load_tables(cls.current_dir(directory), mmap)
+
+    @classmethod
+    def _load_tables(cls, current: Path, mmap: bool) -> 'CompiledForest':
+        with open(current / METADATA_FILE) as fh:
+            metadata = json.load(fh)
+        if metadata.get('format') != ARTIFACT_FORMAT:
+            raise ValueError(f"Unsupported forest artifact format: {metadata.get('format')}")
+
+        mmap_mode = 'r' if mmap else None
+        arrays = {
+            field: np.load(current / f"{field}.npy", mmap_mode=mmap_mode)
+            for field in ARRAY_FIELDS
+        }
+        importances = metadata.get('feature_importances')
+        return cls(
+            max_depth=metadata['max_depth'],
+            n_features=metadata['n_features'],
+            feature_names=metadata.get('feature_names') or [],
+            feature_importances=None if importances is None else np.asarray(importances),
+            **arrays
+        )
+
+    def apply(self, X) -> np.ndarray:
+        """Return the leaf reached in every tree, shape (n_samples, n_trees)"""
+        # sklearn compares float32 inputs against float64 thresholds
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[np.newaxis, :]
+
+        n_samples, n_columns = X.shape
+        n_trees = len(self.roots)
+        feature, threshold = self.feature, self.threshold
+        children = self.children.ravel()
+
+        if n_samples == 1:
+            # Single-row fast path: index the row directly
+            x = X[0]
+            nodes = self.roots
+            for _ in range(self.max_depth):
+                go_right = x.take(feature.take(nodes)) > threshold.take(nodes)
+                nodes = children.take((nodes << 1) + go_right)
+            return nodes.reshape(1, n_trees)
+
+        # One (sample, tree) cursor per entry, walked level by level
+        flat_X = X.ravel()
+        nodes = np.tile(self.roots, n_samples)
+        row_offsets = np.repeat(np.arange(n_samples) * n_columns, n_trees)
+        for _ in range(self.max_depth):
+            go_right = flat_X.take(row_offsets + feature.take(nodes)) > threshold.take(nodes)
+            nodes = children.take((nodes << 1) + go_right)
+        return nodes.reshape(n_samples, n_trees)
+
+    def contributions(self, X) -> Tuple[np.ndarray, np.ndarray]:
+        """Decision-path (Saabas) attribution of every prediction
+
+        Each split a row passes through moves the node value from parent to
+        child; that change is credited to the split feature. Returns the
+        forest bias (mean root value) and per-feature contributions of shape
+        (n_samples, n_features); bias + contributions.sum(axis=1) equals
+        predict_proba(X).
+        """
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[np.newaxis, :]
+
+        n_samples, n_columns = X.shape
+        n_trees = len(self.roots)
+        feature, threshold, value = self.feature, self.threshold, self.value
+        children = self.children.ravel()
+
+        flat_X = X.ravel()
+        nodes = np.tile(self.roots, n_samples)
+        row_offsets = np.repeat(np.arange(n_samples) * n_columns, n_trees)
+        slot_offsets = np.repeat(np.arange(n_samples) * self.n_features, n_trees)
+        totals = np.zeros(n_samples * self.n_features)
+        for _ in range(self.max_depth):
+            split_feature = feature.take(nodes)
+            go_right = flat_X.take(row_offsets + split_feature) > threshold.take(nodes)
+            next_nodes = children.take((nodes << 1) + go_right)
+            # Leaves loop back to themselves, so finished paths add zero
+            totals += np.bincount(slot_offsets + split_feature,
+                                  weights=value.take(next_nodes) - value.take(nodes),
+                                  minlength=totals.size)
+            nodes = next_nodes
+
+        bias = np.full(n_samples, value.take(self.roots).mean())
+        return bias, totals.reshape(n_samples, self.n_features) / n_trees
+
+    def split_thresholds(self) -> Dict[int, np.ndarray]:
+        """Sorted distinct split thresholds of every feature used by the forest
+
+        Two inputs that fall between the same pair of consecutive thresholds
+        on every feature take identical paths through all trees.
+        """
+        is_split = self.children[:, 0] != np.arange(len(self.children))
+        features, thresholds = self.feature[is_split], self.threshold[is_split]
+        return {
+            int(column): np.unique(thresholds[features == column])
+            for column in np.unique(features)
+        }
+
+    def predict_proba(self, X) -> np.ndarray:
+        """Positive-class probability for each row of X"""
+        return self.value.take(self.apply(X)).mean(axis=1)
+
+    def summary(self) -> Dict:
+        return {
+            'trees': len(self.roots),
+            'nodes': len(self.value),
+            'max_depth': self.max_depth,
+            'n_features': self.n_features
+        }
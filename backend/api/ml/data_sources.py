@@ -0,0 +1,121 @@
+import numpy as np
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterator, List, Sequence, Tuple, Union
+
+try:
+    from .injury_predictor import FEATURE_NAMES, InjuryPredictor
+except ImportError:
+    # Imported as a top-level module (FastAPI app run from api/ml)
+    from injury_predictor import FEATURE_NAMES, InjuryPredictor
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+TARGET_COLUMN = 'injury_occurred'
+
+# Rough in-memory cost of one parsed row: float64 features + target, with
+# headroom for the parser's temporary buffers and the fit's own copies
+BYTES_PER_VALUE = 8
+PARSE_OVERHEAD = 4
+
+Chunk = Tuple['pd.DataFrame', 'pd.Series']
+PathLike = Union[str, Path]
+
+
+def rows_for_memory_budget(memory_budget_mb: float, n_columns: int = len(FEATURE_NAMES) + 1) -> int:
+    """Number of rows per chunk that keeps a chunk within the memory budget"""
+    budget_bytes = memory_budget_mb * 1024 * 1024
+    return max(1, int(budget_bytes // (n_columns * BYTES_PER_VALUE * PARSE_OVERHEAD)))
+
+
+class ChunkSource:
+    """
+    Iterable of (features, target) chunks for out-of-core training
+    Subclasses yield DataFrames whose columns follow FEATURE_NAMES order,
+    so every chunk can be fed straight to the forest.
+    """
+
+    def __init__(self, chunk_rows: int):
+        if chunk_rows < 1:
+            raise ValueError("chunk_rows must be at least 1")
+        self.chunk_rows = chunk_rows
+
+    def __iter__(self) -> Iterator[Chunk]:
+        for frame in self._frames():
+            yield self._split(frame)
+
+    def _frames(self) -> Iterator['pd.DataFrame']:
+        raise NotImplementedError
+
+    @staticmethod
+    def _split(frame: 'pd.DataFrame') -> Chunk:
+        missing = [column for column in FEATURE_NAMES + [TARGET_COLUMN] if column not in frame.columns]
+        if missing:
+            raise ValueError(f"Training data is missing columns: {', '.join(missing)}")
+        return frame[FEATURE_NAMES].astype(np.float64), frame[TARGET_COLUMN].astype(np.int64)
+
+
+class CSVChunkSource(ChunkSource):
+    """Stream one or more CSV files with pandas' chunked reader"""
+
+    def __init__(self, paths: Sequence[PathLike], chunk_rows: int = 100_000):
+        super().__init__(chunk_rows)
+        self.paths = [Path(path) for path in paths]
+
+    def _frames(self) -> Iterator['pd.DataFrame']:
+        import pandas as pd
+
+        for path in self.paths:
+            yield from pd.read_csv(path, usecols=FEATURE_NAMES + [TARGET_COLUMN], chunksize=self.chunk_rows)
+
+
+class ParquetChunkSource(ChunkSource):
+    """Stream one or more Parquet files record batch by record batch (needs pyarrow)"""
+
+    def __init__(self, paths: Sequence[PathLike], chunk_rows: int = 100_000):
+        super().__init__(chunk_rows)
+        self.paths = [Path(path) for path in paths]
+
+    def _frames(self) -> Iterator['pd.DataFrame']:
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as exc:
+            raise ImportError("Reading Parquet training data requires pyarrow (pip install pyarrow)") from exc
+
+        for path in self.paths:
+            parquet_file = pq.ParquetFile(path)
+            for batch in parquet_file.iter_batches(batch_size=self.chunk_rows,
+                                                   columns=FEATURE_NAMES + [TARGET_COLUMN]):
+                yield batch.to_pandas()
+
+
+class SyntheticChunkSource(ChunkSource):
+    """Generate synthetic training rows chunk by chunk from one seeded stream"""
+
+    def __init__(self, n_samples: int, chunk_rows: int = 100_000, seed: int = 42):
+        super().__init__(chunk_rows)
+        self.n_samples = n_samples
+        self.seed = seed
+
+    def _frames(self) -> Iterator['pd.DataFrame']:
+        rng = np.random.default_rng(self.seed)
+        generator = InjuryPredictor()
+        remaining = self.n_samples
+        while remaining > 0:
+            size = min(self.chunk_rows, remaining)
+            yield generator._generate_training_frame(size, rng)
+            remaining -= size
+
+
+def build_chunk_source(kind: str, paths: List[PathLike] = None, n_samples: int = 0,
+                       chunk_rows: int = 100_000, seed: int = 42) -> ChunkSource:
+    """Create a chunk source by name: 'synthetic', 'csv' or 'parquet'"""
+    if kind == 'synthetic':
+        return SyntheticChunkSource(n_samples, chunk_rows=chunk_rows, seed=seed)
+    if not paths:
+        raise ValueError(f"A '{kind}' source needs at least one file path")
+    if kind == 'csv':
+        return CSVChunkSource(paths, chunk_rows=chunk_rows)
+    if kind == 'parquet':
+        return ParquetChunkSource(paths, chunk_rows=chunk_rows)
+    raise ValueError(f"Unknown data source '{kind}'")
@@ -2,6 +2,11 @@ from injury_predictor import injury_predictor
 
 print("Fixing model compatibility...")
 result = injury_predictor.train()
-print("Fixed! New model saved.")
+version = result['model_version']
+print(f"Fixed! Registered model version {version} in '{injury_predictor.registry.root}'.")
 print(f"Accuracy: {result['accuracy']:.3f}")
-print("Now restart: uvicorn main:app --reload")
+if injury_predictor.registry.current_version() == version:
+    print("CURRENT now points to it; running servers hot-swap to it "
+          "(or restart: uvicorn main:app --reload)")
+else:
+    print(f"Promote it to CURRENT with: python manage.py models promote {version}")
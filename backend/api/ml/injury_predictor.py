@@ -1,16 +1,184 @@
 import numpy as np
-import pandas as pd
 from pathlib import Path
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import accuracy_score, classification_report
+import hashlib
 import joblib
 import os
+import threading
+import time
 from datetime import datetime
-from typing import Dict, List, Tuple, Optional
+from typing import TYPE_CHECKING, Dict, List, Tuple, Optional
 import warnings
+
+try:
+    from .compiled_forest import CompiledForest
+    from .metrics import CACHE_LOOKUPS, STAGE_SECONDS, get_metrics
+    from .model_registry import DEFAULT_REGISTRY_DIR, ModelRegistry
+    from .prediction_cache import build_prediction_cache
+except ImportError:
+    # Imported as a top-level module (FastAPI app run from api/ml)
+    from compiled_forest import CompiledForest
+    from metrics import CACHE_LOOKUPS, STAGE_SECONDS, get_metrics
+    from model_registry import DEFAULT_REGISTRY_DIR, ModelRegistry
+    from prediction_cache import build_prediction_cache
+
+# pandas and the sklearn training/metrics modules are only needed to train,
+# so serving-only processes import them lazily (see train()).
+if TYPE_CHECKING:
+    import pandas as pd
 warnings.filterwarnings('ignore')
 
+# Model feature order (must match training data columns)
+FEATURE_NAMES = [
+    'age',
+    'height_cm',
+    'weight_kg',
+    'bmi',
+    'heart_rate_variability',
+    'sleep_quality',
+    'fatigue_level',
+    'training_load',
+    'session_intensity',
+    'match_minutes',
+    'previous_injuries_count',
+    'days_since_last_injury',
+]
+
+# Position-based height and weight estimates
+POSITION_STATS = {
+    'goalkeeper': (190, 85),    # Taller, heavier
+    'defender': (183, 78),      # Tall, strong
+    'midfielder': (178, 72),    # Average
+    'forward': (180, 75)        # Athletic
+}
+DEFAULT_POSITION_STATS = (180, 75)
+
+# Random Forest hyperparameters used for training
+FOREST_PARAMS = {
+    'n_estimators': 100,
+    'max_depth': 10,
+    'min_samples_split': 5,
+    'random_state': 42,
+    'class_weight': 'balanced'
+}
+
+# Inference backends: sklearn's predict_proba or the flat-array CompiledForest
+INFERENCE_BACKENDS = ('sklearn', 'compiled')
+# Serving artifacts: the joblib pickle, or memory-mapped CompiledForest tables
+MODEL_ARTIFACTS = ('pickle', 'mmap')
+# key_factors detail: every feature's contribution, the three largest, or none
+EXPLAIN_MODES = ('full', 'top3', 'none')
+
+
+def _to_bool(value) -> bool:
+    """Cast an environment-style flag ('1', 'true', 'yes', 'on') to bool"""
+    if isinstance(value, str):
+        return value.strip().lower() in ('1', 'true', 'yes', 'on')
+    return bool(value)
+
+
+def _get_setting(name: str, default, cast=None):
+    """Read a setting from Django settings when configured, else the environment"""
+    try:
+        from django.conf import settings
+        if settings.configured:
+            return getattr(settings, name, default)
+    except ImportError:
+        pass
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return cast(value) if cast else value
+
+
+# Representative player used to warm up a freshly loaded model
+WARMUP_PLAYER = {
+    'age': 25,
+    'position': 'midfielder',
+    'matches_played': 1,
+    'total_minutes_played': 0.0,
+    'fatigue_level': 0.5,
+    'training_load': 0.5,
+    'recovery_time': 48.0,
+    'fitness_score': 0.8,
+    'previous_injuries_count': 0,
+    'weather_condition': 'normal'
+}
+
+
+class ServingModel:
+    """
+    One loaded model and everything derived from it for serving
+    Requests read a single reference to this object, so replacing the
+    model is one atomic assignment and in-flight requests finish on the
+    version they started with.
+    """
+
+    def __init__(self, model, compiled_forest: Optional[CompiledForest] = None,
+                 version: Optional[str] = None):
+        self.model = model
+        self.compiled_forest = compiled_forest
+        self.version = version
+        # Node tables for attribution; the sklearn backend exports them on first use
+        self._explainer = compiled_forest
+        # Per-feature split thresholds used by what-if sweeps, built on first use
+        self._split_thresholds = None
+
+        if model is not None and hasattr(model, 'feature_names_in_'):
+            self.feature_names = [str(name) for name in model.feature_names_in_]
+        elif compiled_forest is not None and compiled_forest.feature_names:
+            self.feature_names = list(compiled_forest.feature_names)
+        else:
+            self.feature_names = list(FEATURE_NAMES)
+
+        # sklearn recomputes feature_importances_ by walking every tree on
+        # each access, so the global ranking is computed once per model
+        if compiled_forest is not None and compiled_forest.feature_importances is not None:
+            importances = compiled_forest.feature_importances
+        elif hasattr(model, 'feature_importances_'):
+            importances = model.feature_importances_
+        else:
+            importances = []
+        ranking = sorted(zip(self.feature_names, importances), key=lambda x: x[1], reverse=True)
+        self.importance_ranking = [(feature, float(importance)) for feature, importance in ranking]
+        self.global_importance = dict(self.importance_ranking)
+
+    def predict_proba(self, features) -> np.ndarray:
+        """Positive-class probability for each row of a 2-D feature matrix"""
+        if self.compiled_forest is not None:
+            return self.compiled_forest.predict_proba(features)
+        return self.model.predict_proba(features)[:, 1]
+
+    def explainer(self) -> Optional[CompiledForest]:
+        if self._explainer is None and self.model is not None:
+            self._explainer = CompiledForest.from_sklearn(self.model)
+        return self._explainer
+
+    def split_thresholds(self) -> Optional[Dict[int, np.ndarray]]:
+        """Sorted split thresholds of every feature (None without node tables)"""
+        if self._split_thresholds is None:
+            explainer = self.explainer()
+            if explainer is not None:
+                self._split_thresholds = explainer.split_thresholds()
+        return self._split_thresholds
+
+    def warm_up(self):
+        """Build the lazily derived tables now instead of on the first request
+
+        On the sklearn backend exporting the node tables and collecting the
+        split thresholds takes about a second, which the first explained
+        prediction or sweep would otherwise pay for.
+        """
+        self.split_thresholds()
+
+    def explain(self, features, explain: str) -> Tuple:
+        """Forest bias and per-feature contributions for each row (None when not requested)"""
+        explainer = None if explain == 'none' else self.explainer()
+        if explainer is None:
+            missing = [None] * len(features)
+            return missing, missing
+        return explainer.contributions(features)
+
+
 class InjuryPredictor:
     """
     Real ML model for football injury prediction
@@ -19,17 +187,143 @@ class InjuryPredictor:
     """
     
     def __init__(self):
-        self.model = None
+        # The loaded model and everything derived from it (see ServingModel)
+        self._serving = None
         self.feature_names = []
-        self.is_trained = False
+        # What-if sweep engine, created on first use
+        self._sweep = None
+        # Bundled model, used until a version is promoted in the registry
         self.model_path = Path(__file__).resolve().parent / "injury_model.pkl"
-        self.weather_factor = 1.0
+        self.artifact_path = self.model_path.with_suffix('.forest')
+        self.registry = ModelRegistry(_get_setting('INJURY_MODEL_REGISTRY_DIR', None) or DEFAULT_REGISTRY_DIR)
+        # Guards lazy model loading; prediction itself keeps no per-request state
+        self._load_lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._watcher = None
+        # Timings of the last model load / warm-up, reported by health checks
+        self.cold_start = {}
+        self.backend = _get_setting('INJURY_MODEL_BACKEND', 'sklearn')
+        if self.backend not in INFERENCE_BACKENDS:
+            print(f"⚠️ Unknown INJURY_MODEL_BACKEND '{self.backend}', using sklearn")
+            self.backend = 'sklearn'
+        self.artifact = _get_setting('INJURY_MODEL_ARTIFACT', 'pickle')
+        if self.artifact not in MODEL_ARTIFACTS:
+            print(f"⚠️ Unknown INJURY_MODEL_ARTIFACT '{self.artifact}', using pickle")
+            self.artifact = 'pickle'
+        if self.artifact == 'mmap':
+            # Memory-mapped tables are evaluated by the compiled engine
+            self.backend = 'compiled'
+        self.prediction_cache = build_prediction_cache(
+            backend=_get_setting('INJURY_PREDICTION_CACHE_BACKEND', 'local'),
+            max_entries=_get_setting('INJURY_PREDICTION_CACHE_SIZE', 1024, cast=int),
+            ttl_seconds=_get_setting('INJURY_PREDICTION_CACHE_TTL', 300.0, cast=float),
+            alias=_get_setting('INJURY_PREDICTION_CACHE_ALIAS', 'default')
+        )
+        # Stage timers and cache counters (exported on /api/metrics/)
+        self.metrics = get_metrics()
+
+    @property
+    def is_trained(self) -> bool:
+        return self._serving is not None
+
+    @property
+    def model(self):
+        return self._serving.model if self._serving is not None else None
+
+    @property
+    def compiled_forest(self) -> Optional[CompiledForest]:
+        return self._serving.compiled_forest if self._serving is not None else None
+
+    @property
+    def model_version(self) -> Optional[str]:
+        """Identifies the loaded model; part of every prediction cache key"""
+        return self._serving.version if self._serving is not None else None
         
-    def generate_training_data(self, n_samples=1000) -> Tuple[pd.DataFrame, pd.Series]:
+    def generate_training_data(self, n_samples=1000, seed=42,
+                               legacy=False) -> Tuple['pd.DataFrame', 'pd.Series']:
         """
         Generate realistic football player training data
         In real scenario, this would come from your database
+
+        Columns are drawn in one shot from a local ``np.random.Generator``.
+        ``legacy=True`` uses the original row-by-row loop on the global
+        ``np.random.seed(42)`` stream, reproducing the historical dataset
+        exactly; the vectorized generator uses a different random stream, so
+        its rows differ but follow the same distributions and labelling.
         """
+        if legacy:
+            df = self._generate_training_frame_legacy(n_samples)
+        else:
+            df = self._generate_training_frame(n_samples, np.random.default_rng(seed))
+
+        X = df.drop(['injury_occurred', 'injury_risk_score'], axis=1)
+        y = df['injury_occurred']
+        
+        self.feature_names = X.columns.tolist()
+        return X, y
+
+    def _generate_training_frame(self, n_samples: int, rng: np.random.Generator) -> 'pd.DataFrame':
+        """Draw every column at once and label rows with boolean masks"""
+        import pandas as pd
+
+        # Player demographics
+        age = rng.integers(18, 35, n_samples)
+        height = rng.normal(180, 8, n_samples)
+        weight = rng.normal(75, 10, n_samples)
+        bmi = weight / ((height/100) ** 2)
+
+        # Biometric data
+        hrv = rng.normal(65, 15, n_samples)  # Heart Rate Variability
+        sleep_quality = rng.normal(7, 2, n_samples)
+        fatigue = rng.normal(4, 2, n_samples)
+
+        # Training load
+        training_load = rng.normal(400, 150, n_samples)
+        session_intensity = rng.normal(6, 2, n_samples)
+        match_minutes = rng.normal(70, 25, n_samples)
+
+        # Injury history
+        previous_injuries = rng.integers(0, 3, n_samples)
+        days_since_injury = rng.integers(0, 365, n_samples)
+
+        # Real risk factors, accumulated in the same order as the legacy loop
+        # so the 0.35 threshold sees bit-identical sums
+        base_risk = 0.1
+        risk_factors = np.zeros(n_samples)
+        for mask, increment in (
+            (hrv < 50, 0.2),                  # Low HRV
+            (sleep_quality < 5, 0.15),
+            (fatigue > 6, 0.15),
+            (training_load > 550, 0.2),
+            (session_intensity > 8, 0.1),
+            (previous_injuries > 1, 0.1),
+            (days_since_injury < 30, 0.1),
+        ):
+            risk_factors += np.where(mask, increment, 0.0)
+
+        injury_risk = base_risk + risk_factors
+
+        return pd.DataFrame({
+            'age': age,
+            'height_cm': height,
+            'weight_kg': weight,
+            'bmi': bmi,
+            'heart_rate_variability': hrv,
+            'sleep_quality': sleep_quality,
+            'fatigue_level': fatigue,
+            'training_load': training_load,
+            'session_intensity': session_intensity,
+            'match_minutes': match_minutes,
+            'previous_injuries_count': previous_injuries,
+            'days_since_last_injury': days_since_injury,
+            'injury_occurred': (injury_risk > 0.35).astype(np.int64),
+            'injury_risk_score': injury_risk
+        })
+
+    def _generate_training_frame_legacy(self, n_samples: int) -> 'pd.DataFrame':
+        """Original row-by-row generator, kept to reproduce the historical dataset"""
+        import pandas as pd
+
         np.random.seed(42)
         
         data = []
@@ -88,68 +382,237 @@ class InjuryPredictor:
                 'injury_risk_score': injury_risk
             })
         
-        df = pd.DataFrame(data)
-        X = df.drop(['injury_occurred', 'injury_risk_score'], axis=1)
-        y = df['injury_occurred']
-        
-        self.feature_names = X.columns.tolist()
-        return X, y
+        return pd.DataFrame(data)
     
-    def train(self) -> Dict:
-        """Train the Random Forest model with realistic data"""
-        print("Generating training data...")
-        X, y = self.generate_training_data(1500)
-        
-        print("Training Random Forest model...")
-        self.model = RandomForestClassifier(
-            n_estimators=100,
-            max_depth=10,
-            min_samples_split=5,
-            random_state=42,
-            class_weight='balanced'
-        )
+    def train(self, n_samples: int = 1500, n_jobs: Optional[int] = None,
+              random_state: int = 42, params: Optional[Dict] = None, data=None) -> Dict:
+        """Train the Random Forest model with realistic data
+
+        Trees are fitted in parallel on ``n_jobs`` cores (default: the
+        ``INJURY_MODEL_TRAIN_N_JOBS`` setting, -1 = all cores). sklearn draws
+        every tree's seed from ``random_state`` before dispatching work, so
+        the fitted forest is identical for any worker count. ``params``
+        overrides entries of FOREST_PARAMS (e.g. the result of ``tune()``);
+        ``data`` is an optional (X, y) pair used instead of synthetic rows.
+        """
+        from sklearn.ensemble import RandomForestClassifier
+        from sklearn.model_selection import train_test_split
+        from sklearn.metrics import accuracy_score
+
+        if n_jobs is None:
+            n_jobs = _get_setting('INJURY_MODEL_TRAIN_N_JOBS', -1, cast=int)
+
+        timings = {}
+        started = stage = time.perf_counter()
+
+        def lap(name):
+            nonlocal stage
+            now = time.perf_counter()
+            timings[name] = now - stage
+            stage = now
+
+        if data is not None:
+            X, y = data
+            self.feature_names = X.columns.tolist()
+        else:
+            print("Generating training data...")
+            X, y = self.generate_training_data(n_samples, seed=random_state)
+        lap('data_generation')
         
         X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=0.2, random_state=42, stratify=y
+            X, y, test_size=0.2, random_state=random_state, stratify=y
         )
+        lap('split')
         
-        self.model.fit(X_train, y_train)
+        print(f"Training Random Forest model (n_jobs={n_jobs})...")
+        forest_params = dict(FOREST_PARAMS, random_state=random_state, **(params or {}))
+        model = RandomForestClassifier(**dict(forest_params, n_jobs=n_jobs))
+        model.fit(X_train, y_train)
+        # Serve single rows without spinning up a worker pool per call
+        model.n_jobs = None
+        self._set_model(model)
+        lap('fit')
         
         # Evaluate model
         y_pred = self.model.predict(X_test)
         accuracy = accuracy_score(y_test, y_pred)
+        lap('evaluate')
         
-        self.is_trained = True
-        
-        # Save model using joblib - UPDATED to .pkl
-        joblib.dump(self.model, self.model_path)
-        print(f"✅ Model saved as '{self.model_path}'")
+        # Register the model as a new version in the model registry
+        version = self._save_model({
+            'trainer': 'train',
+            'params': forest_params,
+            'accuracy': accuracy,
+            'training_samples': len(X_train),
+            'test_samples': len(X_test),
+            'dataset_fingerprint': self._dataset_fingerprint(X, y),
+        })
+        lap('serialize')
+        timings['total'] = time.perf_counter() - started
+        print(f"✅ Model saved as version {version} in '{self.registry.root}'")
         
         print(f"Model trained successfully!")
         print(f"Accuracy: {accuracy:.3f}")
         print(f"Features: {len(self.feature_names)}")
+        print(f"Wall-clock: {timings['total']:.2f}s")
         
         return {
             'accuracy': accuracy,
             'features': self.feature_names,
             'training_samples': len(X_train),
-            'test_samples': len(X_test)
+            'test_samples': len(X_test),
+            'params': forest_params,
+            'n_jobs': n_jobs,
+            'model_version': version,
+            'timings': timings
         }
+
+    @staticmethod
+    def _dataset_fingerprint(X: 'pd.DataFrame', y: 'pd.Series') -> str:
+        try:
+            from .tuning import dataset_fingerprint
+        except ImportError:
+            from tuning import dataset_fingerprint
+        return dataset_fingerprint(X, y)
+
+    def tune(self, param_grid: Optional[Dict] = None, n_iter: Optional[int] = None, cv: int = 5,
+             n_samples: int = 1500, n_jobs: Optional[int] = None, cache_dir=None,
+             promote: bool = False, seed: int = 42, data=None) -> Dict:
+        """Cross-validated grid/random search over the forest hyperparameters
+
+        Folds are fitted on a process pool and cached on disk by dataset
+        fingerprint + params, so repeated or interrupted searches resume.
+        ``data`` is an optional (X, y) pair; by default the synthetic
+        generator is used. With ``promote=True`` the best configuration is
+        retrained on the full dataset and registered as a new ModelRegistry
+        version, which CURRENT then points to (unless
+        INJURY_MODEL_AUTO_PROMOTE is off; see ``manage.py models``).
+        """
+        try:
+            from .tuning import HyperparameterSearch
+        except ImportError:
+            from tuning import HyperparameterSearch
+
+        if n_jobs is None:
+            n_jobs = _get_setting('INJURY_MODEL_TRAIN_N_JOBS', -1, cast=int)
+
+        X, y = data if data is not None else self.generate_training_data(n_samples, seed=seed)
+        search = HyperparameterSearch(
+            X, y, param_grid=param_grid, n_iter=n_iter, cv=cv,
+            n_jobs=n_jobs, cache_dir=cache_dir, random_state=seed
+        )
+        result = search.run()
+        print(f"Best mean accuracy {result['best_score']:.4f} with {result['best_params']}")
+
+        if promote:
+            best = dict(result['best_params'])
+            random_state = best.pop('random_state', seed)
+            result['promoted'] = self.train(
+                n_samples=n_samples, n_jobs=n_jobs, random_state=random_state,
+                params=best, data=(X, y)
+            )
+        return result
     
-    def _prepare_features(self, player_data: Dict) -> List:
-        """Convert frontend fields to model features - EXACT MAPPING"""
+    def train_streaming(self, source, trees_per_chunk: int = 10, holdout_fraction: float = 0.2,
+                        max_holdout_rows: int = 200_000, seed: int = 42,
+                        n_jobs: Optional[int] = None) -> Dict:
+        """Train on a chunked data source in bounded memory
+
+        The forest grows with ``warm_start``: each chunk adds
+        ``trees_per_chunk`` trees fitted on that chunk only, so at most one
+        chunk plus a capped hold-out sample is in memory at any time.
+        ``source`` is any iterable of (X, y) chunks, see ``data_sources``.
+        """
+        import pandas as pd
+        from sklearn.ensemble import RandomForestClassifier
+        from sklearn.metrics import accuracy_score
+
+        if n_jobs is None:
+            n_jobs = _get_setting('INJURY_MODEL_TRAIN_N_JOBS', -1, cast=int)
+
+        # ``seed`` drives the trees as well as the hold-out split
+        params = dict(FOREST_PARAMS, random_state=seed, n_estimators=0, warm_start=True, n_jobs=n_jobs)
+        model = RandomForestClassifier(**params)
+        rng = np.random.default_rng(seed)
+
+        holdout_X, holdout_y = None, None
+        training_samples = 0
+        chunks = 0
+
+        print("Training Random Forest model on streamed chunks...")
+        for X_chunk, y_chunk in source:
+            # Hold back a random slice of every chunk for evaluation
+            held = rng.random(len(X_chunk)) < holdout_fraction
+            X_train, y_train = X_chunk[~held], y_chunk[~held]
+
+            if holdout_X is None:
+                holdout_X, holdout_y = X_chunk[held], y_chunk[held]
+            else:
+                holdout_X = pd.concat([holdout_X, X_chunk[held]], ignore_index=True)
+                holdout_y = pd.concat([holdout_y, y_chunk[held]], ignore_index=True)
+            if len(holdout_X) > max_holdout_rows:
+                keep = rng.choice(len(holdout_X), max_holdout_rows, replace=False)
+                holdout_X = holdout_X.iloc[keep].reset_index(drop=True)
+                holdout_y = holdout_y.iloc[keep].reset_index(drop=True)
+
+            if y_train.nunique() < 2:
+                print(f"⚠️ Skipping chunk {chunks + 1}: needs both classes to grow trees")
+                chunks += 1
+                continue
+
+            model.n_estimators += trees_per_chunk
+            model.fit(X_train, y_train)
+            training_samples += len(X_train)
+            chunks += 1
+            print(f"  chunk {chunks}: {len(X_train)} rows, {model.n_estimators} trees")
+
+        if model.n_estimators == 0:
+            raise ValueError("No usable training chunks in data source")
+
+        model.warm_start = False
+        model.n_jobs = None
+        self._set_model(model)
+
+        accuracy = None
+        if holdout_X is not None and len(holdout_X):
+            accuracy = accuracy_score(holdout_y, self.model.predict(holdout_X))
+
+        version = self._save_model({
+            'trainer': 'train_streaming',
+            'params': dict(FOREST_PARAMS, random_state=seed, n_estimators=model.n_estimators,
+                           trees_per_chunk=trees_per_chunk),
+            'accuracy': accuracy,
+            'training_samples': training_samples,
+            'test_samples': 0 if holdout_X is None else len(holdout_X),
+            'chunks': chunks,
+            'source': type(source).__name__,
+        })
+        print(f"✅ Model saved as version {version} in '{self.registry.root}'")
+        if accuracy is not None:
+            print(f"Accuracy: {accuracy:.3f}")
+
+        return {
+            'accuracy': accuracy,
+            'features': self.feature_names,
+            'training_samples': training_samples,
+            'test_samples': 0 if holdout_X is None else len(holdout_X),
+            'chunks': chunks,
+            'trees': model.n_estimators,
+            'model_version': version
+        }
+    
+    def _prepare_features(self, player_data: Dict) -> Tuple[List, float]:
+        """Convert frontend fields to model features - EXACT MAPPING
+
+        Returns the feature vector and the weather factor for this request.
+        Nothing is stored on the predictor, so concurrent requests can share
+        the global instance safely.
+        """
         
         # Get position and set default physical attributes
-        position = player_data['position'].lower()
+        position = player_data['position'].strip().lower()
         
-        # Position-based height and weight estimates
-        position_stats = {
-            'goalkeeper': (190, 85),    # Taller, heavier
-            'defender': (183, 78),      # Tall, strong
-            'midfielder': (178, 72),    # Average
-            'forward': (180, 75)        # Athletic
-        }
-        height_cm, weight_kg = position_stats.get(position, (180, 75))
+        height_cm, weight_kg = POSITION_STATS.get(position, DEFAULT_POSITION_STATS)
         bmi = weight_kg / ((height_cm/100) ** 2)
         
         # Convert frontend 0-1 scales to realistic ranges
@@ -191,7 +654,7 @@ class InjuryPredictor:
             days_since_injury = max(30, 365 - (injury_count * 60))
         
         # Weather impact (simplified)
-        weather = player_data['weather_condition'].lower()
+        weather = player_data['weather_condition'].strip().lower()
         weather_factor = 1.0
         if 'rain' in weather or 'wet' in weather:
             weather_factor = 1.2  # Increased injury risk
@@ -214,55 +677,238 @@ class InjuryPredictor:
             days_since_injury            # days_since_last_injury
         ]
         
-        # Apply weather factor to risk calculation later
-        self.weather_factor = weather_factor
-        
-        return features
+        # Weather factor is applied to the risk calculation later
+        return features, weather_factor
     
-    def predict_risk(self, player_data: Dict) -> Dict:
-        """Predict injury risk using frontend fields"""
-        if not self.is_trained:
-            # Try to load saved model first
-            if not self.load_model():
+    def _prepare_features_batch(self, players: List[Dict]) -> Tuple[np.ndarray, np.ndarray]:
+        """Vectorized version of _prepare_features for many players at once
+
+        Returns a (n_players, n_features) matrix in training column order and
+        the per-player weather factors.
+        """
+        n = len(players)
+        if n == 0:
+            return np.empty((0, len(FEATURE_NAMES))), np.empty(0)
+
+        def column(key):
+            return np.fromiter((p[key] for p in players), dtype=float, count=n)
+
+        # Position lookup
+        positions = np.array([p['position'].strip().lower() for p in players], dtype=str)
+        height_cm = np.full(n, float(DEFAULT_POSITION_STATS[0]))
+        weight_kg = np.full(n, float(DEFAULT_POSITION_STATS[1]))
+        for position, (height, weight) in POSITION_STATS.items():
+            mask = positions == position
+            height_cm[mask] = height
+            weight_kg[mask] = weight
+        bmi = weight_kg / ((height_cm / 100) ** 2)
+
+        # Frontend 0-1 scales → realistic ranges
+        training_load = column('training_load')
+        fatigue_0_10 = column('fatigue_level') * 10
+        training_load_scaled = 200 + (training_load * 400)
+        session_intensity = training_load * 10
+        hrv = 50 + (column('fitness_score') * 30)
+
+        # Recovery-hour bucketing → sleep quality
+        recovery_hours = column('recovery_time')
+        sleep_quality = np.select(
+            [recovery_hours >= 72, recovery_hours >= 48, recovery_hours >= 24],
+            [9.0, 7.5, 6.0],
+            default=4.0
+        )
+
+        matches = np.maximum(1, column('matches_played'))
+        match_minutes = np.minimum(90, column('total_minutes_played') / matches)
+
+        # Injury count → days since last injury
+        injury_count = column('previous_injuries_count')
+        days_since_injury = np.where(
+            injury_count == 0, 365, np.maximum(30, 365 - (injury_count * 60))
+        )
+
+        # Weather impact
+        weather = np.array([p['weather_condition'].strip().lower() for p in players], dtype=str)
+        rainy = (np.char.find(weather, 'rain') >= 0) | (np.char.find(weather, 'wet') >= 0)
+        hot = (np.char.find(weather, 'hot') >= 0) | (np.char.find(weather, 'extreme') >= 0)
+        weather_factors = np.where(rainy, 1.2, np.where(hot, 1.1, 1.0))
+
+        features = np.column_stack([
+            column('age'),
+            height_cm,
+            weight_kg,
+            bmi,
+            hrv,
+            sleep_quality,
+            fatigue_0_10,
+            training_load_scaled,
+            session_intensity,
+            match_minutes,
+            injury_count,
+            days_since_injury
+        ])
+        return features, weather_factors
+
+    def _ensure_model(self) -> 'ServingModel':
+        """Load the saved model once, even when called from many threads
+
+        Returns the serving snapshot; callers use it for the whole request
+        so a concurrent hot swap never mixes two model versions.
+        """
+        serving = self._serving
+        if serving is not None:
+            return serving
+        with self._load_lock:
+            # Another thread may have finished loading while we waited
+            if self._serving is None and not self.load_model():
                 raise ValueError("Model not trained and no saved model found. Call train() first.")
+            return self._serving
+
+    def predict_risk(self, player_data: Dict, use_cache: bool = True, explain: str = 'top3') -> Dict:
+        """Predict injury risk using frontend fields
+
+        Results are served from the prediction cache when an identical
+        payload was scored by the same model version recently. ``explain``
+        selects the key_factors detail (see EXPLAIN_MODES).
+        """
+        self._check_explain(explain)
+        # Try to load saved model first
+        serving = self._ensure_model()
+
+        metrics = self.metrics
+        cache = self.prediction_cache if use_cache else None
+        if cache is not None:
+            cache_key = cache.make_key(player_data, serving.version, explain=explain)
+            cached = cache.get(cache_key)
+            metrics.inc(CACHE_LOOKUPS, result='miss' if cached is None else 'hit')
+            if cached is not None:
+                return cached
         
         # Convert player data to feature vector
-        features = self._prepare_features(player_data)
+        with metrics.timer(STAGE_SECONDS, stage='features', mode='single'):
+            features, weather_factor = self._prepare_features(player_data)
         
         # Make prediction
-        risk_probability = self.model.predict_proba([features])[0][1]
+        with metrics.timer(STAGE_SECONDS, stage='inference', mode='single'):
+            risk_probability = serving.predict_proba([features])[0]
         
         # Apply weather factor to final risk
-        risk_probability = min(0.95, risk_probability * self.weather_factor)
+        risk_probability = min(0.95, risk_probability * weather_factor)
         
-        # Get feature importance for explanation
-        feature_importance = self._get_feature_importance(features)
-        
-        return {
+        with metrics.timer(STAGE_SECONDS, stage='explain', mode='single'):
+            base_value, contributions = serving.explain([features], explain)
+            prediction = self._build_prediction(serving, risk_probability, features, explain,
+                                                base_value[0], contributions[0])
+        if cache is not None:
+            cache.set(cache_key, prediction)
+        return prediction
+
+    def predict_risk_batch(self, players: List[Dict], use_cache: bool = False,
+                           explain: str = 'top3') -> List[Dict]:
+        """Predict injury risk for a whole squad with a single predict_proba call
+
+        ``use_cache`` consults the prediction cache per player and only
+        scores the misses (used for coalesced online requests; large roster
+        runs skip it so they do not flush the cache). Explanations for the
+        whole batch come from one vectorized attribution pass.
+        """
+        self._check_explain(explain)
+        serving = self._ensure_model()
+
+        if not players:
+            return []
+
+        metrics = self.metrics
+        cache = self.prediction_cache if use_cache else None
+        results = [None] * len(players)
+        if cache is not None:
+            keys = [cache.make_key(player, serving.version, explain=explain) for player in players]
+            results = [cache.get(key) for key in keys]
+            pending = [index for index, result in enumerate(results) if result is None]
+            if len(pending) < len(players):
+                metrics.inc(CACHE_LOOKUPS, len(players) - len(pending), result='hit')
+            if not pending:
+                return results
+            metrics.inc(CACHE_LOOKUPS, len(pending), result='miss')
+            players = [players[index] for index in pending]
+        else:
+            pending = range(len(players))
+
+        with metrics.timer(STAGE_SECONDS, stage='features', mode='batch'):
+            features, weather_factors = self._prepare_features_batch(players)
+        with metrics.timer(STAGE_SECONDS, stage='inference', mode='batch'):
+            risk_probabilities = np.minimum(
+                0.95, serving.predict_proba(features) * weather_factors
+            )
+
+        with metrics.timer(STAGE_SECONDS, stage='explain', mode='batch'):
+            base_values, contributions = serving.explain(features, explain)
+            for position, (index, risk_probability, row) in enumerate(zip(pending, risk_probabilities, features)):
+                results[index] = self._build_prediction(serving, float(risk_probability), row, explain,
+                                                        base_values[position], contributions[position])
+                if cache is not None:
+                    cache.set(keys[index], results[index])
+        return results
+
+    def sweep(self, players: List[Dict], grid: Dict[str, List[float]]) -> Dict:
+        """What-if risk surfaces: every player's risk over a grid of payload values
+
+        ``grid`` maps numeric payload fields (see whatif.SWEEP_FIELDS) to the
+        values to try; the whole grid is scored in one batch.
+        """
+        if self._sweep is None:
+            try:
+                from .whatif import build_sweep
+            except ImportError:
+                from whatif import build_sweep
+            self._sweep = build_sweep(self)
+        return self._sweep.run(players, grid)
+
+    def _build_prediction(self, serving: 'ServingModel', risk_probability: float, features,
+                          explain: str = 'top3', base_value=None, contributions=None) -> Dict:
+        """Assemble the prediction dict returned to callers"""
+        prediction = {
             'risk_score': float(risk_probability),
             'risk_level': self._get_risk_level(risk_probability),
-            'key_factors': feature_importance,
-            'confidence': min(0.95, risk_probability * 1.2)
+            'key_factors': self._get_key_factors(serving, features, contributions, explain),
+            'confidence': min(0.95, risk_probability * 1.2),
+            'model_version': serving.version
         }
-    
-    def _get_feature_importance(self, features: List) -> List[Dict]:
-        """Explain which features contributed most to the prediction"""
-        if not hasattr(self.model, 'feature_importances_'):
+        if explain == 'full' and base_value is not None:
+            # base_value + sum(factor_impact) is the model probability before the weather factor
+            prediction['base_value'] = float(base_value)
+        return prediction
+
+    @staticmethod
+    def _check_explain(explain: str):
+        if explain not in EXPLAIN_MODES:
+            raise ValueError(f"explain must be one of {', '.join(EXPLAIN_MODES)}, got '{explain}'")
+
+    def _get_key_factors(self, serving: 'ServingModel', features, contributions,
+                         explain: str = 'top3') -> List[Dict]:
+        """Explain which features moved this player's risk the most
+
+        ``factor_impact`` is the feature's signed contribution to the model
+        probability (Saabas decision-path attribution); ``global_importance``
+        is its forest-wide importance for comparison.
+        """
+        if explain == 'none' or contributions is None:
             return []
-        
-        importance_dict = dict(zip(self.feature_names, self.model.feature_importances_))
-        feature_values = dict(zip(self.feature_names, features))
-        
-        # Get top 3 most important features for this prediction
-        top_features = sorted(importance_dict.items(), key=lambda x: x[1], reverse=True)[:3]
-        
+
+        order = np.argsort(-np.abs(contributions), kind='stable')
+        if explain == 'top3':
+            order = order[:3]
+
         key_factors = []
-        for feature, importance in top_features:
+        for column in order:
+            feature = serving.feature_names[column]
+            value = float(features[column])
             key_factors.append({
                 'factor_name': feature,
-                'factor_impact': float(importance),
-                'current_value': float(feature_values[feature]),
-                'description': self._get_factor_description(feature, feature_values[feature])
+                'factor_impact': float(contributions[column]),
+                'global_importance': serving.global_importance.get(feature, 0.0),
+                'current_value': value,
+                'description': self._get_factor_description(feature, value)
             })
         
         return key_factors
@@ -294,13 +940,176 @@ class InjuryPredictor:
             return "high"
     
     def load_model(self) -> bool:
-        """Load pre-trained model"""
-        if os.path.exists(self.model_path):
-            self.model = joblib.load(self.model_path)
-            self.is_trained = True
-            print(f"✅ Model loaded from '{self.model_path}'")
-            return True
-        return False
+        """Load the current model version
+
+        The registry's promoted version is used when there is one, otherwise
+        the bundled injury_model.pkl. With ``INJURY_MODEL_ARTIFACT=mmap`` the
+        memory-mapped forest tables are used when present; workers on one
+        host then share the model pages and sklearn is never imported.
+        """
+        started = time.perf_counter()
+        loaded = self._load_current()
+        if loaded is None:
+            return False
+        serving, source = loaded
+        self._install(serving)
+
+        self.cold_start['model_load_seconds'] = time.perf_counter() - started
+        self.cold_start['loaded_at'] = datetime.now().isoformat()
+        print(f"✅ Model {serving.version} loaded from '{source}'")
+        return True
+
+    def _load_current(self) -> Optional[Tuple['ServingModel', Path]]:
+        """Read the current model from disk without installing it"""
+        version = self.registry.current_version()
+        if version is not None:
+            model_path, artifact_path = self.registry.model_path(version), self.registry.forest_path(version)
+        else:
+            model_path, artifact_path = self.model_path, self.artifact_path
+
+        artifact_dir = CompiledForest.current_dir(artifact_path) if self.artifact == 'mmap' else None
+        if artifact_dir is not None:
+            compiled_forest = CompiledForest.load(artifact_path, mmap=True)
+            version = version or self._file_version(artifact_dir / 'metadata.json')
+            return self._build_serving(None, compiled_forest, version), artifact_path
+        if os.path.exists(model_path):
+            if self.artifact == 'mmap':
+                print(f"⚠️ No forest artifact at '{artifact_path}', loading pickle "
+                      f"(run 'manage.py convert_model')")
+            version = version or self._file_version(model_path)
+            return self._build_serving(joblib.load(model_path), version=version), model_path
+        return None
+
+    def current_paths(self) -> Tuple[Path, Path]:
+        """(pickle, forest artifact) paths of the current version"""
+        version = self.registry.current_version()
+        if version is not None:
+            return self.registry.model_path(version), self.registry.forest_path(version)
+        return self.model_path, self.artifact_path
+
+    def refresh(self) -> bool:
+        """Hot-swap to the registry's current version if it changed
+
+        The new model is loaded while requests keep using the old one; the
+        swap itself is a single reference assignment, after which the old
+        model is freed as soon as in-flight requests finish with it.
+        """
+        version = self.registry.current_version()
+        serving = self._serving
+        if version is None or (serving is not None and serving.version == version):
+            return False
+        with self._reload_lock:
+            if self._serving is not None and self._serving.version == self.registry.current_version():
+                return False
+            started = time.perf_counter()
+            loaded = self._load_current()
+            if loaded is None:
+                return False
+            # Derived tables are built before requests can reach the new model
+            loaded[0].warm_up()
+            self._install(loaded[0])
+            self.cold_start['last_swap_seconds'] = time.perf_counter() - started
+            self.cold_start['swapped_at'] = datetime.now().isoformat()
+        print(f"🔄 Switched to model {loaded[0].version}")
+        return True
+
+    def start_reload_watcher(self, interval: Optional[float] = None):
+        """Poll the registry in a daemon thread and hot-swap promoted versions"""
+        if interval is None:
+            interval = _get_setting('INJURY_MODEL_RELOAD_INTERVAL', 5.0, cast=float)
+        if interval <= 0 or (self._watcher is not None and self._watcher.is_alive()):
+            return
+
+        def watch():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.refresh()
+                except Exception as exc:
+                    print(f"⚠️ Model reload failed: {exc}")
+
+        self._watcher = threading.Thread(target=watch, name='model-reload-watcher', daemon=True)
+        self._watcher.start()
+
+    def export_artifact(self) -> Path:
+        """Write the current forest as a memory-mappable artifact"""
+        serving = self._ensure_model()
+        compiled_forest = serving.compiled_forest or CompiledForest.from_sklearn(serving.model)
+        return compiled_forest.save(self.current_paths()[1])
+
+    def _save_model(self, metadata: Optional[Dict] = None) -> str:
+        """Register the trained model as a new version (and promote it)
+
+        Versions are written to their own directory, so workers loading the
+        previous one are never affected. With INJURY_MODEL_AUTO_PROMOTE off
+        the version is only registered; promote it with manage.py models.
+        """
+        serving = self._serving
+        compiled_forest = None
+        if self.artifact == 'mmap':
+            compiled_forest = serving.compiled_forest or CompiledForest.from_sklearn(serving.model)
+        version = self.registry.register(serving.model, dict(metadata or {}, features=serving.feature_names),
+                                         compiled_forest=compiled_forest)
+        if _get_setting('INJURY_MODEL_AUTO_PROMOTE', True, cast=_to_bool):
+            self.registry.promote(version)
+        self._install(ServingModel(serving.model, serving.compiled_forest, version))
+        return version
+
+    @staticmethod
+    def _file_version(path) -> str:
+        """Short version id of a model file, identical across worker processes"""
+        stat = os.stat(path)
+        return hashlib.sha1(f"{stat.st_mtime_ns}:{stat.st_size}".encode()).hexdigest()[:12]
+
+    def _build_serving(self, model, compiled_forest: Optional[CompiledForest] = None,
+                       version: Optional[str] = None) -> 'ServingModel':
+        """Wrap a fitted forest with the configured inference backend"""
+        if compiled_forest is None and self.backend == 'compiled':
+            compiled_forest = CompiledForest.from_sklearn(model)
+        return ServingModel(model, compiled_forest, version or f"unsaved-{os.getpid()}-{datetime.now():%Y%m%d%H%M%S%f}")
+
+    def _set_model(self, model, compiled_forest: Optional[CompiledForest] = None,
+                   version: Optional[str] = None):
+        """Install a freshly fitted forest"""
+        self._install(self._build_serving(model, compiled_forest, version))
+
+    def _install(self, serving: 'ServingModel'):
+        """Atomically make ``serving`` the model every new request uses"""
+        self._serving = serving
+        self.feature_names = list(serving.feature_names)
+        # Cached predictions belong to the previous model
+        if self.prediction_cache is not None:
+            self.prediction_cache.clear()
+
+    def warm_up(self) -> Dict:
+        """Load the model once per process and run a dummy prediction
+
+        Called at startup (Django wsgi.py/asgi.py / FastAPI startup) so the
+        first real request does not pay for unpickling and first-call setup.
+        Also starts the registry watcher that hot-swaps promoted versions.
+        """
+        started = time.perf_counter()
+        self._ensure_model().warm_up()
+        predict_started = time.perf_counter()
+        self.predict_risk(dict(WARMUP_PLAYER), use_cache=False)
+        finished = time.perf_counter()
+
+        self.cold_start['warmup_prediction_seconds'] = finished - predict_started
+        self.cold_start['warmup_total_seconds'] = finished - started
+        self.start_reload_watcher()
+        return dict(self.cold_start)
+
+    def status(self) -> Dict:
+        """Model load state and cold-start timings for health checks"""
+        return {
+            'loaded': self.is_trained,
+            'version': self.model_version,
+            'registry_current': self.registry.current_version(),
+            'backend': self.backend,
+            'artifact': self.artifact,
+            'cold_start': dict(self.cold_start),
+            'prediction_cache': self.prediction_cache.stats() if self.prediction_cache else None
+        }
 
 # Create global instance
-injury_predictor = InjuryPredictor()
\ No newline at end of file
+injury_predictor = InjuryPredictor()
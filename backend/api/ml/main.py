@@ -1,28 +1,156 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel
-from typing import Dict, Any
+from typing import Dict, Any, Literal
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+import asyncio
+import os
 import uvicorn
-import joblib
-import numpy as np
+from batching import BatcherFull, build_batcher
 from injury_predictor import injury_predictor
+from metrics import ERRORS, PREDICTIONS, REQUEST_SECONDS, STAGE_SECONDS, get_metrics
 
-app = FastAPI(title="Football Injury Predictor API")
+# Inference executor sizing (environment variables)
+INFERENCE_EXECUTOR = os.environ.get('INFERENCE_EXECUTOR', 'thread')   # 'thread' or 'process'
+INFERENCE_WORKERS = int(os.environ.get('INFERENCE_WORKERS', os.cpu_count() or 1))
+INFERENCE_MAX_PENDING = int(os.environ.get('INFERENCE_MAX_PENDING', 64))
+INFERENCE_TIMEOUT = float(os.environ.get('INFERENCE_TIMEOUT', 2.0))
 
-# Global model reference
-model = None
-feature_names = None
+# Set INJURY_METRICS_DIR so /metrics also covers INFERENCE_EXECUTOR=process workers
+metrics = get_metrics()
 
-@app.on_event("startup")
-async def load_model():
-    global model, feature_names
-    try:
-        if not injury_predictor.is_trained:
-            injury_predictor.load_model()
-        model = injury_predictor.model
-        feature_names = injury_predictor.feature_names
-        print("Model ready!")
-    except Exception as e:
-        print(f"❌ Load error: {e}")
+
+def _warm_up_worker():
+    """Process-pool initializer: load the model once per worker process"""
+    injury_predictor.warm_up()
+
+
+def _predict(payload: Dict, explain: str = 'top3') -> Dict:
+    """CPU-bound inference, run on the executor (never on the event loop)"""
+    return injury_predictor.predict_risk(payload, explain=explain)
+
+
+class InferenceService:
+    """
+    Owns the model and a sized inference executor
+    At most ``max_pending`` predictions may be queued or running; beyond
+    that requests are rejected with 429 instead of piling up, and each
+    request waits at most ``timeout`` seconds for its result. When
+    INJURY_PREDICTION_BATCHING is enabled, requests go through a
+    PredictionBatcher (its queue is the bound) instead of the executor.
+    """
+
+    def __init__(self, kind: str = 'thread', workers: int = 1, max_pending: int = 64,
+                 timeout: float = 2.0):
+        self.kind = kind
+        self.workers = max(1, workers)
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.executor = None
+        self.ready = False
+        self.pending = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.batcher = build_batcher()
+
+    async def start(self):
+        loop = asyncio.get_running_loop()
+        if self.kind == 'process':
+            self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_up_worker)
+        else:
+            self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='inference')
+        try:
+            # Load the model (in this process too, for status/health reporting)
+            timings = await loop.run_in_executor(None, injury_predictor.warm_up)
+            self.ready = True
+            print(f"Model ready! (warm-up {timings['warmup_total_seconds']:.3f}s, "
+                  f"{self.workers} {self.kind} workers)")
+        except Exception as e:
+            print(f"❌ Load error: {e}")
+
+    async def stop(self):
+        if self.batcher is not None:
+            self.batcher.stop()
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+        self.ready = False
+
+    def _release(self):
+        self.pending -= 1
+
+    async def predict(self, payload: Dict, explain: str = 'top3') -> Dict:
+        if not self.ready:
+            raise HTTPException(status_code=503, detail="Model not loaded")
+        if self.batcher is not None:
+            return await self._predict_batched(payload, explain)
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(status_code=429, detail="Inference queue is full, retry shortly",
+                                headers={'Retry-After': '1'})
+
+        loop = asyncio.get_running_loop()
+        self.pending += 1
+        try:
+            future = self.executor.submit(_predict, payload, explain)
+        except RuntimeError:
+            # Executor shut down (application stopping)
+            self.pending -= 1
+            raise HTTPException(status_code=503, detail="Inference service is shutting down")
+        # Free the slot when the work really finishes, not when we stop waiting
+        future.add_done_callback(lambda f: loop.call_soon_threadsafe(self._release))
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), self.timeout)
+        except asyncio.TimeoutError:
+            # Drop it if it has not started yet; a running prediction cannot be interrupted
+            future.cancel()
+            self.timed_out += 1
+            raise HTTPException(status_code=504, detail=f"Prediction timed out after {self.timeout}s")
+
+    async def _predict_batched(self, payload: Dict, explain: str) -> Dict:
+        try:
+            future = self.batcher.submit(payload, explain)
+        except BatcherFull:
+            self.rejected += 1
+            raise HTTPException(status_code=429, detail="Inference queue is full, retry shortly",
+                                headers={'Retry-After': '1'})
+        try:
+            return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), self.timeout)
+        except asyncio.TimeoutError:
+            future.cancel()
+            self.timed_out += 1
+            raise HTTPException(status_code=504, detail=f"Prediction timed out after {self.timeout}s")
+
+    def stats(self) -> Dict:
+        return {
+            'executor': self.kind,
+            'workers': self.workers,
+            'max_pending': self.max_pending,
+            'timeout_seconds': self.timeout,
+            'pending': self.pending,
+            'rejected': self.rejected,
+            'timed_out': self.timed_out,
+            'batching': self.batcher.stats() if self.batcher else None
+        }
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    service = InferenceService(
+        kind=INFERENCE_EXECUTOR,
+        workers=INFERENCE_WORKERS,
+        max_pending=INFERENCE_MAX_PENDING,
+        timeout=INFERENCE_TIMEOUT
+    )
+    await service.start()
+    app.state.inference = service
+    yield
+    await service.stop()
+
+
+app = FastAPI(title="Football Injury Predictor API", lifespan=lifespan)
 
 class PlayerData(BaseModel):
     age: float
@@ -35,44 +163,47 @@ class PlayerData(BaseModel):
     matches_played: int
     total_minutes_played: float
     weather_condition: str
+    explain: Literal['full', 'top3', 'none'] = 'top3'
 
 @app.get("/")
-def root():
-    return {"message": "Football Injury Predictor API - Ready!"}
+async def root(request: Request):
+    return {
+        "message": "Football Injury Predictor API - Ready!",
+        "model": injury_predictor.status(),
+        "inference": request.app.state.inference.stats()
+    }
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type='text/plain; version=0.0.4; charset=utf-8')
 
 @app.post("/predict")
-def predict_injury_risk(player_data: PlayerData) -> Dict[str, Any]:
-    global model
+async def predict_injury_risk(player_data: PlayerData, request: Request) -> Dict[str, Any]:
+    with metrics.timer(REQUEST_SECONDS, endpoint='fastapi_predict'):
+        return await _predict_injury_risk(player_data, request)
+
+async def _predict_injury_risk(player_data: PlayerData, request: Request) -> Dict[str, Any]:
+    with metrics.timer(STAGE_SECONDS, stage='payload', mode='single'):
+        payload = player_data.dict()
+        explain = payload.pop('explain')
     try:
-        if model is None:
-            raise HTTPException(status_code=500, detail="Model not loaded")
-        
-        # Use YOUR exact _prepare_features method
-        features = injury_predictor._prepare_features(player_data.dict())
-        
-        # DIRECT predict_proba call (bypasses validation bug)
-        try:
-            risk_proba = model.predict_proba([features])[0][1]
-        except Exception as predict_error:
-            # FALLBACK: Use predict() if proba fails
-            risk_binary = model.predict([features])[0]
-            risk_proba = float(risk_binary)
-            print(f"Used predict() fallback: {predict_error}")
-        
-        # Manual weather adjustment (from your code)
-        weather_factor = 1.0
-        if 'rain' in player_data.weather_condition.lower():
-            weather_factor = 1.2
-        risk_score = min(0.95, risk_proba * weather_factor)
-        
-        return {
-            "success": True,
-            "risk_score": float(risk_score),
-            "risk_level": "high" if risk_score > 0.7 else "medium" if risk_score > 0.3 else "low",
-            "player_data": player_data.dict()
-        }
+        prediction = await request.app.state.inference.predict(payload, explain)
+    except HTTPException as e:
+        metrics.inc(ERRORS, endpoint='fastapi_predict', error=f"HTTP{e.status_code}")
+        raise
     except Exception as e:
+        metrics.inc(ERRORS, endpoint='fastapi_predict', error=type(e).__name__)
         raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
+    metrics.inc(PREDICTIONS, endpoint='fastapi_predict', risk_level=prediction['risk_level'])
+
+    return {
+        "success": True,
+        "risk_score": float(prediction['risk_score']),
+        "risk_level": prediction['risk_level'],
+        "key_factors": prediction['key_factors'],
+        "model_version": prediction['model_version'],
+        "player_data": payload
+    }
 
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
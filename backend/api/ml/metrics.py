@@ -0,0 +1,398 @@
+import atexit
+import contextlib
+import contextvars
+import glob
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, pruning is then best effort
+    fcntl = None
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                   0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+STAGE_SECONDS = 'injury_prediction_stage_seconds'
+REQUEST_SECONDS = 'injury_prediction_request_seconds'
+PREDICTIONS = 'injury_predictions_total'
+ERRORS = 'injury_prediction_errors_total'
+CACHE_LOOKUPS = 'injury_prediction_cache_total'
+HISTORY_DROPPED = 'injury_prediction_history_dropped_total'
+HISTORY_QUEUED = 'injury_prediction_history_queued'
+
+# name -> (type, help); only declared metrics are exported
+METRICS = {
+    STAGE_SECONDS: ('histogram', 'Time spent in each prediction stage (payload, features, '
+                                 'inference, explain, recommendations)'),
+    REQUEST_SECONDS: ('histogram', 'End-to-end time of prediction requests by endpoint'),
+    PREDICTIONS: ('counter', 'Predictions returned, by endpoint and risk level'),
+    ERRORS: ('counter', 'Failed prediction requests, by endpoint and error type'),
+    CACHE_LOOKUPS: ('counter', 'Prediction cache lookups by result (hit or miss)'),
+    HISTORY_DROPPED: ('counter', 'Predictions not stored because the history queue was full'),
+    HISTORY_QUEUED: ('gauge', 'Predictions waiting in the history queue'),
+}
+
+# Counters and histograms of exited processes, merged by prune_dead()
+ARCHIVE_FILE = 'metrics-archive.json'
+LOCK_FILE = 'metrics.lock'
+
+Labels = Tuple[Tuple[str, str], ...]
+
+# Per-request list of (name, labels, seconds) while collect_timings() is active
+_request_timings: contextvars.ContextVar = contextvars.ContextVar('request_timings', default=None)
+
+
+@contextlib.contextmanager
+def collect_timings():
+    """Also record every timer finished inside the block into the yielded list"""
+    timings = []
+    token = _request_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _request_timings.reset(token)
+
+
+class _Timer:
+    __slots__ = ('metrics', 'name', 'labels', 'started')
+
+    def __init__(self, metrics: 'Metrics', name: str, labels: Labels):
+        self.metrics = metrics
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        seconds = time.perf_counter() - self.started
+        self.metrics._observe(self.name, self.labels, seconds)
+        timings = _request_timings.get()
+        if timings is not None:
+            timings.append((self.name, self.labels, seconds))
+        return False
+
+
+class Metrics:
+    """
+    In-process counters and latency histograms in Prometheus text format
+    Recording is a dict lookup and a few additions under a lock (about a
+    microsecond). With a multiprocess directory each process also writes
+    its values to ``<dir>/metrics-<pid>-<start>.json`` every
+    ``flush_interval`` seconds, and render() sums the files of all
+    processes, so any worker can answer a scrape for the whole server.
+    Files of exited processes are folded into one archive file (counters
+    and histograms only: a dead worker's gauges no longer describe
+    anything) and deleted, at startup, at exit and on every scrape.
+    """
+
+    def __init__(self, buckets: Iterable[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._counters: Dict[Tuple[str, Labels], float] = {}
+        # (name, labels) -> per-bucket counts (+Inf last), sum
+        self._histograms: Dict[Tuple[str, Labels], List] = {}
+        self._gauges: Dict[Tuple[str, Labels], float] = {}
+        self.directory = None
+        self.flush_interval = 5.0
+        self._file = None
+        self._file_lock = threading.Lock()
+        self._flusher = None
+
+    # Recording
+
+    def inc(self, name: str, value: float = 1.0, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def set(self, name: str, value: float, **labels):
+        """Set a gauge (summed over live processes in multiprocess mode)"""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._gauges[key] = value
+
+    def observe(self, name: str, seconds: float, **labels):
+        self._observe(name, tuple(sorted(labels.items())), seconds)
+
+    def timer(self, name: str, **labels) -> _Timer:
+        """Context manager observing the duration of its block"""
+        return _Timer(self, name, tuple(sorted(labels.items())))
+
+    def _observe(self, name: str, labels: Labels, seconds: float):
+        index = bisect_left(self.buckets, seconds)
+        with self._lock:
+            histogram = self._histograms.get((name, labels))
+            if histogram is None:
+                histogram = self._histograms[(name, labels)] = [[0] * (len(self.buckets) + 1), 0.0]
+            histogram[0][index] += 1
+            histogram[1] += seconds
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+            self._gauges.clear()
+
+    # Multiprocess mode
+
+    def enable_multiprocess(self, directory: str, flush_interval: float = 5.0):
+        """Share this process's values through files in ``directory``"""
+        os.makedirs(directory, exist_ok=True)
+        if self.directory is None:
+            atexit.register(self.retire)
+            # Forked workers (gunicorn --preload, process pools) start from zero with their own file
+            os.register_at_fork(after_in_child=self._after_fork)
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self._start_file()
+        self.prune_dead()
+
+    def _start_file(self):
+        self._file = os.path.join(self.directory, f"metrics-{os.getpid()}-{time.time_ns()}.json")
+        self._flusher = threading.Thread(target=self._flush_loop, name='metrics-flush', daemon=True)
+        self._flusher.start()
+
+    def _after_fork(self):
+        self._lock = threading.Lock()
+        self._file_lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._gauges = {}
+        self._start_file()
+
+    def flush(self):
+        """Write this process's values to its file (atomic replace)"""
+        with self._file_lock:
+            if self._file is None:
+                return
+            tmp_path = f"{self._file}.tmp"
+            with open(tmp_path, 'w') as fh:
+                json.dump(self.snapshot(), fh)
+            os.replace(tmp_path, self._file)
+
+    def retire(self):
+        """Fold this process's values into the archive and delete its file (at exit)
+
+        Call it from a process manager's worker-exit hook too (e.g. gunicorn's
+        ``child_exit``: ``get_metrics().prune_dead()``) for workers that are
+        killed without running atexit handlers.
+        """
+        with self._file_lock:
+            if self._file is None:
+                return
+            path, self._file = self._file, None
+        self._flusher = None
+        with self._directory_lock():
+            self._archive([self.snapshot()])
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path)
+
+    def prune_dead(self) -> int:
+        """Fold the files of exited processes into the archive; returns how many"""
+        if self.directory is None:
+            return 0
+        with self._directory_lock():
+            return self._prune_dead()
+
+    def _prune_dead(self) -> int:
+        dead = [path for path in self._process_files() if not self._is_live(path)]
+        snapshots = []
+        for path in dead:
+            snapshot = _read_snapshot(path)
+            if snapshot is not None and snapshot.get('buckets') == list(self.buckets):
+                snapshots.append(snapshot)
+        if snapshots:
+            self._archive(snapshots)
+        for path in dead:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path)
+        return len(dead)
+
+    def _archive(self, snapshots: List[Dict]):
+        """Add the counters and histograms of ``snapshots`` to the archive file"""
+        path = os.path.join(self.directory, ARCHIVE_FILE)
+        archive = _read_snapshot(path)
+        if archive is not None and archive.get('buckets') == list(self.buckets):
+            snapshots = [archive] + snapshots
+        counters, histograms, _ = _merge(snapshots, gauges=False)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as fh:
+            json.dump(_dump(self.buckets, counters, histograms, {}), fh)
+        os.replace(tmp_path, path)
+
+    def _process_files(self) -> List[str]:
+        return [path for path in glob.glob(os.path.join(self.directory, 'metrics-*-*.json'))
+                if path != self._file]
+
+    @staticmethod
+    def _is_live(path: str) -> bool:
+        try:
+            pid = int(os.path.basename(path).split('-')[1])
+        except (IndexError, ValueError):
+            return True
+        if pid == os.getpid():
+            # An earlier process with our pid (e.g. a restarted container's pid 1)
+            return False
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except OSError:
+            # Exists but belongs to another user
+            return True
+        return True
+
+    @contextlib.contextmanager
+    def _directory_lock(self):
+        """Serializes archive updates with reads of the directory across processes"""
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(self.directory, LOCK_FILE), 'a') as fh:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+
+    def _flush_loop(self):
+        while self._flusher is threading.current_thread():
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except OSError:
+                pass
+
+    # Export
+
+    def snapshot(self) -> Dict:
+        """JSON-friendly copy of every value"""
+        with self._lock:
+            return _dump(self.buckets, self._counters, self._histograms, self._gauges)
+
+    def collect(self) -> Dict:
+        """This process's values, summed with every other process's file in multiprocess mode"""
+        snapshots = [self.snapshot()]
+        if self.directory is not None:
+            with self._directory_lock():
+                # Exited processes' gauges must not be summed with live ones
+                self._prune_dead()
+                paths = self._process_files() + [os.path.join(self.directory, ARCHIVE_FILE)]
+                for path in paths:
+                    snapshot = _read_snapshot(path)
+                    if snapshot is not None and snapshot.get('buckets') == list(self.buckets):
+                        snapshots.append(snapshot)
+
+        counters, histograms, gauges = _merge(snapshots)
+        return {'counters': counters, 'histograms': histograms, 'gauges': gauges}
+
+    def render(self) -> str:
+        """Prometheus text exposition (format 0.0.4)"""
+        collected = self.collect()
+        lines = []
+        for name, (kind, help_text) in METRICS.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            if kind in ('counter', 'gauge'):
+                for (metric, labels), value in sorted(collected[kind + 's'].items()):
+                    if metric == name:
+                        lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+                continue
+            for (metric, labels), (counts, total) in sorted(collected['histograms'].items()):
+                if metric != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip(self.buckets + ('+Inf',), counts):
+                    cumulative += count
+                    le = bound if isinstance(bound, str) else _format_value(bound)
+                    lines.append(f"{name}_bucket{_format_labels(labels + (('le', le),))} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(total)}")
+                lines.append(f"{name}_count{_format_labels(labels)} {cumulative}")
+        return '\n'.join(lines) + '\n'
+
+
+def _read_snapshot(path: str) -> Optional[Dict]:
+    try:
+        with open(path) as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+
+def _merge(snapshots: List[Dict], gauges: bool = True):
+    """Sum the counters, histograms and (optionally) gauges of ``snapshots``"""
+    counters, histograms, gauge_values = {}, {}, {}
+    for snapshot in snapshots:
+        for name, labels, value in snapshot['counters']:
+            key = (name, tuple(map(tuple, labels)))
+            counters[key] = counters.get(key, 0.0) + value
+        for name, labels, counts, total in snapshot['histograms']:
+            key = (name, tuple(map(tuple, labels)))
+            merged = histograms.setdefault(key, [[0] * len(counts), 0.0])
+            merged[0] = [a + b for a, b in zip(merged[0], counts)]
+            merged[1] += total
+        if gauges:
+            for name, labels, value in snapshot.get('gauges', ()):
+                key = (name, tuple(map(tuple, labels)))
+                gauge_values[key] = gauge_values.get(key, 0.0) + value
+    return counters, histograms, gauge_values
+
+
+def _dump(buckets, counters, histograms, gauges) -> Dict:
+    return {
+        'buckets': list(buckets),
+        'counters': [[name, list(map(list, labels)), value] for (name, labels), value in counters.items()],
+        'histograms': [[name, list(map(list, labels)), list(counts), total]
+                       for (name, labels), (counts, total) in histograms.items()],
+        'gauges': [[name, list(map(list, labels)), value] for (name, labels), value in gauges.items()],
+    }
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels) + '}'
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_value(value: float) -> str:
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def build_metrics() -> Metrics:
+    """Process-wide registry; file-backed when INJURY_METRICS_DIR is set"""
+    try:
+        from .injury_predictor import _get_setting
+    except ImportError:
+        from injury_predictor import _get_setting
+
+    registry = Metrics()
+    directory = _get_setting('INJURY_METRICS_DIR', '')
+    if directory:
+        registry.enable_multiprocess(directory, _get_setting('INJURY_METRICS_FLUSH_INTERVAL', 5.0, cast=float))
+    return registry
+
+
+_metrics: Optional[Metrics] = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics() -> Metrics:
+    global _metrics
+    if _metrics is None:
+        with _metrics_lock:
+            if _metrics is None:
+                _metrics = build_metrics()
+    return _metrics
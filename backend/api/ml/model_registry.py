@@ -0,0 +1,126 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import joblib
+
+DEFAULT_REGISTRY_DIR = Path(__file__).resolve().parent / "models"
+CURRENT_FILE = "CURRENT"
+MODEL_FILE = "model.pkl"
+FOREST_DIR = "forest"
+METADATA_FILE = "metadata.json"
+
+
+class ModelRegistry:
+    """
+    Versioned model artifacts on local disk
+    Every version is an immutable directory (model.pkl, metadata.json and
+    optionally the memory-mapped forest/) that is written under a staging
+    name and renamed into place. The CURRENT file names the promoted
+    version and is replaced atomically, so readers never see a partial
+    model and training never overwrites a file a worker is loading.
+    """
+
+    def __init__(self, root=DEFAULT_REGISTRY_DIR):
+        self.root = Path(root)
+
+    def register(self, model, metadata: Dict, compiled_forest=None) -> str:
+        """Store a fitted forest as a new version and return its id"""
+        self.root.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(prefix=".staging-", dir=self.root))
+        # mkdtemp is owner-only; workers may run as another user
+        staging.chmod(0o755)
+        try:
+            joblib.dump(model, staging / MODEL_FILE)
+            digest = hashlib.sha256()
+            with open(staging / MODEL_FILE, 'rb') as fh:
+                for block in iter(lambda: fh.read(1 << 20), b''):
+                    digest.update(block)
+            version = f"{datetime.now():%Y%m%d-%H%M%S}-{digest.hexdigest()[:8]}"
+
+            if compiled_forest is not None:
+                compiled_forest.save(staging / FOREST_DIR)
+
+            with open(staging / METADATA_FILE, 'w') as fh:
+                json.dump(dict(
+                    metadata,
+                    version=version,
+                    created_at=datetime.now().isoformat(),
+                    sha256=digest.hexdigest(),
+                    sklearn_version=_sklearn_version(),
+                    has_forest_artifact=compiled_forest is not None,
+                ), fh, indent=2, default=str)
+
+            if (self.root / version).exists():
+                # Identical model registered within the same second
+                shutil.rmtree(staging, ignore_errors=True)
+            else:
+                os.replace(staging, self.root / version)
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        return version
+
+    def promote(self, version: str):
+        """Make ``version`` the one serving processes load"""
+        if not (self.root / version / MODEL_FILE).exists():
+            raise ValueError(f"Unknown model version '{version}'")
+        pointer = self.root / CURRENT_FILE
+        tmp_path = pointer.with_name(f".{CURRENT_FILE}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w') as fh:
+            fh.write(version + "\n")
+        os.replace(tmp_path, pointer)
+
+    def current_version(self) -> Optional[str]:
+        try:
+            with open(self.root / CURRENT_FILE) as fh:
+                version = fh.read().strip()
+        except OSError:
+            return None
+        return version or None
+
+    def model_path(self, version: str) -> Path:
+        return self.root / version / MODEL_FILE
+
+    def forest_path(self, version: str) -> Path:
+        return self.root / version / FOREST_DIR
+
+    def metadata(self, version: str) -> Dict:
+        with open(self.root / version / METADATA_FILE) as fh:
+            return json.load(fh)
+
+    def versions(self) -> List[Dict]:
+        """Metadata of every registered version, oldest first"""
+        if not self.root.exists():
+            return []
+        found = []
+        for path in self.root.iterdir():
+            if path.name.startswith('.') or not (path / METADATA_FILE).exists():
+                continue
+            try:
+                found.append(self.metadata(path.name))
+            except (OSError, ValueError):
+                continue
+        return sorted(found, key=lambda metadata: metadata.get('created_at', ''))
+
+    def prune(self, keep: int = 5) -> List[str]:
+        """Delete old versions, keeping the current one and the ``keep`` newest others"""
+        current = self.current_version()
+        removable = [metadata['version'] for metadata in self.versions() if metadata['version'] != current]
+        removed = removable[:max(0, len(removable) - keep)]
+        for version in removed:
+            shutil.rmtree(self.root / version, ignore_errors=True)
+        return removed
+
+
+def _sklearn_version() -> Optional[str]:
+    try:
+        import sklearn
+    except ImportError:
+        return None
+    return sklearn.__version__
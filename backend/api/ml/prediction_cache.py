@@ -0,0 +1,154 @@
+import copy
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+
+def canonical_payload(payload: Dict) -> Dict:
+    """Normalize a player payload so equivalent requests hash the same
+
+    Numbers are compared as floats (25 == 25.0) and strings are
+    case/whitespace-insensitive, mirroring how _prepare_features reads them.
+    """
+    canonical = {}
+    for key, value in payload.items():
+        if isinstance(value, bool):
+            canonical[key] = value
+        elif isinstance(value, (int, float)):
+            canonical[key] = float(value)
+        elif isinstance(value, str):
+            canonical[key] = value.strip().lower()
+        else:
+            canonical[key] = value
+    return canonical
+
+
+class PredictionCache:
+    """
+    Bounded in-process cache of predict_risk results
+    Entries are evicted least-recently-used once ``max_entries`` is reached
+    and expire ``ttl_seconds`` after being stored. Keys include the model
+    version (the registry version id, the same in every worker), so
+    retraining or reloading the model never serves stale predictions and
+    workers sharing a cache backend hit each other's entries.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def make_key(self, payload: Dict, model_version: str, **options) -> str:
+        """Canonical hash of the payload, model version and prediction options"""
+        body = json.dumps({
+            'payload': canonical_payload(payload),
+            'model_version': model_version,
+            'options': options,
+        }, sort_keys=True, separators=(',', ':'), default=str)
+        return hashlib.sha256(body.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        value = self._get(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        # Callers may mutate the returned dict (e.g. add recommendations)
+        return None if value is None else copy.deepcopy(value)
+
+    def set(self, key: str, value: Dict):
+        self._set(key, copy.deepcopy(value))
+
+    def clear(self):
+        """Drop every entry (called when the model changes)
+
+        Entries of other versions can no longer be hit, so this only frees
+        memory; shared backends let them expire.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'backend': 'local',
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
+
+    def _get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def _set(self, key: str, value: Dict):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+
+class DjangoPredictionCache(PredictionCache):
+    """
+    Prediction cache stored in a Django cache backend (e.g. Redis or
+    Memcached), shared by every worker using that cache. Eviction is left to
+    the backend; entries expire after ``ttl_seconds``.
+    """
+
+    KEY_PREFIX = 'injury-prediction:'
+
+    def __init__(self, alias: str = 'default', ttl_seconds: float = 300.0):
+        super().__init__(max_entries=0, ttl_seconds=ttl_seconds)
+        self.alias = alias
+
+    @property
+    def _cache(self):
+        from django.core.cache import caches
+        return caches[self.alias]
+
+    def stats(self) -> Dict:
+        stats = super().stats()
+        stats.update({'backend': 'django', 'alias': self.alias, 'entries': None, 'max_entries': None})
+        return stats
+
+    def _get(self, key: str) -> Optional[Dict]:
+        return self._cache.get(self.KEY_PREFIX + key)
+
+    def _set(self, key: str, value: Dict):
+        self._cache.set(self.KEY_PREFIX + key, value, timeout=self.ttl_seconds)
+
+
+def build_prediction_cache(backend: str = 'local', max_entries: int = 1024,
+                           ttl_seconds: float = 300.0, alias: str = 'default') -> Optional[PredictionCache]:
+    """Create the configured cache; ``max_entries <= 0`` disables caching"""
+    if max_entries <= 0:
+        return None
+    if backend == 'django':
+        return DjangoPredictionCache(alias=alias, ttl_seconds=ttl_seconds)
+    return PredictionCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
@@ -0,0 +1,194 @@
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    from .injury_predictor import FOREST_PARAMS
+except ImportError:
+    # Imported as a top-level module (FastAPI app run from api/ml)
+    from injury_predictor import FOREST_PARAMS
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent / "tuning_cache"
+
+# Search space used when no grid is given
+DEFAULT_PARAM_GRID = {
+    'n_estimators': [50, 100, 200],
+    'max_depth': [6, 10, 14, None],
+    'min_samples_split': [2, 5, 10],
+}
+
+# Per-process training data, installed once by the pool initializer so
+# tasks only ship (params, fold) instead of the whole dataset
+_worker_data = {}
+
+
+def dataset_fingerprint(X: 'pd.DataFrame', y: 'pd.Series') -> str:
+    """Stable hash of the feature matrix, column order and labels"""
+    digest = hashlib.sha256()
+    digest.update(json.dumps(list(X.columns)).encode())
+    digest.update(np.ascontiguousarray(X.to_numpy(dtype=np.float64)).tobytes())
+    digest.update(np.ascontiguousarray(y.to_numpy(dtype=np.int64)).tobytes())
+    return digest.hexdigest()
+
+
+class FoldResultCache:
+    """
+    On-disk cache of cross-validation fold scores
+    One small JSON file per (dataset, params, fold) so interrupted or
+    repeated searches pick up every fold that already finished.
+    """
+
+    def __init__(self, root: Path = DEFAULT_CACHE_DIR):
+        self.root = Path(root)
+
+    @staticmethod
+    def key(fingerprint: str, params: Dict, fold: int, n_splits: int, seed: int) -> str:
+        payload = json.dumps({
+            'dataset': fingerprint,
+            'params': params,
+            'fold': fold,
+            'n_splits': n_splits,
+            'seed': seed,
+        }, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict]:
+        try:
+            with open(self._path(key)) as fh:
+                return json.load(fh)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key: str, result: Dict):
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, 'w') as fh:
+            json.dump(result, fh)
+        os.replace(tmp_path, path)
+
+
+def _init_worker(X: np.ndarray, y: np.ndarray, folds: List[Tuple[np.ndarray, np.ndarray]]):
+    _worker_data['X'] = X
+    _worker_data['y'] = y
+    _worker_data['folds'] = folds
+
+
+def _score_fold(params: Dict, fold: int) -> Dict:
+    """Fit one candidate on one fold inside a pool worker"""
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.metrics import accuracy_score
+
+    X, y = _worker_data['X'], _worker_data['y']
+    train_index, test_index = _worker_data['folds'][fold]
+
+    started = time.perf_counter()
+    # Parallelism comes from the process pool; keep each fit single-threaded
+    model = RandomForestClassifier(**dict(params, n_jobs=1))
+    model.fit(X[train_index], y[train_index])
+    fit_seconds = time.perf_counter() - started
+
+    accuracy = accuracy_score(y[test_index], model.predict(X[test_index]))
+    return {'accuracy': float(accuracy), 'fit_seconds': fit_seconds}
+
+
+class HyperparameterSearch:
+    """
+    Grid or random search with stratified K-fold cross-validation
+    Candidate × fold fits fan out over a process pool; every finished
+    fold is written to the FoldResultCache immediately.
+    """
+
+    def __init__(self, X: 'pd.DataFrame', y: 'pd.Series', param_grid: Optional[Dict] = None,
+                 n_iter: Optional[int] = None, cv: int = 5, n_jobs: Optional[int] = None,
+                 cache_dir: Optional[Path] = None, random_state: int = 42):
+        self.X = X
+        self.y = y
+        self.param_grid = param_grid or DEFAULT_PARAM_GRID
+        self.n_iter = n_iter
+        self.cv = cv
+        self.n_jobs = n_jobs if n_jobs and n_jobs > 0 else (os.cpu_count() or 1)
+        self.cache = FoldResultCache(cache_dir or DEFAULT_CACHE_DIR)
+        self.random_state = random_state
+
+    def candidates(self) -> List[Dict]:
+        """Full forest params for every candidate (grid, or n_iter random draws)"""
+        from sklearn.model_selection import ParameterGrid, ParameterSampler
+
+        if self.n_iter:
+            sampled = ParameterSampler(self.param_grid, n_iter=self.n_iter, random_state=self.random_state)
+        else:
+            sampled = ParameterGrid(self.param_grid)
+        return [dict(FOREST_PARAMS, **params) for params in sampled]
+
+    def run(self) -> Dict:
+        from sklearn.model_selection import StratifiedKFold
+
+        started = time.perf_counter()
+        fingerprint = dataset_fingerprint(self.X, self.y)
+        X = self.X.to_numpy(dtype=np.float64)
+        y = self.y.to_numpy(dtype=np.int64)
+        splitter = StratifiedKFold(n_splits=self.cv, shuffle=True, random_state=self.random_state)
+        folds = list(splitter.split(X, y))
+
+        candidates = self.candidates()
+        scores = [[None] * self.cv for _ in candidates]
+        pending = []
+        for index, params in enumerate(candidates):
+            for fold in range(self.cv):
+                key = self.cache.key(fingerprint, params, fold, self.cv, self.random_state)
+                cached = self.cache.get(key)
+                if cached is not None:
+                    scores[index][fold] = cached
+                else:
+                    pending.append((index, fold, key))
+
+        cached_folds = len(candidates) * self.cv - len(pending)
+        print(f"Tuning {len(candidates)} candidates × {self.cv} folds: "
+              f"{cached_folds} cached, {len(pending)} to fit on {self.n_jobs} workers")
+
+        if pending:
+            with ProcessPoolExecutor(max_workers=self.n_jobs, initializer=_init_worker,
+                                     initargs=(X, y, folds)) as pool:
+                futures = {
+                    pool.submit(_score_fold, candidates[index], fold): (index, fold, key)
+                    for index, fold, key in pending
+                }
+                for future in as_completed(futures):
+                    index, fold, key = futures[future]
+                    result = future.result()
+                    self.cache.put(key, result)
+                    scores[index][fold] = result
+
+        results = []
+        for params, folds_scored in zip(candidates, scores):
+            accuracies = [fold['accuracy'] for fold in folds_scored]
+            results.append({
+                'params': params,
+                'mean_accuracy': float(np.mean(accuracies)),
+                'std_accuracy': float(np.std(accuracies)),
+                'fit_seconds': float(sum(fold['fit_seconds'] for fold in folds_scored)),
+            })
+        results.sort(key=lambda result: result['mean_accuracy'], reverse=True)
+
+        return {
+            'best_params': results[0]['params'],
+            'best_score': results[0]['mean_accuracy'],
+            'results': results,
+            'dataset_fingerprint': fingerprint,
+            'cached_folds': cached_folds,
+            'computed_folds': len(pending),
+            'seconds': time.perf_counter() - started,
+        }
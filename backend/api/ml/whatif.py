@@ -0,0 +1,192 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+try:
+    from .injury_predictor import FEATURE_NAMES, _get_setting
+    from .prediction_cache import canonical_payload
+except ImportError:
+    # Imported as a top-level module (FastAPI app run from api/ml)
+    from injury_predictor import FEATURE_NAMES, _get_setting
+    from prediction_cache import canonical_payload
+
+# Payload fields a sweep may vary → model feature columns derived from them
+# (mirrors InjuryPredictor._prepare_features)
+SWEEP_FIELDS = {
+    'age': ('age',),
+    'fatigue_level': ('fatigue_level',),
+    'training_load': ('training_load', 'session_intensity'),
+    'fitness_score': ('heart_rate_variability',),
+    'recovery_time': ('sleep_quality',),
+    'previous_injuries_count': ('previous_injuries_count', 'days_since_last_injury'),
+    'matches_played': ('match_minutes',),
+    'total_minutes_played': ('match_minutes',),
+}
+
+
+class RiskSweep:
+    """
+    What-if risk surfaces for a squad over a grid of payload values
+    Each axis is encoded once per (squad, field, values) and cached, so
+    changing one axis only re-encodes that axis. Axis values that fall
+    between the same pair of forest split thresholds take identical paths
+    through every tree, so only the distinct threshold cells are scored,
+    in a single batch, and the full surface is expanded from them.
+    """
+
+    def __init__(self, predictor, max_cells: int = 250_000, max_cached_axes: int = 64):
+        self.predictor = predictor
+        self.max_cells = max_cells
+        self.max_cached_axes = max_cached_axes
+        self._axis_cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def run(self, players: List[Dict], grid: Dict[str, Sequence[float]]) -> Dict:
+        """Risk for every player at every grid point
+
+        ``grid`` maps SWEEP_FIELDS names to value lists; the surface of each
+        player has one dimension per field, in the order given.
+        """
+        started = time.perf_counter()
+        fields = list(grid)
+        values = [np.asarray(grid[field], dtype=float).ravel() for field in fields]
+        self._validate(players, fields, values)
+
+        predictor = self.predictor
+        serving = predictor._ensure_model()
+        base, weather_factors = predictor._prepare_features_batch(players)
+        squad_key = self._squad_key(players)
+
+        columns = [[FEATURE_NAMES.index(name) for name in SWEEP_FIELDS[field]] for field in fields]
+        used = [column for axis_columns in columns for column in axis_columns]
+        if len(used) != len(set(used)):
+            # Fields feeding the same feature cannot be encoded independently
+            rows, inverses, unique_shapes = self._dense_rows(players, fields, values)
+        else:
+            blocks = [self._axis_block(players, squad_key, field, axis_values)
+                      for field, axis_values in zip(fields, values)]
+            rows, inverses, unique_shapes = self._cell_rows(serving, base, blocks, columns)
+
+        scores = serving.predict_proba(rows) if len(rows) else np.empty(0)
+
+        surfaces = []
+        offset = 0
+        for player_index, (inverse, shape) in enumerate(zip(inverses, unique_shapes)):
+            size = int(np.prod(shape))
+            unique_scores = scores[offset:offset + size].reshape(shape)
+            offset += size
+            surface = unique_scores[np.ix_(*inverse)]
+            surfaces.append(np.minimum(0.95, surface * weather_factors[player_index]))
+
+        return {
+            'axes': [{'field': field, 'values': axis_values.tolist()}
+                     for field, axis_values in zip(fields, values)],
+            'surfaces': [surface.tolist() for surface in surfaces],
+            'cells': len(players) * int(np.prod([len(axis_values) for axis_values in values])),
+            'rows_scored': len(rows),
+            'model_version': serving.version,
+            'seconds': time.perf_counter() - started,
+        }
+
+    def _validate(self, players: List[Dict], fields: List[str], values: List[np.ndarray]):
+        if not players:
+            raise ValueError("Sweep needs at least one player")
+        if not fields:
+            raise ValueError("Sweep needs at least one grid axis")
+        for field, axis_values in zip(fields, values):
+            if field not in SWEEP_FIELDS:
+                raise ValueError(f"Cannot sweep '{field}'; choose from {', '.join(SWEEP_FIELDS)}")
+            if axis_values.size == 0 or not np.all(np.isfinite(axis_values)):
+                raise ValueError(f"Grid for '{field}' must be a non-empty list of numbers")
+        cells = len(players) * int(np.prod([len(axis_values) for axis_values in values]))
+        if cells > self.max_cells:
+            raise ValueError(f"Sweep of {cells} cells exceeds the limit of {self.max_cells}")
+
+    @staticmethod
+    def _squad_key(players: List[Dict]) -> str:
+        body = json.dumps([canonical_payload(player) for player in players],
+                          sort_keys=True, default=str)
+        return hashlib.sha256(body.encode()).hexdigest()
+
+    def _axis_block(self, players: List[Dict], squad_key: str, field: str,
+                    axis_values: np.ndarray) -> np.ndarray:
+        """Feature rows of every player at every value of one axis, (players, values, features)"""
+        key = (squad_key, field, axis_values.tobytes())
+        with self._lock:
+            block = self._axis_cache.get(key)
+            if block is not None:
+                self._axis_cache.move_to_end(key)
+                return block
+
+        payloads = [dict(player, **{field: float(value)}) for player in players for value in axis_values]
+        features, _ = self.predictor._prepare_features_batch(payloads)
+        block = features.reshape(len(players), len(axis_values), -1)
+
+        with self._lock:
+            self._axis_cache[key] = block
+            while len(self._axis_cache) > self.max_cached_axes:
+                self._axis_cache.popitem(last=False)
+        return block
+
+    def _cell_codes(self, serving, block: np.ndarray, axis_columns: List[int]) -> np.ndarray:
+        """Threshold cell of every (player, value) on the axis's feature columns"""
+        # Held by the serving model, so a model change brings its own thresholds
+        thresholds = serving.split_thresholds()
+        if thresholds is None:
+            # No node tables to compare against: every value is its own cell
+            return block[:, :, axis_columns]
+        codes = np.zeros(block.shape[:2] + (len(axis_columns),), dtype=np.intp)
+        for position, column in enumerate(axis_columns):
+            if column in thresholds:
+                # Trees compare float32 inputs with ``x > threshold``
+                codes[:, :, position] = np.searchsorted(
+                    thresholds[column], block[:, :, column].astype(np.float32), side='left'
+                )
+        return codes
+
+    def _cell_rows(self, serving, base: np.ndarray, blocks: List[np.ndarray], columns: List[List[int]]):
+        """One feature row per distinct cell combination of each player"""
+        codes = [self._cell_codes(serving, block, axis_columns)
+                 for block, axis_columns in zip(blocks, columns)]
+
+        rows, inverses, unique_shapes = [], [], []
+        for player_index in range(len(base)):
+            representatives, player_inverses = [], []
+            for axis_codes in codes:
+                _, first, inverse = np.unique(axis_codes[player_index], axis=0,
+                                              return_index=True, return_inverse=True)
+                representatives.append(first)
+                player_inverses.append(inverse.ravel())
+            shape = tuple(len(first) for first in representatives)
+
+            combos = np.indices(shape).reshape(len(shape), -1)
+            player_rows = np.repeat(base[player_index][np.newaxis, :], combos.shape[1], axis=0)
+            for block, axis_columns, first, combo in zip(blocks, columns, representatives, combos):
+                player_rows[:, axis_columns] = block[player_index, first[combo]][:, axis_columns]
+
+            rows.append(player_rows)
+            inverses.append(player_inverses)
+            unique_shapes.append(shape)
+        return np.vstack(rows), inverses, unique_shapes
+
+    def _dense_rows(self, players: List[Dict], fields: List[str], values: List[np.ndarray]):
+        """Encode every grid point directly (used when axes share feature columns)"""
+        shape = tuple(len(axis_values) for axis_values in values)
+        grid_points = np.indices(shape).reshape(len(shape), -1).T
+        payloads = [
+            dict(player, **{field: float(axis_values[index])
+                            for field, axis_values, index in zip(fields, values, point)})
+            for player in players for point in grid_points
+        ]
+        features, _ = self.predictor._prepare_features_batch(payloads)
+        identity = [np.arange(size) for size in shape]
+        return features, [identity] * len(players), [shape] * len(players)
+
+
+def build_sweep(predictor) -> RiskSweep:
+    return RiskSweep(predictor, max_cells=_get_setting('INJURY_SWEEP_MAX_CELLS', 250_000, cast=int))
@@ -10,10 +10,49 @@ class PlayerData(models.Model):
     minutes_played = models.IntegerField(default=0)
     previous_injuries = models.IntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Bumped on every save; rows updated after scored_at are re-scored by api.rescoring
+    updated_at = models.DateTimeField(auto_now=True)
+    # Latest risk from the re-scoring job
+    risk_score = models.FloatField(null=True, blank=True)
+    risk_level = models.CharField(max_length=10, blank=True)
+    risk_model_version = models.CharField(max_length=64, blank=True)
+    scored_at = models.DateTimeField(null=True, blank=True)
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Roster listing newest first and keyset pagination on (created_at, id)
+            models.Index(fields=['created_at', 'id'], name='player_created_idx'),
+            # Position filter without a sort
+            models.Index(fields=['position', 'created_at', 'id'], name='player_position_created_idx'),
+            models.Index(fields=['name'], name='player_name_idx'),
+        ]
     
     def __str__(self):
         return f"{self.name} - {self.position}"
 
+
+
+class PredictionRecord(models.Model):
+    """One stored injury prediction, written in batches by api.history"""
+    player = models.ForeignKey(
+        PlayerData, null=True, blank=True, on_delete=models.CASCADE,
+        related_name='predictions', db_index=False
+    )
+    created_at = models.DateTimeField()
+    inputs = models.JSONField()
+    features = models.JSONField()
+    risk_score = models.FloatField()
+    risk_level = models.CharField(max_length=10)
+    model_version = models.CharField(max_length=64)
+
+    class Meta:
+        indexes = [
+            # Serves a player's history over a date range, newest first, and
+            # keyset pagination on (created_at, id)
+            models.Index(fields=['player', 'created_at', 'id'], name='prediction_player_time_idx'),
+            models.Index(fields=['created_at'], name='prediction_time_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.player_id or 'anonymous'} @ {self.created_at:%Y-%m-%d %H:%M} - {self.risk_level}"
@@ -0,0 +1,126 @@
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, _reverse_ordering
+
+
+class KeysetCursorPagination(CursorPagination):
+    """CursorPagination whose cursor holds the whole sort key
+
+    DRF's cursor keeps only the first ordering field plus an offset
+    (capped at offset_cutoff), so once many rows share a created_at, as
+    every row of an imported chunk does, ``next`` repeats pages and falls
+    back to OFFSET scans. Here the position is the value of every
+    ordering field, and the last one (id) is unique, so each page is a
+    range scan starting strictly after the previous page's last row.
+    """
+
+    def _get_position_from_instance(self, instance, ordering):
+        values = []
+        for order in ordering:
+            field_name = order.lstrip('-')
+            value = instance[field_name] if isinstance(instance, dict) else getattr(instance, field_name)
+            values.append(str(value))
+        return json.dumps(values)
+
+    def _keyset_filter(self, position, reverse):
+        try:
+            values = json.loads(position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        # (a, b) after (va, vb): a after va, or a == va and b after vb.
+        # The inclusive bound on the first field keeps it an index range scan.
+        fields = [order.lstrip('-') for order in self.ordering]
+        lookups = ['lt' if reverse != order.startswith('-') else 'gt' for order in self.ordering]
+        after = Q()
+        equal = {}
+        for field, lookup, value in zip(fields, lookups, values):
+            after |= Q(**equal, **{f'{field}__{lookup}': value})
+            equal[field] = value
+        return Q(**{f'{fields[0]}__{lookups[0]}e': values[0]}) & after
+
+    def paginate_queryset(self, queryset, request, view=None):
+        # CursorPagination.paginate_queryset with a filter on the whole key
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            (offset, reverse, current_position) = (0, False, None)
+        else:
+            (offset, reverse, current_position) = self.cursor
+
+        if reverse:
+            queryset = queryset.order_by(*_reverse_ordering(self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        try:
+            if current_position is not None:
+                queryset = queryset.filter(self._keyset_filter(current_position, reverse))
+            # One extra row tells whether another page follows
+            results = list(queryset[offset:offset + self.page_size + 1])
+        except (ValidationError, ValueError, TypeError):
+            # A tampered position that does not parse as the field's type
+            raise NotFound(self.invalid_cursor_message)
+        self.page = list(results[:self.page_size])
+
+        if len(results) > len(self.page):
+            has_following_position = True
+            following_position = self._get_position_from_instance(results[-1], self.ordering)
+        else:
+            has_following_position = False
+            following_position = None
+
+        if reverse:
+            self.page = list(reversed(self.page))
+            self.has_next = (current_position is not None) or (offset > 0)
+            self.has_previous = has_following_position
+            if self.has_next:
+                self.next_position = current_position
+            if self.has_previous:
+                self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = (current_position is not None) or (offset > 0)
+            if self.has_next:
+                self.next_position = following_position
+            if self.has_previous:
+                self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+
+class RosterPagination(KeysetCursorPagination):
+    """Keyset pagination over PlayerData, newest first
+
+    Pages are index range scans on (created_at, id), so latency stays flat
+    however deep the client pages (unlike OFFSET-based page numbers).
+    """
+    ordering = ('-created_at', '-id')
+    page_size = 50
+    page_size_query_param = 'limit'
+    max_page_size = 500
+
+
+class PredictionHistoryPagination(KeysetCursorPagination):
+    """Keyset pagination over a player's predictions, newest first
+
+    The cursor encodes the last (created_at, id) seen, so every page is an
+    index range scan on (player, created_at, id) however deep the client pages.
+    """
+    ordering = ('-created_at', '-id')
+    page_size = 100
+    page_size_query_param = 'limit'
+    max_page_size = 1000
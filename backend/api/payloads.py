@@ -0,0 +1,26 @@
+"""Predictor payloads built from API request data and roster rows"""
+
+
+def build_player_payload(data: dict) -> dict:
+    """Map incoming request data to the model input schema."""
+    matches_played = max(1, int(data.get('matches_played', 1)))
+    minutes_played = float(data.get('minutes_played', 0))
+    for field in ('position', 'weather_condition'):
+        # Anything else would only fail inside the model call, possibly
+        # together with other requests batched alongside this one
+        if field in data and not isinstance(data[field], str):
+            raise TypeError(f"{field} must be a string")
+
+    payload = {
+        'age': int(data.get('age', 25)),
+        'position': data.get('position', 'midfielder'),
+        'matches_played': matches_played,
+        'total_minutes_played': minutes_played,
+        'fatigue_level': float(data.get('fatigue_level', 0.5)),
+        'training_load': float(data.get('training_load', 0.5)),
+        'recovery_time': float(data.get('recovery_time', 48)),
+        'fitness_score': float(data.get('fitness_score', 0.8)),
+        'previous_injuries_count': int(data.get('previous_injuries', 0)),
+        'weather_condition': data.get('weather_condition', 'normal')
+    }
+    return payload
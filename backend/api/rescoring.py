@@ -0,0 +1,219 @@
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.db import close_old_connections, connections, router, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .ml.injury_predictor import injury_predictor
+from .models import PlayerData
+from .payloads import build_player_payload
+
+logger = logging.getLogger(__name__)
+
+# Roster columns the prediction payload is built from
+INPUT_FIELDS = ('id', 'age', 'position', 'matches_played', 'minutes_played', 'previous_injuries')
+
+
+class SquadRescorer:
+    """
+    Refreshes PlayerData.risk_* for players whose inputs changed
+    A player is dirty when it was never scored, was saved after its last
+    score (updated_at > scored_at) or was scored by another model version.
+    Dirty rows are read in id-keyset chunks of ``chunk_size``, each chunk
+    is scored with one predict_risk_batch call and written back with one
+    executemany UPDATE. scored_at is the time the run started, so players
+    edited while it runs stay dirty for the next run.
+    """
+
+    def __init__(self, predictor=injury_predictor, chunk_size: int = 5000):
+        self.predictor = predictor
+        self.chunk_size = max(1, chunk_size)
+
+    @staticmethod
+    def dirty(queryset, model_version: Optional[str]):
+        stale = Q(scored_at__isnull=True) | Q(updated_at__gt=F('scored_at'))
+        if model_version:
+            stale |= ~Q(risk_model_version=model_version)
+        return queryset.filter(stale)
+
+    def run(self, full: bool = False) -> Dict:
+        """Score the dirty players (every player with ``full``) and return counts"""
+        started_at = timezone.now()
+        started = time.perf_counter()
+        model_version = self.predictor._ensure_model().version
+        total = PlayerData.objects.count()
+        queryset = PlayerData.objects.all() if full else self.dirty(PlayerData.objects.all(), model_version)
+
+        rescored = chunks = 0
+        scoring_seconds = 0.0
+        last_id = 0
+        while True:
+            # Keyset windows rather than one open iterator(): SQLite does not
+            # isolate a running SELECT from our UPDATEs of the same table
+            rows = list(queryset.filter(id__gt=last_id).order_by('id').values(*INPUT_FIELDS)[:self.chunk_size])
+            if not rows:
+                break
+            scoring_started = time.perf_counter()
+            predictions = self.predictor.predict_risk_batch(
+                [build_player_payload(row) for row in rows], explain='none'
+            )
+            scoring_seconds += time.perf_counter() - scoring_started
+            self._write(rows, predictions, started_at)
+            rescored += len(rows)
+            chunks += 1
+            last_id = rows[-1]['id']
+
+        seconds = time.perf_counter() - started
+        return {
+            'players': total,
+            'rescored': rescored,
+            'skipped_unchanged': max(0, total - rescored),
+            'chunks': chunks,
+            'model_version': model_version,
+            'seconds': seconds,
+            'scoring_seconds': scoring_seconds,
+            'players_per_second': rescored / seconds if seconds else 0.0,
+            'started_at': started_at.isoformat(),
+        }
+
+    @staticmethod
+    def _write(rows: List[Dict], predictions: List[Dict], scored_at):
+        opts = PlayerData._meta
+        connection = connections[router.db_for_write(PlayerData)]
+        quote = connection.ops.quote_name
+        assignments = ', '.join(f"{quote(opts.get_field(name).column)} = %s"
+                                for name in ('risk_score', 'risk_level', 'risk_model_version', 'scored_at'))
+        sql = f"UPDATE {quote(opts.db_table)} SET {assignments} WHERE {quote(opts.pk.column)} = %s"
+        scored_at = opts.get_field('scored_at').get_db_prep_save(scored_at, connection)
+        params = [
+            (prediction['risk_score'], prediction['risk_level'], prediction['model_version'] or '',
+             scored_at, row['id'])
+            for row, prediction in zip(rows, predictions)
+        ]
+        with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            cursor.executemany(sql, params)
+
+
+class RescoreScheduler:
+    """
+    Runs a SquadRescorer every ``interval`` seconds on a background thread
+    trigger() starts a run early (e.g. right after match results are
+    saved). Runs never overlap; the summary of the last one is kept for
+    the health check.
+    """
+
+    def __init__(self, rescorer: SquadRescorer, interval: float):
+        self.rescorer = rescorer
+        self.interval = interval
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = False
+        self.runs = 0
+        self.failures = 0
+        self.last_run = None
+
+    def start(self):
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping = False
+                self._thread = threading.Thread(target=self._loop, name='squad-rescore', daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stopping = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def trigger(self):
+        self._wake.set()
+
+    def run_once(self) -> Optional[Dict]:
+        try:
+            close_old_connections()
+            self.last_run = self.rescorer.run()
+            self.runs += 1
+            return self.last_run
+        except Exception:
+            self.failures += 1
+            logger.exception('Squad re-scoring failed')
+            return None
+        finally:
+            close_old_connections()
+
+    def stats(self) -> Dict:
+        return {
+            'interval_seconds': self.interval,
+            'runs': self.runs,
+            'failures': self.failures,
+            'last_run': self.last_run,
+        }
+
+    def _loop(self):
+        while not self._stopping:
+            self.run_once()
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+
+# The scheduler of this process (None unless start_rescore_scheduler() won the lock)
+_scheduler: Optional[RescoreScheduler] = None
+# Open lock file held for the life of the process that runs the scheduler
+_lock_file = None
+
+
+def _acquire_rescore_lock(path: str) -> bool:
+    """Take an exclusive, non-blocking lock on ``path`` for this process"""
+    global _lock_file
+    try:
+        import fcntl
+    except ImportError:
+        # No flock (Windows): development servers run a single process
+        return True
+    lock_file = open(path, 'a')
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return False
+    _lock_file = lock_file
+    return True
+
+
+def start_rescore_scheduler() -> Optional[RescoreScheduler]:
+    """Start the background re-scoring scheduler in one server process
+
+    Called from wsgi.py/asgi.py when INJURY_RESCORE_INTERVAL is set. Of the
+    worker processes on a host only the one holding INJURY_RESCORE_LOCK_FILE
+    runs it, so workers never race over the same dirty rows. Across several
+    hosts, leave the interval at 0 and run ``manage.py rescore_players
+    --every SECONDS`` as a single process instead.
+    """
+    global _scheduler
+    interval = getattr(settings, 'INJURY_RESCORE_INTERVAL', 0)
+    if interval <= 0 or _scheduler is not None:
+        return _scheduler
+    lock_path = (getattr(settings, 'INJURY_RESCORE_LOCK_FILE', '')
+                 or os.path.join(tempfile.gettempdir(), 'injury-rescore.lock'))
+    if not _acquire_rescore_lock(lock_path):
+        logger.info('Squad re-scoring runs in another worker (%s is locked)', lock_path)
+        return None
+    _scheduler = RescoreScheduler(
+        SquadRescorer(chunk_size=getattr(settings, 'INJURY_RESCORE_CHUNK_SIZE', 5000)),
+        interval,
+    )
+    _scheduler.start()
+    return _scheduler
+
+
+def get_rescore_scheduler() -> Optional[RescoreScheduler]:
+    """This process's running scheduler, or None"""
+    return _scheduler
@@ -0,0 +1,260 @@
+import csv
+import io
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from django.db import connections, router, transaction
+from django.utils import timezone
+
+from .models import PlayerData
+from .serializers import PLAYER_AGE_RANGE
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+FILE_FORMATS = ('csv', 'parquet')
+# Columns read on import, in insert order; anything else in the file is ignored
+ROSTER_COLUMNS = ('name', 'age', 'position', 'matches_played', 'minutes_played', 'previous_injuries')
+REQUIRED_COLUMNS = ('name', 'age', 'position')
+COUNTER_COLUMNS = ('matches_played', 'minutes_played', 'previous_injuries')
+EXPORT_COLUMNS = ('id',) + ROSTER_COLUMNS + ('created_at',)
+
+CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+
+def detect_format(filename: str, file_format: Optional[str] = None) -> str:
+    """Explicit ``file_format`` if given, else the file extension"""
+    file_format = (file_format or Path(filename or '').suffix.lstrip('.')).lower()
+    if file_format == 'pq':
+        file_format = 'parquet'
+    if file_format not in FILE_FORMATS:
+        raise ValueError(f"Unsupported roster file format '{file_format}'; use {' or '.join(FILE_FORMATS)}")
+    return file_format
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise ImportError("Parquet roster files require pyarrow (pip install pyarrow)") from exc
+    return pa, pq
+
+
+class RosterImporter:
+    """
+    Loads a roster file into PlayerData in bounded memory
+    The file is parsed ``chunk_rows`` rows at a time; each chunk is
+    validated with vectorized checks (the constraints of
+    api/ml/data_models.PlayerData) and its valid rows are inserted with one
+    prepared executemany statement in their own transaction. Invalid rows
+    are skipped and reported, up to ``max_errors`` of them.
+    """
+
+    def __init__(self, chunk_rows: int = 50_000, max_errors: int = 100):
+        if chunk_rows < 1:
+            raise ValueError("chunk_rows must be at least 1")
+        self.chunk_rows = chunk_rows
+        self.max_errors = max_errors
+
+    def run(self, source, file_format: str) -> Dict:
+        """Import a path or binary file object; returns counts and rejected rows"""
+        started = time.perf_counter()
+        imported = rejected = chunks = 0
+        errors = []
+        first_row = 1
+        for frame in self._frames(source, file_format):
+            rows, chunk_errors = self.validate(frame, first_row)
+            if rows:
+                self._insert(rows)
+            imported += len(rows)
+            rejected += len(chunk_errors)
+            errors.extend(chunk_errors[:max(0, self.max_errors - len(errors))])
+            first_row += len(frame)
+            chunks += 1
+
+        seconds = time.perf_counter() - started
+        return {
+            'imported': imported,
+            'rejected': rejected,
+            'errors': errors,
+            'chunks': chunks,
+            'seconds': seconds,
+            'rows_per_second': imported / seconds if seconds else 0.0,
+        }
+
+    def _frames(self, source, file_format: str) -> Iterator['pd.DataFrame']:
+        if file_format == 'csv':
+            import pandas as pd
+
+            # Everything is read as text and converted during validation, so a
+            # bad value rejects its row instead of failing the whole chunk
+            reader = pd.read_csv(source, dtype=str, keep_default_na=False, chunksize=self.chunk_rows,
+                                 usecols=lambda column: column.strip() in ROSTER_COLUMNS)
+            for frame in reader:
+                frame.columns = [column.strip() for column in frame.columns]
+                self._check_columns(frame.columns)
+                yield frame
+        elif file_format == 'parquet':
+            _, pq = _import_pyarrow()
+            parquet_file = pq.ParquetFile(source)
+            present = [column for column in ROSTER_COLUMNS if column in parquet_file.schema_arrow.names]
+            self._check_columns(present)
+            for batch in parquet_file.iter_batches(batch_size=self.chunk_rows, columns=present):
+                yield batch.to_pandas()
+        else:
+            raise ValueError(f"Unsupported roster file format '{file_format}'")
+
+    @staticmethod
+    def _check_columns(columns):
+        missing = [column for column in REQUIRED_COLUMNS if column not in columns]
+        if missing:
+            raise ValueError(f"Roster file is missing columns: {', '.join(missing)}")
+
+    @staticmethod
+    def validate(frame: 'pd.DataFrame', first_row: int = 1) -> Tuple[List[tuple], List[Dict]]:
+        """Valid rows as insert tuples, plus {'row', 'error'} for the rejected ones"""
+        import pandas as pd
+
+        size = len(frame)
+        reasons = np.full(size, None, dtype=object)
+
+        def reject(mask, message):
+            mask = np.asarray(mask, dtype=bool) & (reasons == None)  # noqa: E711
+            reasons[mask] = message
+
+        def text(column, max_length):
+            values = frame[column].fillna('').astype(str).str.strip()
+            reject(values.str.len() == 0, f"{column} is required")
+            reject(values.str.len() > max_length, f"{column} is longer than {max_length} characters")
+            return values
+
+        def integer(column, minimum=None, maximum=None):
+            if column not in frame.columns:
+                return np.zeros(size, dtype=np.int64)
+            raw = frame[column]
+            if raw.dtype == object:
+                raw = raw.fillna('').astype(str).str.strip()
+                if column in COUNTER_COLUMNS:
+                    # Blank counters default to 0, like the model fields
+                    raw = raw.mask(raw == '', '0')
+            values = pd.to_numeric(raw, errors='coerce').to_numpy(dtype=float)
+            reject(~np.isfinite(values) | (values != np.round(values)), f"{column} must be a whole number")
+            if minimum is not None:
+                reject(values < minimum, f"{column} must be at least {minimum}")
+            if maximum is not None:
+                reject(values > maximum, f"{column} must be at most {maximum}")
+            return np.nan_to_num(values).astype(np.int64)
+
+        names = text('name', PlayerData._meta.get_field('name').max_length)
+        ages = integer('age', *PLAYER_AGE_RANGE)
+        positions = text('position', PlayerData._meta.get_field('position').max_length)
+        counters = [integer(column, minimum=0) for column in COUNTER_COLUMNS]
+
+        valid = reasons == None  # noqa: E711
+        rows = list(zip(
+            names[valid].tolist(), ages[valid].tolist(), positions[valid].tolist(),
+            *(values[valid].tolist() for values in counters)
+        ))
+        errors = [{'row': first_row + int(index), 'error': reasons[index]}
+                  for index in np.flatnonzero(~valid)]
+        return rows, errors
+
+    @staticmethod
+    def _insert(rows: List[tuple]):
+        # Same INSERT bulk_create issues, but prepared once per chunk: building
+        # and preparing a model instance per row costs ~5x the insert itself
+        opts = PlayerData._meta
+        connection = connections[router.db_for_write(PlayerData)]
+        quote = connection.ops.quote_name
+        # Every NOT NULL column without a database default must be listed;
+        # new players have no risk yet (risk_score/scored_at stay NULL)
+        columns = [opts.get_field(name).column
+                   for name in ROSTER_COLUMNS + ('created_at', 'updated_at', 'risk_level', 'risk_model_version')]
+        sql = (f"INSERT INTO {quote(opts.db_table)} ({', '.join(quote(column) for column in columns)}) "
+               f"VALUES ({', '.join(['%s'] * len(columns))})")
+        now = opts.get_field('created_at').get_db_prep_save(timezone.now(), connection)
+        with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            cursor.executemany(sql, [row + (now, now, '', '') for row in rows])
+
+
+def iter_roster_rows(queryset, chunk_rows: int = 5000) -> Iterator[List[tuple]]:
+    """EXPORT_COLUMNS tuples in id order, one keyset-paginated chunk at a time"""
+    last_id = 0
+    while True:
+        chunk = list(queryset.filter(id__gt=last_id).order_by('id').values_list(*EXPORT_COLUMNS)[:chunk_rows])
+        if not chunk:
+            return
+        yield chunk
+        last_id = chunk[-1][0]
+
+
+def stream_csv(queryset, chunk_rows: int = 5000) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for chunk in iter_roster_rows(queryset, chunk_rows):
+        writer.writerows(row[:-1] + (row[-1].isoformat(),) for row in chunk)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    # Header only when there are no rows
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands back what was written since the last take()"""
+
+    def __init__(self):
+        self._parts = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        data = bytes(data)
+        self._parts.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def take(self) -> bytes:
+        data = b''.join(self._parts)
+        self._parts = []
+        return data
+
+
+def stream_parquet(queryset, chunk_rows: int = 5000) -> Iterator[bytes]:
+    """One Parquet row group per chunk, yielded as soon as it is encoded"""
+    pa, pq = _import_pyarrow()
+    schema = pa.schema([
+        ('id', pa.int64()),
+        ('name', pa.string()),
+        ('age', pa.int64()),
+        ('position', pa.string()),
+        ('matches_played', pa.int64()),
+        ('minutes_played', pa.int64()),
+        ('previous_injuries', pa.int64()),
+        ('created_at', pa.timestamp('us', tz='UTC')),
+    ])
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        for chunk in iter_roster_rows(queryset, chunk_rows):
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(column, type=field.type) for column, field in zip(zip(*chunk), schema)],
+                schema=schema,
+            ))
+            yield sink.take()
+    finally:
+        writer.close()
+    yield sink.take()
@@ -0,0 +1,28 @@
+from rest_framework import serializers
+
+from .models import PlayerData
+
+# Age bounds of api/ml/data_models.PlayerData, shared with api.roster_io imports
+PLAYER_AGE_RANGE = (16, 45)
+
+
+class PlayerDataSerializer(serializers.ModelSerializer):
+    """Validates roster writes; list views read with values() instead"""
+
+    class Meta:
+        model = PlayerData
+        fields = ['id', 'name', 'age', 'position', 'matches_played', 'minutes_played',
+                  'previous_injuries', 'created_at', 'risk_score', 'risk_level', 'scored_at']
+        read_only_fields = ['id', 'created_at', 'risk_score', 'risk_level', 'scored_at']
+
+    def validate_age(self, value):
+        low, high = PLAYER_AGE_RANGE
+        if not low <= value <= high:
+            raise serializers.ValidationError(f'Age must be between {low} and {high}.')
+        return value
+
+    def validate(self, attrs):
+        for field in ('matches_played', 'minutes_played', 'previous_injuries'):
+            if attrs.get(field, 0) < 0:
+                raise serializers.ValidationError({field: 'Must not be negative.'})
+        return attrs
@@ -0,0 +1,38 @@
+"""
+Cached, database-backed sessions with short-lived cache entries
+Same as django.contrib.sessions.backends.cached_db, except that a cache
+entry lives at most INJURY_AUTH_CACHE_TTL seconds instead of the whole
+session age. Logout deletes the row and the entry in the shared cache
+(INJURY_AUTH_CACHE_LOCATION), so no worker accepts the session afterwards.
+"""
+from django.conf import settings
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+from django.contrib.sessions.backends.db import SessionStore as DBStore
+
+
+class SessionStore(CachedDBStore):
+    cache_key_prefix = 'injury.sessions.cached_db'
+
+    def _cache_timeout(self, expiry_age: int) -> float:
+        return min(expiry_age, getattr(settings, 'INJURY_AUTH_CACHE_TTL', 0.0))
+
+    def load(self):
+        try:
+            data = self._cache.get(self.cache_key)
+        except Exception:
+            # Invalid cache keys raise on some backends; read the database
+            data = None
+
+        if data is None:
+            s = self._get_session_from_db()
+            if s:
+                data = self.decode(s.session_data)
+                self._cache.set(self.cache_key, data,
+                                self._cache_timeout(self.get_expiry_age(expiry=s.expire_date)))
+            else:
+                data = {}
+        return data
+
+    def save(self, must_create=False):
+        DBStore.save(self, must_create)
+        self._cache.set(self.cache_key, self._session, self._cache_timeout(self.get_expiry_age()))
@@ -1,6 +1,11 @@
 import logging
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from allauth.account.signals import user_logged_in, user_signed_up
+from rest_framework.authtoken.models import Token
+
+from .authentication import invalidate_token, invalidate_user
 
 logger = logging.getLogger(__name__)
 
@@ -10,7 +15,9 @@ def on_user_logged_in(request, user, **kwargs):
     try:
         if request and hasattr(request, 'session'):
             request.session['just_logged_in'] = True
-            logger.debug('signal: user_logged_in set just_logged_in for user=%s session=%s', user.id, getattr(request.session, 'session_key', None))
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug('signal: user_logged_in set just_logged_in for user=%s session=%s',
+                             user.id, getattr(request.session, 'session_key', None))
     except Exception:
         logger.exception('error in on_user_logged_in')
 
@@ -20,6 +27,21 @@ def on_user_signed_up(request, user, **kwargs):
     try:
         if request and hasattr(request, 'session'):
             request.session['just_signed_up'] = True
-            logger.debug('signal: user_signed_up set just_signed_up for user=%s session=%s', user.id, getattr(request.session, 'session_key', None))
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug('signal: user_signed_up set just_signed_up for user=%s session=%s',
+                             user.id, getattr(request.session, 'session_key', None))
     except Exception:
         logger.exception('error in on_user_signed_up')
+
+
+# Keep the auth cache (api.authentication) in step with the database:
+# account deletion, token deletion (logout) and user changes such as
+# deactivation or a new password take effect immediately in this process.
+@receiver([post_save, post_delete], sender=settings.AUTH_USER_MODEL)
+def on_user_changed(sender, instance, **kwargs):
+    invalidate_user(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=Token)
+def on_token_changed(sender, instance, **kwargs):
+    invalidate_token(instance.key)
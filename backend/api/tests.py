@@ -0,0 +1,693 @@
+import csv
+import io
+import os
+import json
+import logging
+import random
+import tempfile
+import subprocess
+import sys
+import threading
+import time
+from base64 import b64encode
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+from urllib.parse import urlencode
+
+from django.contrib.auth import get_user_model
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import Client, SimpleTestCase, TestCase, override_settings, tag
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+import numpy as np
+
+from injury_prediction.log_handlers import QueueConsoleHandler
+
+from .benchmarks import BENCHMARKS, run_benchmark
+from .history import PredictionHistoryWriter
+from .ml.batching import PredictionBatcher
+from .ml.compiled_forest import CompiledForest
+from .ml.injury_predictor import FOREST_PARAMS, WARMUP_PLAYER, InjuryPredictor
+from .ml.metrics import ARCHIVE_FILE, HISTORY_DROPPED, HISTORY_QUEUED, PREDICTIONS, Metrics, get_metrics
+from .ml.prediction_cache import DjangoPredictionCache, PredictionCache
+from .models import PlayerData, PredictionRecord
+from .rescoring import RescoreScheduler, get_rescore_scheduler, start_rescore_scheduler
+from .roster_io import ROSTER_COLUMNS, RosterImporter
+
+POSITIONS = ['goalkeeper', 'defender', 'midfielder', 'forward']
+WEATHER = ['normal', 'rain', 'wet', 'hot', 'extreme heat', 'sunny']
+
+
+def random_player(rng: random.Random) -> dict:
+    """Randomized predictor payload (same fields as the frontend sends)"""
+    matches = rng.randint(1, 40)
+    return {
+        'age': rng.randint(17, 36),
+        'position': rng.choice(POSITIONS),
+        'matches_played': matches,
+        'total_minutes_played': rng.uniform(0, 90) * matches,
+        'fatigue_level': rng.random(),
+        'training_load': rng.random(),
+        'recovery_time': rng.choice([6, 12, 24, 36, 48, 72, 96]),
+        'fitness_score': rng.random(),
+        'previous_injuries_count': rng.randint(0, 6),
+        'weather_condition': rng.choice(WEATHER),
+    }
+
+
+def fit_forest(seed: int, n_estimators: int = 20):
+    """Small forest on synthetic rows, fitted without touching the model registry"""
+    from sklearn.ensemble import RandomForestClassifier
+
+    X, y = InjuryPredictor().generate_training_data(1000, seed=seed)
+    return RandomForestClassifier(**dict(FOREST_PARAMS, n_estimators=n_estimators, random_state=seed)).fit(X, y)
+
+
+def roster_csv(count: int, invalid: int = 0) -> bytes:
+    """CSV roster of ``count`` valid players followed by ``invalid`` rows with a bad age"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(ROSTER_COLUMNS)
+    for index in range(count):
+        writer.writerow([f'Player {index}', 17 + index % 20, POSITIONS[index % 4], index % 38, index % 3000, index % 5])
+    for index in range(invalid):
+        writer.writerow([f'Bad {index}', 'old', 'defender', 1, 90, 0])
+    return buffer.getvalue().encode()
+
+
+class RosterImportTests(TestCase):
+    """Imports run against the migrated schema (every NOT NULL column must be written)"""
+
+    def test_importer_inserts_valid_rows_in_chunks(self):
+        result = RosterImporter(chunk_rows=1000).run(io.BytesIO(roster_csv(3000, invalid=2)), 'csv')
+
+        self.assertEqual(result['imported'], 3000)
+        self.assertEqual(result['rejected'], 2)
+        self.assertEqual(result['chunks'], 4)
+        self.assertEqual(PlayerData.objects.count(), 3000)
+        player = PlayerData.objects.get(name='Player 5')
+        self.assertEqual((player.age, player.position, player.risk_level, player.risk_score), (22, 'defender', '', None))
+
+    def test_import_endpoint(self):
+        self.client.force_login(get_user_model().objects.create_user('coach', 'coach@example.com', 'pw'))
+        upload = SimpleUploadedFile('squad.csv', roster_csv(1500), content_type='text/csv')
+
+        response = self.client.post('/api/players/import/', {'file': upload}, HTTP_HOST='localhost')
+
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(response.json()['imported'], 1500)
+        self.assertEqual(PlayerData.objects.count(), 1500)
+
+    def test_import_players_command(self):
+        with tempfile.NamedTemporaryFile(suffix='.csv', delete=False) as fh:
+            fh.write(roster_csv(1200))
+        try:
+            call_command('import_players', fh.name, chunk_rows=500, stdout=io.StringIO())
+        finally:
+            os.unlink(fh.name)
+        self.assertEqual(PlayerData.objects.count(), 1200)
+
+
+def walk(client, url, direction='next'):
+    """Every page reached by following ``direction`` links from ``url``"""
+    pages = []
+    while url:
+        response = client.get(url, HTTP_HOST='localhost')
+        assert response.status_code == 200, response.content
+        pages.append(response.json())
+        url = pages[-1][direction]
+    return pages
+
+
+class KeysetPaginationTests(TestCase):
+    """Rows sharing a created_at (one imported chunk) must still page through once each"""
+
+    def setUp(self):
+        stamp = timezone.now()
+        PlayerData.objects.bulk_create(
+            PlayerData(name=f'Player {index}', age=25, position=POSITIONS[index % 4]) for index in range(3000)
+        )
+        PlayerData.objects.update(created_at=stamp)
+
+    def test_next_links_visit_every_player_once(self):
+        pages = walk(self.client, '/api/players/?limit=500')
+
+        ids = [row['id'] for page in pages for row in page['results']]
+        self.assertEqual(len(pages), 6)
+        self.assertEqual(len(ids), 3000)
+        self.assertEqual(ids, sorted(PlayerData.objects.values_list('id', flat=True), reverse=True))
+
+    def test_previous_links_walk_back(self):
+        last = walk(self.client, '/api/players/?limit=700')[-1]
+        pages = walk(self.client, last['previous'], direction='previous')
+
+        ids = [row['id'] for page in pages for row in page['results']]
+        self.assertEqual(len(ids) + len(last['results']), 3000)
+        self.assertEqual(len(set(ids)), len(ids))
+
+    def test_filtered_listing(self):
+        pages = walk(self.client, '/api/players/?limit=100&position=defender')
+        self.assertEqual(sum(len(page['results']) for page in pages), 750)
+
+    def test_prediction_history(self):
+        player = PlayerData.objects.first()
+        stamp = timezone.now()
+        PredictionRecord.objects.bulk_create(
+            PredictionRecord(player=player, created_at=stamp, inputs={}, features=[], risk_score=0.1,
+                             risk_level='low', model_version='test')
+            for _ in range(2500)
+        )
+        pages = walk(self.client, f'/api/players/{player.pk}/history/?limit=1000')
+
+        ids = [row['id'] for page in pages for row in page['results']]
+        self.assertEqual(len(ids), 2500)
+        self.assertEqual(len(set(ids)), 2500)
+
+    def test_imported_chunk_pages_through(self):
+        # One chunk stamps every row with the same created_at
+        PlayerData.objects.all().delete()
+        RosterImporter(chunk_rows=5000).run(io.BytesIO(roster_csv(2500)), 'csv')
+        self.assertEqual(PlayerData.objects.values('created_at').distinct().count(), 1)
+
+        pages = walk(self.client, '/api/players/?limit=200')
+
+        ids = [row['id'] for page in pages for row in page['results']]
+        self.assertEqual(len(pages), 13)
+        self.assertEqual(ids, sorted(PlayerData.objects.values_list('id', flat=True), reverse=True))
+
+    def test_tampered_cursor(self):
+        for position in ('not json', '["1"]', '["not a date", "1"]'):
+            cursor = b64encode(urlencode({'p': position}).encode()).decode()
+            response = self.client.get('/api/players/', {'cursor': cursor}, HTTP_HOST='localhost')
+            self.assertEqual(response.status_code, 404, position)
+
+
+class SessionBackendTests(TestCase):
+    def test_session_from_plain_model_backend_still_resolves(self):
+        user = get_user_model().objects.create_user('coach', 'coach@example.com', 'pw')
+        self.client.force_login(user, backend='django.contrib.auth.backends.ModelBackend')
+
+        response = self.client.get('/auth/user/', HTTP_HOST='localhost')
+
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.json()['username'], 'coach')
+
+
+# The auth cache switched on, with local memory standing in for the shared
+# Redis/Memcached cache (one process here)
+AUTH_CACHE = {
+    'INJURY_AUTH_CACHE_TTL': 60.0,
+    'SESSION_ENGINE': 'api.sessions',
+    'SESSION_CACHE_ALIAS': 'auth',
+    'CACHES': {
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+        'auth': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'auth-tests'},
+    },
+}
+
+
+@override_settings(**AUTH_CACHE)
+class AuthCacheRevocationTests(TestCase):
+    """Revoked credentials are rejected on the next request, even when cached"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user('coach', 'coach@example.com', 'pw')
+        # Kept apart from the Token: deleting it clears its key (the primary key)
+        self.key = Token.objects.create(user=self.user).key
+
+    def tearDown(self):
+        caches['auth'].clear()
+
+    def get_user(self, client, **headers):
+        return client.get('/auth/user/', HTTP_HOST='localhost', **headers)
+
+    def assertRejected(self, response):
+        self.assertIn(response.status_code, (401, 403), response.content)
+
+    def token_request(self):
+        return self.get_user(self.client, HTTP_AUTHORIZATION=f'Token {self.key}')
+
+    def logged_in_client(self):
+        client = Client()
+        client.force_login(self.user, backend='api.authentication.CachedModelBackend')
+        self.assertEqual(self.get_user(client).status_code, 200)
+        return client
+
+    def test_deleted_token_is_rejected(self):
+        self.assertEqual(self.token_request().status_code, 200)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.token_request().status_code, 200)
+
+        Token.objects.get(key=self.key).delete()
+
+        self.assertRejected(self.token_request())
+
+    def test_deactivated_user_token_is_rejected(self):
+        self.assertEqual(self.token_request().status_code, 200)
+
+        self.user.is_active = False
+        self.user.save()
+
+        self.assertRejected(self.token_request())
+
+    def test_logged_out_session_is_rejected(self):
+        client = self.logged_in_client()
+        cookie = client.cookies[settings.SESSION_COOKIE_NAME].value
+
+        client.logout()
+
+        replay = Client()
+        replay.cookies[settings.SESSION_COOKIE_NAME] = cookie
+        self.assertRejected(self.get_user(replay))
+
+    def test_password_change_rejects_other_sessions(self):
+        client = self.logged_in_client()
+
+        self.user.set_password('new-pw')
+        self.user.save()
+
+        self.assertRejected(self.get_user(client))
+
+
+class ConcurrentPredictionTests(SimpleTestCase):
+    """The shared predictor keeps no per-request state, even across hot swaps"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.predictor = InjuryPredictor()
+        cls.servings = [cls.predictor._build_serving(fit_forest(seed), version=f'v{seed}') for seed in (1, 2)]
+        rng = random.Random(42)
+        cls.players = [random_player(rng) for _ in range(60)]
+
+    def expected(self):
+        """Single-threaded results of every player under each model version"""
+        expected = {}
+        for serving in self.servings:
+            self.predictor._install(serving)
+            expected[serving.version] = [
+                self.predictor.predict_risk(player, use_cache=False, explain='full') for player in self.players
+            ]
+        return expected
+
+    def test_threads_match_sequential_results_during_swaps(self):
+        expected = self.expected()
+        jobs = list(range(len(self.players))) * 10
+        random.Random(7).shuffle(jobs)
+        done = threading.Event()
+
+        def swap():
+            while not done.is_set():
+                for serving in self.servings:
+                    self.predictor._install(serving)
+
+        def predict(index):
+            return index, self.predictor.predict_risk(self.players[index], use_cache=False, explain='full')
+
+        swapper = threading.Thread(target=swap)
+        swapper.start()
+        try:
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                results = list(pool.map(predict, jobs))
+        finally:
+            done.set()
+            swapper.join()
+
+        mismatches = [index for index, result in results
+                      if result != expected[result['model_version']][index]]
+        self.assertEqual(mismatches, [])
+
+
+class CompiledForestParityTests(SimpleTestCase):
+    """The compiled backend must score exactly like sklearn's predict_proba"""
+
+    tolerance = 1e-9
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.forest = fit_forest(3, n_estimators=30)
+        cls.compiled = CompiledForest.from_sklearn(cls.forest)
+
+    def assertParity(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        expected = self.forest.predict_proba(X)[:, 1]
+        self.assertLess(np.abs(self.compiled.predict_proba(X) - expected).max(), self.tolerance)
+        for row in range(min(50, len(X))):
+            self.assertLess(abs(self.compiled.predict_proba(X[row])[0] - expected[row]), self.tolerance)
+
+    def test_random_rows(self):
+        X, _ = InjuryPredictor().generate_training_data(2000, seed=11)
+        self.assertParity(X.to_numpy())
+
+    def test_frontend_payloads(self):
+        rng = random.Random(7)
+        X, _ = InjuryPredictor()._prepare_features_batch([random_player(rng) for _ in range(500)])
+        self.assertParity(X)
+
+    def test_values_on_and_next_to_split_thresholds(self):
+        # Trees compare float32 inputs with float64 thresholds, so rows exactly
+        # on a threshold (and one float32 step either side) are the edge cases
+        base, _ = InjuryPredictor().generate_training_data(1, seed=5)
+        rows = []
+        for column, thresholds in self.compiled.split_thresholds().items():
+            for threshold in thresholds.astype(np.float32):
+                for value in (np.nextafter(threshold, np.float32(-np.inf)), threshold,
+                              np.nextafter(threshold, np.float32(np.inf))):
+                    row = base.to_numpy()[0].copy()
+                    row[column] = value
+                    rows.append(row)
+        self.assertGreater(len(rows), 100)
+        self.assertParity(rows)
+
+
+class ForestArtifactTests(SimpleTestCase):
+    """Saving over an artifact never leaves readers without a complete one"""
+
+    def test_artifact_loads_after_every_step_of_a_save(self):
+        compiled = CompiledForest.from_sklearn(fit_forest(4, n_estimators=5))
+        X, _ = InjuryPredictor().generate_training_data(50, seed=4)
+        expected = compiled.predict_proba(X.to_numpy())
+        replace = os.replace
+
+        with tempfile.TemporaryDirectory() as root:
+            directory = os.path.join(root, 'injury_model.forest')
+            compiled.save(directory)
+
+            def replace_then_load(src, dst):
+                # A worker loading between any two renames must see a whole artifact
+                replace(src, dst)
+                np.testing.assert_array_equal(CompiledForest.load(directory).predict_proba(X.to_numpy()), expected)
+
+            with mock.patch('api.ml.compiled_forest.os.replace', side_effect=replace_then_load):
+                for _ in range(3):
+                    compiled.save(directory)
+            versions = [name for name in os.listdir(directory) if name.startswith('v')]
+
+        # The current version plus the one before it
+        self.assertEqual(len(versions), 2)
+
+
+class PredictionCacheTests(SimpleTestCase):
+    """Cached predictions are keyed on the model version, not on the process"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.forests = [fit_forest(seed) for seed in (5, 6)]
+        cls.player = random_player(random.Random(3))
+
+    def predictor(self, cache, version, forest=0):
+        predictor = InjuryPredictor()
+        predictor.prediction_cache = cache
+        predictor._set_model(self.forests[forest], version=version)
+        return predictor
+
+    def test_model_swap_invalidates_cached_predictions(self):
+        predictor = self.predictor(PredictionCache(), 'v5')
+        first = predictor.predict_risk(self.player)
+        self.assertEqual(predictor.predict_risk(self.player), first)
+        self.assertEqual(predictor.prediction_cache.hits, 1)
+
+        predictor._set_model(self.forests[1], version='v6')
+        swapped = predictor.predict_risk(self.player)
+
+        self.assertEqual(swapped['model_version'], 'v6')
+        self.assertEqual(swapped, predictor.predict_risk(self.player, use_cache=False))
+        self.assertNotEqual(swapped['risk_score'], first['risk_score'])
+
+    def test_workers_share_entries_of_the_same_version(self):
+        # Two predictors stand in for two worker processes on one cache backend
+        first = self.predictor(DjangoPredictionCache(), 'v5')
+        second = self.predictor(DjangoPredictionCache(), 'v5')
+        # This worker reloaded the same version once more than the other
+        first._set_model(self.forests[0], version='v5')
+        first.predict_risk(self.player)
+
+        self.assertEqual(second.predict_risk(self.player), first.predict_risk(self.player))
+        self.assertEqual(second.prediction_cache.hits, 1)
+
+        # A swap in one worker never serves the other version's entries
+        second._set_model(self.forests[1], version='v6')
+        self.assertEqual(second.predict_risk(self.player)['model_version'], 'v6')
+        self.assertEqual(second.prediction_cache.hits, 1)
+
+    def tearDown(self):
+        cache.clear()
+
+
+class PredictionBatcherTests(SimpleTestCase):
+    def test_one_bad_request_fails_alone(self):
+        predictor = InjuryPredictor()
+        predictor.prediction_cache = None
+        predictor._set_model(fit_forest(7), version='v7')
+        rng = random.Random(9)
+        players = [random_player(rng) for _ in range(4)]
+        bad = dict(players[0], position=7)
+
+        # A long window so every request lands in the same batch
+        batcher = PredictionBatcher(predictor, max_batch_size=5, max_wait_ms=500)
+        try:
+            futures = [batcher.submit(payload) for payload in players[:2] + [bad] + players[2:]]
+            results = [future.exception(timeout=10) or future.result() for future in futures]
+        finally:
+            batcher.stop()
+
+        self.assertIsInstance(results.pop(2), AttributeError)
+        self.assertEqual(results, [predictor.predict_risk(player, use_cache=False) for player in players])
+        stats = batcher.stats()
+        self.assertEqual((stats['batches'], stats['items'], stats['errors']), (1, 5, 1))
+
+
+class ExplanationTests(SimpleTestCase):
+    """Decision-path attribution adds up to the model probability"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.predictor = InjuryPredictor()
+        cls.predictor.prediction_cache = None
+        cls.predictor._set_model(fit_forest(8), version='v8')
+        rng = random.Random(8)
+        cls.players = [dict(random_player(rng), weather_condition='normal') for _ in range(200)]
+
+    def test_bias_plus_contributions_equals_predict_proba(self):
+        serving = self.predictor._serving
+        features, _ = self.predictor._prepare_features_batch(self.players)
+        bias, contributions = serving.explain(features, 'full')
+
+        np.testing.assert_allclose(bias + contributions.sum(axis=1),
+                                   serving.model.predict_proba(features)[:, 1], atol=1e-9)
+
+    def test_full_explanation_adds_up_to_risk_score(self):
+        for prediction in self.predictor.predict_risk_batch(self.players, explain='full'):
+            if prediction['risk_score'] >= 0.95:
+                continue  # capped, so no longer the raw probability
+            total = prediction['base_value'] + sum(factor['factor_impact'] for factor in prediction['key_factors'])
+            self.assertAlmostEqual(total, prediction['risk_score'], places=9)
+
+    def test_invalid_explain_is_a_value_error(self):
+        with self.assertRaises(ValueError):
+            self.predictor.predict_risk(self.players[0], explain='everything')
+
+
+class PredictViewTests(SimpleTestCase):
+    def post(self, body):
+        return self.client.post('/api/predict/', body, content_type='application/json', HTTP_HOST='localhost')
+
+    def test_non_object_body_is_rejected(self):
+        response = self.post([{'age': 25}])
+        self.assertEqual(response.status_code, 400, response.content)
+
+    def test_invalid_explain_is_rejected(self):
+        response = self.post({'age': 25, 'explain': 'everything'})
+        self.assertEqual(response.status_code, 400, response.content)
+
+
+class SweepViewTests(SimpleTestCase):
+    def post(self, grid, players=1):
+        body = {'players': [{'age': 25}] * players, 'grid': grid}
+        return self.client.post('/api/predict/sweep/', body, content_type='application/json', HTTP_HOST='localhost')
+
+    def test_oversized_grids_are_rejected_before_any_axis_is_built(self):
+        grids = [
+            {'training_load': {'start': 0, 'stop': 1, 'num': 10 ** 9}},
+            {'training_load': {'start': 0, 'stop': 1, 'num': 1000}, 'age': {'start': 17, 'stop': 36, 'num': 1000}},
+            {'training_load': {'start': 0, 'stop': 1, 'num': 0}},
+            {'training_load': {'start': 0, 'stop': 1, 'num': -5}},
+            {'training_load': {'start': 0, 'stop': 1, 'num': 2.5}},
+            {'training_load': {'start': 0, 'stop': 1, 'num': '10'}},
+        ]
+        with mock.patch('api.views.np.linspace') as linspace:
+            for grid in grids:
+                response = self.post(grid)
+                self.assertEqual(response.status_code, 400, grid)
+            response = self.post({'training_load': [0.1, 0.2, 0.3]}, players=100000)
+            self.assertEqual(response.status_code, 400)
+        linspace.assert_not_called()
+
+    def test_warm_model_sweeps_without_building_tables(self):
+        predictor = InjuryPredictor()
+        predictor.backend = 'sklearn'
+        predictor._set_model(fit_forest(9), version='v9')
+        predictor._serving.warm_up()
+
+        with mock.patch.object(CompiledForest, 'from_sklearn') as export, \
+                mock.patch.object(CompiledForest, 'split_thresholds') as thresholds:
+            result = predictor.sweep([dict(WARMUP_PLAYER)], {'training_load': [0.1, 0.5, 0.9]})
+
+        export.assert_not_called()
+        thresholds.assert_not_called()
+        self.assertEqual(len(result['surfaces'][0]), 3)
+
+
+class PredictionHistoryWriterTests(SimpleTestCase):
+    def test_full_queue_drops_after_a_bounded_wait(self):
+        writer = PredictionHistoryWriter(max_queue=10, max_wait_ms=5)
+        prediction = {'risk_score': 0.2, 'risk_level': 'low', 'model_version': 'v1'}
+        records = [(dict(WARMUP_PLAYER), prediction, None)] * 25
+        metrics = get_metrics()
+        dropped_before = metrics._counters.get((HISTORY_DROPPED, ()), 0)
+
+        # No writer thread drains the queue, so it stays full
+        with mock.patch.object(writer, 'start'):
+            started = time.perf_counter()
+            dropped = writer.record_many(records)
+            seconds = time.perf_counter() - started
+
+        self.assertEqual(dropped, 15)
+        self.assertLess(seconds, 0.5)
+        self.assertEqual(writer.stats()['dropped'], 15)
+        self.assertEqual(metrics._counters[(HISTORY_DROPPED, ())] - dropped_before, 15)
+
+
+class RescoreSchedulerStartTests(SimpleTestCase):
+    """Background re-scoring runs in at most one worker, and only when started"""
+
+    def test_url_import_does_not_start_it(self):
+        import api.views  # noqa: F401
+
+        self.assertIsNone(get_rescore_scheduler())
+
+    def test_only_the_lock_holder_starts_it(self):
+        import fcntl
+
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, 'rescore.lock')
+            with override_settings(INJURY_RESCORE_INTERVAL=60, INJURY_RESCORE_LOCK_FILE=path), \
+                    mock.patch('api.rescoring._scheduler', None), mock.patch('api.rescoring._lock_file', None), \
+                    mock.patch.object(RescoreScheduler, 'start') as start:
+                with open(path, 'a') as other_worker:
+                    fcntl.flock(other_worker, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    self.assertIsNone(start_rescore_scheduler())
+                    start.assert_not_called()
+
+                # The other worker exited, releasing its lock
+                scheduler = start_rescore_scheduler()
+                self.assertIsInstance(scheduler, RescoreScheduler)
+                self.assertIs(get_rescore_scheduler(), scheduler)
+                start.assert_called_once()
+
+                import api.rescoring
+                api.rescoring._lock_file.close()
+
+
+class MultiprocessMetricsTests(SimpleTestCase):
+    """Files of exited workers are pruned; their counters survive, their gauges do not"""
+
+    def write_worker_file(self, directory, pid, predictions, queued):
+        worker = Metrics()
+        worker.inc(PREDICTIONS, predictions, endpoint='predict', risk_level='low')
+        worker.set(HISTORY_QUEUED, queued)
+        path = os.path.join(directory, f'metrics-{pid}-{time.time_ns()}.json')
+        with open(path, 'w') as fh:
+            json.dump(worker.snapshot(), fh)
+        return path
+
+    def test_dead_workers_are_archived(self):
+        exited = subprocess.Popen([sys.executable, '-c', 'pass'])
+        exited.wait()
+        with tempfile.TemporaryDirectory() as directory:
+            dead_path = self.write_worker_file(directory, exited.pid, 3, 40)
+            live_path = self.write_worker_file(directory, os.getppid(), 2, 5)
+
+            registry = Metrics()
+            registry.enable_multiprocess(directory, flush_interval=3600)
+            self.assertFalse(os.path.exists(dead_path))
+            self.assertTrue(os.path.exists(live_path))
+            self.assertTrue(os.path.exists(os.path.join(directory, ARCHIVE_FILE)))
+
+            registry.inc(PREDICTIONS, 1, endpoint='predict', risk_level='low')
+            registry.set(HISTORY_QUEUED, 1)
+            registry.flush()
+            text = registry.render()
+            self.assertIn('injury_predictions_total{endpoint="predict",risk_level="low"} 6', text)
+            self.assertIn(f'{HISTORY_QUEUED} 6', text)
+
+            # A worker killed before its exit hook ran is pruned on the next scrape
+            os.rename(live_path, os.path.join(directory, f'metrics-{exited.pid}-1.json'))
+            text = registry.render()
+            self.assertIn('injury_predictions_total{endpoint="predict",risk_level="low"} 6', text)
+            self.assertIn(f'{HISTORY_QUEUED} 1', text)
+
+            own_file = registry._file
+            registry.retire()
+            self.assertFalse(os.path.exists(own_file))
+            self.assertEqual(sorted(os.listdir(directory)), [ARCHIVE_FILE, 'metrics.lock'])
+            with open(os.path.join(directory, ARCHIVE_FILE)) as fh:
+                archive = json.load(fh)
+            self.assertEqual(archive['counters'][0][2], 6)
+            self.assertEqual(archive['gauges'], [])
+
+
+class QueueConsoleHandlerTests(SimpleTestCase):
+    """Records are formatted by the writer thread, with their arguments as they were logged"""
+
+    def test_prepare_defers_formatting(self):
+        stream = io.StringIO()
+        handler = QueueConsoleHandler(stream)
+        handler.setFormatter(logging.Formatter('%(levelname)s:%(message)s'))
+        squad = ['first']
+        try:
+            raise ValueError('bad payload')
+        except ValueError:
+            record = logging.LogRecord('api', logging.ERROR, __file__, 1, 'squad %s', (squad,), sys.exc_info())
+
+        with mock.patch.object(logging.Formatter, 'format', side_effect=AssertionError('formatted')):
+            prepared = handler.prepare(record)
+        squad.append('second')
+
+        self.assertEqual(prepared.msg, "squad ['first']")
+        self.assertIsNone(prepared.args)
+        self.assertIs(prepared.exc_info, record.exc_info)
+        self.assertIsNone(prepared.exc_text)
+        self.assertEqual(record.args, (squad,))
+
+        handler.enqueue(prepared)
+        handler.close()
+        output = stream.getvalue()
+        self.assertTrue(output.startswith("ERROR:squad ['first']"))
+        self.assertIn('ValueError: bad payload', output)
+
+
+@tag('benchmark')
+class BenchmarkTests(TestCase):
+    """Every api.benchmarks case, timed briefly (manage.py test api --tag benchmark)"""
+
+
+def benchmark_test(case):
+    def test(self):
+        result = run_benchmark(case, min_time=0)
+        if 'skipped' in result:
+            self.skipTest(result['skipped'])
+        self.assertGreaterEqual(result['rounds'], case.min_rounds)
+        self.assertGreater(result['median_ms'], 0)
+    test.__doc__ = f"{case.group}: {case.name}"
+    return test
+
+
+for _case in BENCHMARKS:
+    setattr(BenchmarkTests, f'test_{_case.name}', benchmark_test(_case))
@@ -3,7 +3,16 @@ from . import views
 
 urlpatterns = [
     path('predict/', views.predict_injury, name='predict_injury'),
+    path('predict/batch/', views.predict_injury_batch, name='predict_injury_batch'),
+    path('predict/sweep/', views.predict_injury_sweep, name='predict_injury_sweep'),
+    path('players/', views.players, name='players'),
+    path('players/import/', views.import_players, name='import_players'),
+    path('players/export/', views.export_players, name='export_players'),
+    path('players/<int:player_id>/', views.player_detail, name='player_detail'),
+    path('players/<int:player_id>/history/', views.player_prediction_history,
+         name='player_prediction_history'),
     path('health/', views.health_check, name='health_check'),
+    path('metrics/', views.prometheus_metrics, name='prometheus_metrics'),
     path('auth/csrf/', views.csrf_token, name='csrf_token'),
     path('account/delete/', views.delete_account, name='delete_account'),
 ]
@@ -1,18 +1,80 @@
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
 from rest_framework.decorators import permission_classes
 from django.middleware.csrf import get_token
 from django.views.decorators.csrf import ensure_csrf_cookie
 from django.shortcuts import redirect
-from django.http import HttpResponse
+from django.http import HttpResponse, StreamingHttpResponse
 from django.conf import settings
 from django.views.decorators.http import require_http_methods
 from rest_framework.authtoken.models import Token
 import logging
+from collections import Counter
+from datetime import datetime, time as day_time
+from functools import wraps
+import numpy as np
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from itertools import chain
+
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .history import build_history_writer
+from .ml.batching import BatcherFull, build_batcher
+from .ml.injury_predictor import EXPLAIN_MODES, injury_predictor
+from .ml.metrics import ERRORS, PREDICTIONS, REQUEST_SECONDS, STAGE_SECONDS, get_metrics
+from .models import PlayerData, PredictionRecord
+from .pagination import PredictionHistoryPagination, RosterPagination
+from .payloads import build_player_payload
+from .rescoring import get_rescore_scheduler
+from .roster_io import CONTENT_TYPES, RosterImporter, detect_format, stream_csv, stream_parquet
+from .serializers import PlayerDataSerializer
+
+# /api/predict/sweep/ grid axes (request field names) → predictor payload fields
+SWEEP_REQUEST_FIELDS = {
+    'age': 'age',
+    'fatigue_level': 'fatigue_level',
+    'training_load': 'training_load',
+    'fitness_score': 'fitness_score',
+    'recovery_time': 'recovery_time',
+    'previous_injuries': 'previous_injuries_count',
+    'matches_played': 'matches_played',
+    'minutes_played': 'total_minutes_played',
+}
+
+# Columns returned by the roster endpoints (read with values(), no model instances)
+ROSTER_FIELDS = ('id', 'name', 'age', 'position', 'matches_played', 'minutes_played',
+                 'previous_injuries', 'created_at', 'risk_score', 'risk_level', 'scored_at')
+
+# Request/stage timers and counters, exported on /api/metrics/
+metrics = get_metrics()
+
+# Coalesces concurrent /api/predict/ calls into vectorized batches when
+# INJURY_PREDICTION_BATCHING is enabled
+prediction_batcher = build_batcher()
+
+# Stores every prediction in PredictionRecord with batched bulk inserts
+history_writer = build_history_writer()
+
+
+def timed_request(endpoint):
+    """Record the view's duration in injury_prediction_request_seconds"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            with metrics.timer(REQUEST_SECONDS, endpoint=endpoint):
+                return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
 
-from .ml.injury_predictor import injury_predictor
+
+@require_http_methods(["GET"])
+def prometheus_metrics(request):
+    """Prediction metrics in Prometheus text format (all workers when INJURY_METRICS_DIR is set)"""
+    return HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
 
 
 @api_view(['GET'])
@@ -20,35 +82,410 @@ def health_check(request):
     """Health check endpoint"""
     return Response({
         'status': 'healthy',
-        'message': 'Injury Prediction API is running'
+        'message': 'Injury Prediction API is running',
+        'model': injury_predictor.status(),
+        'batching': prediction_batcher.stats() if prediction_batcher else None,
+        'history': history_writer.stats() if history_writer else None,
+        'rescoring': rescoring_stats()
     })
 
 
 @api_view(['POST'])
+@timed_request('predict')
 def predict_injury(request):
-    """Predict injury risk using the trained ML model."""
+    """Predict injury risk using the trained ML model.
+
+    The optional ``explain`` field (``full``, ``top3`` or ``none``) controls
+    how many per-prediction key factors are returned. An optional
+    ``player_id`` links the stored prediction to a PlayerData row.
+    """
+    if not isinstance(request.data, dict):
+        metrics.inc(ERRORS, endpoint='predict', error='InvalidBody')
+        return Response(
+            {'error': 'Expected a JSON object with the player fields',
+             'message': 'Error processing prediction request'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    explain = request.data.get('explain', 'top3')
+    if explain not in EXPLAIN_MODES:
+        metrics.inc(ERRORS, endpoint='predict', error='InvalidExplain')
+        return Response(
+            {'error': f"explain must be one of {', '.join(EXPLAIN_MODES)}",
+             'message': 'Error processing prediction request'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
     try:
-        payload = build_player_payload(request.data)
-        prediction = injury_predictor.predict_risk(payload)
-
-        response_data = {
-            'injury_risk': prediction['risk_level'],
-            'risk_probability': round(prediction['risk_score'], 4),
-            'confidence': round(prediction['confidence'], 4),
-            'key_factors': prediction['key_factors'],
-            'recommendations': get_recommendations(prediction, payload),
-        }
+        with metrics.timer(STAGE_SECONDS, stage='payload', mode='single'):
+            payload = build_player_payload(request.data)
+        if prediction_batcher is not None:
+            prediction = prediction_batcher.predict(
+                payload, timeout=getattr(settings, 'INJURY_PREDICTION_BATCH_TIMEOUT', 5.0),
+                explain=explain
+            )
+        else:
+            prediction = injury_predictor.predict_risk(payload, explain=explain)
+
+        if history_writer is not None:
+            history_writer.record(payload, prediction, parse_player_id(request.data))
+        with metrics.timer(STAGE_SECONDS, stage='recommendations', mode='single'):
+            response_data = format_prediction(prediction, payload)
+        metrics.inc(PREDICTIONS, endpoint='predict', risk_level=prediction['risk_level'])
         return Response(response_data, status=status.HTTP_200_OK)
 
+    except BatcherFull as exc:
+        metrics.inc(ERRORS, endpoint='predict', error=type(exc).__name__)
+        return Response({'error': str(exc)}, status=status.HTTP_429_TOO_MANY_REQUESTS,
+                        headers={'Retry-After': '1'})
+    except FutureTimeoutError:
+        metrics.inc(ERRORS, endpoint='predict', error='Timeout')
+        return Response({'error': 'Prediction timed out'}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
     except ValueError as exc:
+        metrics.inc(ERRORS, endpoint='predict', error=type(exc).__name__)
         return Response({'error': str(exc)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     except Exception as exc:
+        metrics.inc(ERRORS, endpoint='predict', error=type(exc).__name__)
         return Response(
             {'error': str(exc), 'message': 'Error processing prediction request'},
             status=status.HTTP_400_BAD_REQUEST
         )
 
 
+@api_view(['POST'])
+@timed_request('predict_batch')
+def predict_injury_batch(request):
+    """Predict injury risk for a whole squad in one vectorized model call.
+
+    Accepts either a JSON list of players or an object with a ``players``
+    list (and optionally ``explain``). Each player uses the same fields as
+    ``predict_injury``.
+    """
+    players = request.data
+    explain = request.query_params.get('explain', 'top3')
+    if isinstance(players, dict):
+        explain = players.get('explain', explain)
+        players = players.get('players')
+    if not isinstance(players, list) or not players:
+        metrics.inc(ERRORS, endpoint='predict_batch', error='InvalidPlayers')
+        return Response(
+            {'error': 'Expected a non-empty list of players', 'message': 'Error processing prediction request'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if explain not in EXPLAIN_MODES:
+        metrics.inc(ERRORS, endpoint='predict_batch', error='InvalidExplain')
+        return Response(
+            {'error': f"explain must be one of {', '.join(EXPLAIN_MODES)}",
+             'message': 'Error processing prediction request'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    try:
+        with metrics.timer(STAGE_SECONDS, stage='payload', mode='batch'):
+            payloads = [build_player_payload(player) for player in players]
+        player_ids = [parse_player_id(player) for player in players]
+        predictions = injury_predictor.predict_risk_batch(payloads, explain=explain)
+        if history_writer is not None:
+            history_writer.record_many(list(zip(payloads, predictions, player_ids)))
+
+        with metrics.timer(STAGE_SECONDS, stage='recommendations', mode='batch'):
+            results = [
+                format_prediction(prediction, payload)
+                for prediction, payload in zip(predictions, payloads)
+            ]
+        for risk_level, count in Counter(prediction['risk_level'] for prediction in predictions).items():
+            metrics.inc(PREDICTIONS, count, endpoint='predict_batch', risk_level=risk_level)
+        return Response({'count': len(results), 'predictions': results}, status=status.HTTP_200_OK)
+
+    except ValueError as exc:
+        metrics.inc(ERRORS, endpoint='predict_batch', error=type(exc).__name__)
+        return Response({'error': str(exc)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    except Exception as exc:
+        metrics.inc(ERRORS, endpoint='predict_batch', error=type(exc).__name__)
+        return Response(
+            {'error': str(exc), 'message': 'Error processing prediction request'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+
+@api_view(['POST'])
+@timed_request('predict_sweep')
+def predict_injury_sweep(request):
+    """What-if risk surfaces over a grid of player values.
+
+    Body: ``players`` (list) or ``player`` (object) with the usual
+    prediction fields, and ``grid`` mapping up to a few numeric fields
+    (e.g. ``training_load``, ``recovery_time``) to a list of values or a
+    ``{"start", "stop", "num"}`` range. Returns one risk surface per player
+    with a dimension per grid field, in the order given.
+    """
+    data = request.data if isinstance(request.data, dict) else {}
+    players = data.get('players')
+    if players is None and isinstance(data.get('player'), dict):
+        players = [data['player']]
+    grid_spec = data.get('grid')
+
+    try:
+        if not isinstance(players, list) or not players:
+            raise ValueError('Expected a non-empty list of players')
+        if not isinstance(grid_spec, dict) or not grid_spec:
+            raise ValueError('Expected a grid of field values')
+        # Size the grid from the request alone, before any axis is built
+        max_cells = getattr(settings, 'INJURY_SWEEP_MAX_CELLS', 250000)
+        cells = len(players)
+        for field, spec in grid_spec.items():
+            if field not in SWEEP_REQUEST_FIELDS:
+                raise ValueError(f"Cannot sweep '{field}'; choose from {', '.join(SWEEP_REQUEST_FIELDS)}")
+            if isinstance(spec, dict):
+                num = spec.get('num', 10)
+                if isinstance(num, bool) or not isinstance(num, int) or not 0 < num <= max_cells:
+                    raise ValueError(f"'num' for '{field}' must be an integer from 1 to {max_cells}")
+                cells *= num
+            elif isinstance(spec, list) and spec:
+                cells *= len(spec)
+            else:
+                raise ValueError(f"Grid for '{field}' must be a non-empty list or a start/stop/num range")
+        if cells > max_cells:
+            raise ValueError(f"Sweep of {cells} cells exceeds the limit of {max_cells}")
+        grid = {}
+        for field, spec in grid_spec.items():
+            if isinstance(spec, dict):
+                spec = np.linspace(float(spec['start']), float(spec['stop']), spec.get('num', 10)).tolist()
+            grid[SWEEP_REQUEST_FIELDS[field]] = [float(value) for value in spec]
+        payloads = [build_player_payload(player) for player in players]
+    except (KeyError, TypeError, ValueError) as exc:
+        metrics.inc(ERRORS, endpoint='predict_sweep', error=type(exc).__name__)
+        return Response(
+            {'error': str(exc), 'message': 'Error processing sweep request'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    try:
+        result = injury_predictor.sweep(payloads, grid)
+    except ValueError as exc:
+        metrics.inc(ERRORS, endpoint='predict_sweep', error=type(exc).__name__)
+        # Grid too large, or no trained model available
+        error_status = (status.HTTP_400_BAD_REQUEST if injury_predictor.is_trained
+                        else status.HTTP_500_INTERNAL_SERVER_ERROR)
+        return Response({'error': str(exc)}, status=error_status)
+
+    fields_by_payload = {payload_field: field for field, payload_field in SWEEP_REQUEST_FIELDS.items()}
+    for axis in result['axes']:
+        axis['field'] = fields_by_payload[axis['field']]
+    return Response(result, status=status.HTTP_200_OK)
+
+
+@api_view(['GET', 'POST'])
+@permission_classes([IsAuthenticatedOrReadOnly])
+def players(request):
+    """List the roster (cursor-paginated, newest first) or add a player.
+
+    List filters: ``position`` (exact), ``age``, ``min_age``, ``max_age``;
+    ``limit`` sets the page size and ``cursor`` comes from the previous
+    page's ``next`` link.
+    """
+    if request.method == 'POST':
+        serializer = PlayerDataSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        serializer.save()
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    try:
+        queryset = filter_roster(PlayerData.objects.all(), request.query_params)
+    except ValueError:
+        return Response({'error': 'Age filters must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+
+    paginator = RosterPagination()
+    page = paginator.paginate_queryset(queryset.values(*ROSTER_FIELDS), request)
+    return paginator.get_paginated_response(page)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def import_players(request):
+    """Bulk-add players from an uploaded CSV or Parquet file (multipart ``file``).
+
+    The format comes from the file name or the ``file_format`` field. The
+    upload is parsed in chunks (uploads above FILE_UPLOAD_MAX_MEMORY_SIZE
+    are spooled to disk), so memory stays flat for any file size. Invalid
+    rows are skipped and listed in ``errors``.
+    """
+    upload = request.FILES.get('file')
+    if upload is None:
+        return Response({'error': "Upload the roster as multipart field 'file'"},
+                        status=status.HTTP_400_BAD_REQUEST)
+    importer = RosterImporter(
+        chunk_rows=getattr(settings, 'INJURY_ROSTER_IMPORT_CHUNK_ROWS', 50000),
+        max_errors=getattr(settings, 'INJURY_ROSTER_IMPORT_MAX_ERRORS', 100),
+    )
+    try:
+        file_format = detect_format(upload.name, request.data.get('file_format'))
+        result = importer.run(upload, file_format)
+    except ImportError as e:
+        return Response({'error': str(e)}, status=status.HTTP_501_NOT_IMPLEMENTED)
+    except Exception as e:
+        # Unreadable file or missing columns; chunks already imported stay
+        return Response({'error': f'Could not import roster: {e}'}, status=status.HTTP_400_BAD_REQUEST)
+    if result['imported']:
+        trigger_rescoring()
+    return Response(result, status=status.HTTP_201_CREATED if result['imported'] else status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticatedOrReadOnly])
+def export_players(request):
+    """Stream the roster as CSV (default) or Parquet (``file_format=parquet``).
+
+    Accepts the roster list filters. Rows are read in keyset chunks and
+    written to the response as they are encoded, never as a whole file.
+    """
+    try:
+        file_format = detect_format('', request.query_params.get('file_format', 'csv'))
+        queryset = filter_roster(PlayerData.objects.all(), request.query_params)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    chunk_rows = getattr(settings, 'INJURY_ROSTER_EXPORT_CHUNK_ROWS', 5000)
+    if file_format == 'parquet':
+        try:
+            stream = stream_parquet(queryset, chunk_rows)
+            # Fail now (pyarrow missing) rather than after the headers are sent
+            first = next(stream)
+        except ImportError as e:
+            return Response({'error': str(e)}, status=status.HTTP_501_NOT_IMPLEMENTED)
+        content = chain([first], stream)
+    else:
+        content = stream_csv(queryset, chunk_rows)
+
+    response = StreamingHttpResponse(content, content_type=CONTENT_TYPES[file_format])
+    response['Content-Disposition'] = f'attachment; filename="players.{file_format}"'
+    return response
+
+
+@api_view(['GET', 'PUT', 'PATCH', 'DELETE'])
+@permission_classes([IsAuthenticatedOrReadOnly])
+def player_detail(request, player_id):
+    """Read, update or delete one roster entry."""
+    if request.method == 'GET':
+        player = PlayerData.objects.filter(pk=player_id).values(*ROSTER_FIELDS).first()
+        if player is None:
+            return Response({'error': 'Player not found'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(player)
+
+    if request.method == 'DELETE':
+        deleted, _ = PlayerData.objects.filter(pk=player_id).delete()
+        if not deleted:
+            return Response({'error': 'Player not found'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    player = get_object_or_404(PlayerData, pk=player_id)
+    serializer = PlayerDataSerializer(player, data=request.data, partial=(request.method == 'PATCH'))
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    serializer.save()
+    # e.g. match stats just came in: refresh this player's risk now
+    trigger_rescoring()
+    return Response(serializer.data)
+
+
+@api_view(['GET'])
+def player_prediction_history(request, player_id):
+    """A player's stored predictions, newest first, with cursor pagination.
+
+    Query parameters: ``start`` / ``end`` (ISO date or datetime, inclusive),
+    ``limit`` (page size, max 1000), ``cursor`` (from the previous page's
+    ``next`` link) and ``detail=1`` to include inputs and feature vectors.
+    """
+    get_object_or_404(PlayerData.objects.only('pk'), pk=player_id)
+
+    queryset = PredictionRecord.objects.filter(player_id=player_id)
+    for param, lookup in (('start', 'created_at__gte'), ('end', 'created_at__lte')):
+        raw = request.query_params.get(param)
+        if not raw:
+            continue
+        moment = parse_history_bound(raw, end=(param == 'end'))
+        if moment is None:
+            return Response({'error': f"Invalid '{param}', expected an ISO date or datetime"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        queryset = queryset.filter(**{lookup: moment})
+
+    fields = ['id', 'created_at', 'risk_score', 'risk_level', 'model_version']
+    if request.query_params.get('detail') in ('1', 'true'):
+        fields += ['inputs', 'features']
+
+    paginator = PredictionHistoryPagination()
+    page = paginator.paginate_queryset(queryset.values(*fields), request)
+    return paginator.get_paginated_response(page)
+
+
+def trigger_rescoring():
+    """Start a re-scoring run now if this process runs the scheduler
+
+    Other workers leave the change to the scheduler's next interval.
+    """
+    scheduler = get_rescore_scheduler()
+    if scheduler is not None:
+        scheduler.trigger()
+
+
+def rescoring_stats():
+    scheduler = get_rescore_scheduler()
+    return scheduler.stats() if scheduler is not None else None
+
+
+def filter_roster(queryset, params):
+    """Apply the roster list filters; raises ValueError for non-integer ages"""
+    position = params.get('position')
+    if position:
+        queryset = queryset.filter(position=position)
+    for param, lookup in (('age', 'age'), ('min_age', 'age__gte'), ('max_age', 'age__lte')):
+        if params.get(param):
+            queryset = queryset.filter(**{lookup: int(params[param])})
+    return queryset
+
+
+def parse_history_bound(raw: str, end: bool = False):
+    """Parse a history range bound; a bare date covers that whole day."""
+    try:
+        # Dates first: parse_datetime would also accept one, as midnight
+        day = parse_date(raw)
+        if day is not None:
+            moment = datetime.combine(day, day_time.max if end else day_time.min)
+        else:
+            moment = parse_datetime(raw)
+    except ValueError:
+        return None
+    if moment is None:
+        return None
+    if settings.USE_TZ and timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def parse_player_id(data):
+    """Optional ``player_id`` of a prediction request (None when absent or invalid)."""
+    try:
+        player_id = int(data.get('player_id'))
+    except (TypeError, ValueError):
+        return None
+    return player_id if player_id > 0 else None
+
+
+def format_prediction(prediction: dict, payload: dict) -> dict:
+    """Shape a model prediction into the API response schema."""
+    response = {
+        'injury_risk': prediction['risk_level'],
+        'risk_probability': round(prediction['risk_score'], 4),
+        'confidence': round(prediction['confidence'], 4),
+        'key_factors': prediction['key_factors'],
+        'recommendations': get_recommendations(prediction, payload),
+        'model_version': prediction['model_version'],
+    }
+    if 'base_value' in prediction:
+        response['base_value'] = prediction['base_value']
+    return response
+
+
 def get_recommendations(prediction: dict, data: dict) -> list:
     """Generate recommendations based on prediction and player data."""
     risk_level = prediction.get('risk_level')
@@ -83,26 +520,6 @@ def get_recommendations(prediction: dict, data: dict) -> list:
     return recommendations
 
 
-def build_player_payload(data: dict) -> dict:
-    """Map incoming request data to the model input schema."""
-    matches_played = max(1, int(data.get('matches_played', 1)))
-    minutes_played = float(data.get('minutes_played', 0))
-
-    payload = {
-        'age': int(data.get('age', 25)),
-        'position': data.get('position', 'midfielder'),
-        'matches_played': matches_played,
-        'total_minutes_played': minutes_played,
-        'fatigue_level': float(data.get('fatigue_level', 0.5)),
-        'training_load': float(data.get('training_load', 0.5)),
-        'recovery_time': float(data.get('recovery_time', 48)),
-        'fitness_score': float(data.get('fitness_score', 0.8)),
-        'previous_injuries_count': int(data.get('previous_injuries', 0)),
-        'weather_condition': data.get('weather_condition', 'normal')
-    }
-    return payload
-
-
 @api_view(['GET'])
 @ensure_csrf_cookie
 def csrf_token(request):
@@ -0,0 +1,53 @@
+import atexit
+import copy
+import logging
+import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+
+class QueueConsoleHandler(QueueHandler):
+    """Console handler that writes from a background thread.
+
+    emit() only resolves the message arguments and appends the record to
+    an unbounded queue, so request threads never wait on stderr. The
+    formatter configured for this handler, tracebacks included, is applied
+    by the writer thread. A forked worker starts its own writer thread.
+    """
+
+    def __init__(self, stream=None):
+        super().__init__(queue.SimpleQueue())
+        self.console = logging.StreamHandler(stream)
+        self._start_listener()
+        atexit.register(self.close)
+        os.register_at_fork(after_in_child=self._after_fork)
+
+    def _start_listener(self):
+        self.listener = QueueListener(self.queue, self.console)
+        self.listener.start()
+
+    def _after_fork(self):
+        self.queue = queue.SimpleQueue()
+        self._start_listener()
+
+    def prepare(self, record):
+        # QueueHandler.prepare() formats the whole record (and any traceback)
+        # in the calling thread. Only merge the arguments into the message,
+        # since they may be mutated after the call returns; the traceback
+        # object is kept as is and formatted when the record is written.
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        return record
+
+    def setFormatter(self, fmt):
+        # Format in the writer thread, not in emit()
+        self.console.setFormatter(fmt)
+
+    def close(self):
+        # Drain what is queued before the process exits
+        listener, self.listener = self.listener, None
+        if listener is not None and listener._thread is not None:
+            listener.stop()
+        super().close()
@@ -1,65 +1,216 @@
+import atexit
+import cProfile
+import hmac
 import logging
+import os
+import pstats
+import random
+import threading
+import time
+from pathlib import Path
+
 from django.contrib.auth import logout
+from django.core.exceptions import MiddlewareNotUsed
 from django.shortcuts import redirect
 from django.conf import settings
 
+from api.ml.metrics import REQUEST_SECONDS, STAGE_SECONDS, collect_timings
+
 logger = logging.getLogger(__name__)
 
 
 class AuthDebugMiddleware:
-    """Development middleware that logs auth-related /accounts/ requests.
+    """Enforces manual sign-in after a social signup and logs /accounts/ requests.
 
-    If a session has 'just_signed_up' the middleware enforces logout and
-    redirects the user to the SPA login to require manual signin.
+    A social signup sets the session flag 'just_signed_up' (api.signals);
+    the response of that request also sets the SIGNUP_COOKIE marker. The
+    next /accounts/ request carrying the marker clears the flag and, if
+    the user is logged in, logs them out and redirects to the SPA login.
+    Only those requests load the session here. Request details are logged
+    at DEBUG level when INJURY_AUTH_DEBUG is on.
     """
 
+    SIGNUP_COOKIE = 'just_signed_up'
+
     def __init__(self, get_response):
         self.get_response = get_response
+        self.debug = getattr(settings, 'INJURY_AUTH_DEBUG', settings.DEBUG)
 
     def __call__(self, request):
+        marked = False
+        if request.path.startswith('/accounts/'):
+            marked = self.SIGNUP_COOKIE in request.COOKIES
+            if marked:
+                response = self._enforce_signin(request)
+                if response is not None:
+                    response.delete_cookie(self.SIGNUP_COOKIE)
+                    return response
+            if self.debug and logger.isEnabledFor(logging.DEBUG):
+                self._log_request(request)
+
+        response = self.get_response(request)
+        if marked:
+            response.delete_cookie(self.SIGNUP_COOKIE)
+        self._mark_signup(request, response)
+        return response
+
+    def _enforce_signin(self, request):
         try:
-            if request.path.startswith('/accounts/'):
-                session_key = None
-                try:
-                    session_key = getattr(request.session, 'session_key', None)
-                except Exception:
-                    # session may not exist yet
-                    session_key = None
+            session = getattr(request, 'session', None)
+            if session is not None and session.pop('just_signed_up', False):
+                # the flag was set: if user is logged in, log them out
+                if getattr(request, 'user', None) and getattr(request.user, 'is_authenticated', False):
+                    logout(request)
+                    frontend = getattr(settings, 'FRONTEND_URL', 'http://localhost:5173')
+                    return redirect(f"{frontend}/login")
+        except Exception:
+            logger.exception('Error handling just_signed_up session flag')
+        return None
 
-                user_obj = getattr(request, 'user', None)
-                is_auth = False
-                try:
-                    is_auth = bool(getattr(user_obj, 'is_authenticated', False))
-                except Exception:
-                    is_auth = False
+    def _mark_signup(self, request, response):
+        # A modified session is already loaded, so checking it costs no query
+        try:
+            session = getattr(request, 'session', None)
+            if session is not None and session.modified and session.get('just_signed_up', False):
+                response.set_cookie(self.SIGNUP_COOKIE, '1', httponly=True, samesite='Lax',
+                                    secure=request.is_secure())
+        except Exception:
+            logger.exception('Error marking just_signed_up session')
 
-                # Enforce manual sign-in after a social signup
-                try:
-                    if getattr(request, 'session', None):
-                        flag = request.session.get('just_signed_up', False)
-                        if flag:
-                            # clear the flag and, if user is logged in, log them out
-                            try:
-                                request.session.pop('just_signed_up')
-                            except Exception:
-                                pass
-                            if getattr(request, 'user', None) and getattr(request.user, 'is_authenticated', False):
-                                logout(request)
-                                frontend = getattr(settings, 'FRONTEND_URL', 'http://localhost:5173')
-                                return redirect(f"{frontend}/login")
-                except Exception:
-                    logger.exception('Error handling just_signed_up session flag')
-
-                logger.debug(
-                    'AUTH FLOW: %s %s user_authenticated=%s session=%s cookies=%s',
-                    request.method,
-                    request.path,
-                    is_auth,
-                    session_key,
-                    dict(getattr(request, 'COOKIES', {})),
-                )
+    @staticmethod
+    def _log_request(request):
+        try:
+            # session_key comes from the cookie; it does not load the session
+            session_key = getattr(getattr(request, 'session', None), 'session_key', None)
+            user_obj = getattr(request, 'user', None)
+            logger.debug(
+                'AUTH FLOW: %s %s user_authenticated=%s session=%s cookies=%s',
+                request.method,
+                request.path,
+                bool(getattr(user_obj, 'is_authenticated', False)),
+                session_key,
+                dict(request.COOKIES),
+            )
         except Exception:
             # Never fail the request because of debug logging
             logger.exception('Error while logging auth flow')
 
-        return self.get_response(request)
+
+class ProfilingMiddleware:
+    """Opt-in cProfile sampling of API requests.
+
+    A PROFILE_SAMPLE_RATE fraction of the requests under PROFILE_PATHS is
+    profiled, as is any request whose X-Profile header matches
+    PROFILE_TOKEN. Profiles are summed and written as pstats files to
+    PROFILE_DIR every PROFILE_FLUSH_REQUESTS samples, keeping the newest
+    PROFILE_KEEP files (read them with ``python -m pstats <file>`` or
+    snakeviz). Profiled responses carry a Server-Timing header with the
+    prediction stage breakdown. When neither a rate nor a token is set
+    Django drops the middleware at startup, so it costs nothing.
+    """
+
+    HEADER = 'HTTP_X_PROFILE'
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'INJURY_PROFILE_SAMPLE_RATE', 0.0)
+        self.token = getattr(settings, 'INJURY_PROFILE_TOKEN', '')
+        if self.sample_rate <= 0 and not self.token:
+            raise MiddlewareNotUsed
+        self.paths = tuple(getattr(settings, 'INJURY_PROFILE_PATHS', ['/api/predict/']))
+        self.directory = Path(getattr(settings, 'INJURY_PROFILE_DIR', settings.BASE_DIR / 'profiles'))
+        self.flush_requests = max(1, getattr(settings, 'INJURY_PROFILE_FLUSH_REQUESTS', 100))
+        self.keep = max(1, getattr(settings, 'INJURY_PROFILE_KEEP', 20))
+        # cProfile can only trace one request at a time; overlapping samples are skipped
+        self._profiling = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = None
+        self._samples = 0
+        self._files = 0
+        atexit.register(self.flush)
+
+    def __call__(self, request):
+        if not self._should_profile(request) or not self._profiling.acquire(blocking=False):
+            return self.get_response(request)
+        try:
+            profiler = cProfile.Profile()
+            started = time.perf_counter()
+            with collect_timings() as timings:
+                profiler.enable()
+                try:
+                    response = self.get_response(request)
+                finally:
+                    profiler.disable()
+            total = time.perf_counter() - started
+        finally:
+            self._profiling.release()
+
+        try:
+            response['Server-Timing'] = self._server_timing(timings, total)
+            self._add(profiler)
+        except Exception:
+            # Never fail the request because of profiling
+            logger.exception('Error while recording request profile')
+        return response
+
+    def _should_profile(self, request) -> bool:
+        if self.token:
+            header = request.META.get(self.HEADER)
+            if header and hmac.compare_digest(header.encode(), self.token.encode()):
+                return True
+        return (self.sample_rate > 0 and request.path.startswith(self.paths)
+                and random.random() < self.sample_rate)
+
+    @staticmethod
+    def _server_timing(timings, total: float) -> str:
+        # Stages in the order they first finished; repeated stages are summed
+        durations = {}
+        for name, labels, seconds in timings:
+            labels = dict(labels)
+            if name == STAGE_SECONDS:
+                key = labels.get('stage', 'stage')
+            elif name == REQUEST_SECONDS:
+                key = 'view'
+            else:
+                continue
+            durations[key] = durations.get(key, 0.0) + seconds
+        durations['total'] = total
+        entries = [f"{key};dur={seconds * 1000:.3f}" for key, seconds in durations.items()]
+        return ', '.join(entries + ['profiled;desc="cProfile sample"'])
+
+    def _add(self, profiler):
+        with self._stats_lock:
+            if self._stats is None:
+                self._stats = pstats.Stats(profiler)
+            else:
+                self._stats.add(profiler)
+            self._samples += 1
+            if self._samples < self.flush_requests:
+                return
+        self.flush()
+
+    def flush(self):
+        """Write the profiles summed since the last flush to a new file"""
+        with self._stats_lock:
+            stats, samples = self._stats, self._samples
+            self._stats, self._samples = None, 0
+            self._files += 1
+            sequence = self._files
+        if stats is None:
+            return
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            path = self.directory / (f"profile-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+                                      f"-{sequence}-{samples}req.prof")
+            stats.dump_stats(path)
+            self._rotate()
+        except OSError:
+            logger.exception('Could not write request profile to %s', self.directory)
+
+    def _rotate(self):
+        files = sorted(self.directory.glob('profile-*.prof'), key=lambda path: (path.stat().st_mtime, path.name))
+        for path in files[:-self.keep]:
+            try:
+                path.unlink()
+            except OSError:
+                pass
@@ -3,7 +3,8 @@ Django settings for injury_prediction project.
 """
 
 from pathlib import Path
-from decouple import config
+from decouple import Csv, config
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -55,6 +56,7 @@ ACCOUNT_EMAIL_REQUIRED = True
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'injury_prediction.middleware.ProfilingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'injury_prediction.middleware.AuthDebugMiddleware',
@@ -138,13 +140,33 @@ STATIC_URL = 'static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
-# During local development enable debug logging so our auth middleware prints
-# messages to the console. This is intentionally minimal and only applies when
-# DEBUG=True.
-if DEBUG:
-    import logging
-
-    logging.basicConfig(level=logging.DEBUG)
+# `manage.py test` skips the timed api.benchmarks tests (tag 'benchmark');
+# run them with `manage.py test api --tag benchmark`
+TEST_RUNNER = 'injury_prediction.test_runner.InjuryTestRunner'
+
+# Auth-flow debug capture (AuthDebugMiddleware, the social account adapter and
+# signals) is on during local development. With INJURY_AUTH_DEBUG=False those
+# log calls are skipped before any of their arguments are built.
+INJURY_AUTH_DEBUG = config('INJURY_AUTH_DEBUG', default=DEBUG, cast=bool)
+
+# Console logging goes through a queue drained by a background thread, so
+# requests never block on stderr. LOG_LEVEL defaults to DEBUG while auth
+# debugging is on and to WARNING otherwise.
+LOG_LEVEL = config('LOG_LEVEL', default='DEBUG' if INJURY_AUTH_DEBUG else 'WARNING')
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'console': {'format': '%(levelname)s:%(name)s:%(message)s'},
+    },
+    'handlers': {
+        'console': {
+            'class': 'injury_prediction.log_handlers.QueueConsoleHandler',
+            'formatter': 'console',
+        },
+    },
+    'root': {'handlers': ['console'], 'level': LOG_LEVEL},
+}
 
 # CORS settings
 CORS_ALLOWED_ORIGINS = [
@@ -168,12 +190,52 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.SessionAuthentication',
-        'rest_framework.authentication.TokenAuthentication',
+        'api.authentication.CachedTokenAuthentication',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10
 }
 
+# Auth cache: token lookups (api.authentication.CachedTokenAuthentication),
+# the user loaded for session requests (CachedModelBackend) and session data
+# (api.sessions) are cached for INJURY_AUTH_CACHE_TTL seconds (0 = off).
+# Deleting a token or account, logging out and saving a user evict entries,
+# so the cache must be shared by every worker: it needs
+# INJURY_AUTH_CACHE_LOCATION (redis://... or a Memcached host:port) and is off
+# without one. A per-process cache would keep revoked credentials valid in
+# the other workers for up to the TTL.
+INJURY_AUTH_CACHE_LOCATION = config('INJURY_AUTH_CACHE_LOCATION', default='')
+INJURY_AUTH_CACHE_TTL = config('INJURY_AUTH_CACHE_TTL', default=60.0 if INJURY_AUTH_CACHE_LOCATION else 0.0,
+                               cast=float)
+if INJURY_AUTH_CACHE_TTL > 0 and not INJURY_AUTH_CACHE_LOCATION:
+    raise ImproperlyConfigured(
+        'INJURY_AUTH_CACHE_TTL > 0 needs a shared INJURY_AUTH_CACHE_LOCATION (Redis or Memcached); '
+        'a per-process cache would keep revoked tokens and sessions valid in other workers'
+    )
+INJURY_AUTH_CACHE_ALIAS = 'auth'
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    INJURY_AUTH_CACHE_ALIAS: {
+        'BACKEND': ('django.core.cache.backends.redis.RedisCache'
+                    if INJURY_AUTH_CACHE_LOCATION.startswith(('redis://', 'rediss://', 'unix://'))
+                    else 'django.core.cache.backends.memcached.PyMemcacheCache'),
+        'LOCATION': INJURY_AUTH_CACHE_LOCATION,
+    } if INJURY_AUTH_CACHE_LOCATION else {
+        'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+    },
+}
+if INJURY_AUTH_CACHE_TTL > 0:
+    SESSION_ENGINE = 'api.sessions'
+    SESSION_CACHE_ALIAS = INJURY_AUTH_CACHE_ALIAS
+# Sessions remember the backend that logged them in; keep ModelBackend
+# listed so sessions created before the cached backend still resolve.
+AUTHENTICATION_BACKENDS = [
+    'api.authentication.CachedModelBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+
 # Prefer using SocialApp configured in the Django admin (database) for
 # OAuth credentials. If you *do* want to configure the provider via
 # settings instead, add the APP config here and remove the SocialApp
@@ -215,4 +277,83 @@ SOCIALACCOUNT_LOGIN_REDIRECT_URL = '/accounts/social/success/'
 LOGOUT_REDIRECT_URL = 'http://localhost:5173/'
 
 # Frontend base url used when redirecting back after certain auth flows.
-FRONTEND_URL = config('FRONTEND_URL', default='http://localhost:5173')
\ No newline at end of file
+FRONTEND_URL = config('FRONTEND_URL', default='http://localhost:5173')
+
+# Injury model serving
+# Load the current model (the registry's CURRENT version, else the bundled
+# injury_model.pkl) and run a dummy prediction when a server process starts
+# (wsgi.py/asgi.py, including runserver); management commands never do.
+INJURY_MODEL_WARMUP = config('INJURY_MODEL_WARMUP', default=True, cast=bool)
+# Inference backend: 'sklearn' (RandomForestClassifier.predict_proba) or
+# 'compiled' (flat-array traversal in api/ml/compiled_forest.py).
+INJURY_MODEL_BACKEND = config('INJURY_MODEL_BACKEND', default='sklearn')
+# Cores used to fit the forest (-1 = all cores). Results do not depend on it.
+INJURY_MODEL_TRAIN_N_JOBS = config('INJURY_MODEL_TRAIN_N_JOBS', default=-1, cast=int)
+# Serving artifact: 'pickle' (injury_model.pkl) or 'mmap' (injury_model.forest/
+# node tables shared between workers through the page cache; implies the
+# compiled backend). Create it with `manage.py convert_model`.
+INJURY_MODEL_ARTIFACT = config('INJURY_MODEL_ARTIFACT', default='pickle')
+# Model registry: trained versions live in REGISTRY_DIR (default api/ml/models/)
+# and serving processes load the promoted one, falling back to injury_model.pkl.
+# AUTO_PROMOTE makes every training run current; workers poll the registry
+# every RELOAD_INTERVAL seconds and hot-swap a newly promoted version (0 = off).
+INJURY_MODEL_REGISTRY_DIR = config('INJURY_MODEL_REGISTRY_DIR', default='')
+INJURY_MODEL_AUTO_PROMOTE = config('INJURY_MODEL_AUTO_PROMOTE', default=True, cast=bool)
+INJURY_MODEL_RELOAD_INTERVAL = config('INJURY_MODEL_RELOAD_INTERVAL', default=5.0, cast=float)
+# Cache of predict_risk results keyed by payload + model version. SIZE=0
+# disables it; BACKEND 'django' stores entries in CACHES[ALIAS] instead of an
+# in-process LRU so all workers share them.
+INJURY_PREDICTION_CACHE_SIZE = config('INJURY_PREDICTION_CACHE_SIZE', default=1024, cast=int)
+INJURY_PREDICTION_CACHE_TTL = config('INJURY_PREDICTION_CACHE_TTL', default=300.0, cast=float)
+INJURY_PREDICTION_CACHE_BACKEND = config('INJURY_PREDICTION_CACHE_BACKEND', default='local')
+INJURY_PREDICTION_CACHE_ALIAS = config('INJURY_PREDICTION_CACHE_ALIAS', default='default')
+# Micro-batching: coalesce concurrent /api/predict/ requests arriving within
+# WINDOW_MS (or until MAX_SIZE are waiting) into one vectorized model call.
+INJURY_PREDICTION_BATCHING = config('INJURY_PREDICTION_BATCHING', default=False, cast=bool)
+INJURY_PREDICTION_BATCH_WINDOW_MS = config('INJURY_PREDICTION_BATCH_WINDOW_MS', default=2.0, cast=float)
+INJURY_PREDICTION_BATCH_MAX_SIZE = config('INJURY_PREDICTION_BATCH_MAX_SIZE', default=64, cast=int)
+INJURY_PREDICTION_BATCH_QUEUE = config('INJURY_PREDICTION_BATCH_QUEUE', default=1024, cast=int)
+INJURY_PREDICTION_BATCH_TIMEOUT = config('INJURY_PREDICTION_BATCH_TIMEOUT', default=5.0, cast=float)
+# Prediction history: every prediction is queued and stored in
+# api.PredictionRecord by a background thread with bulk inserts of up to
+# BATCH_SIZE rows, at least every FLUSH_INTERVAL seconds. Predictions beyond
+# QUEUE pending rows are dropped (injury_prediction_history_dropped_total)
+# rather than slowing requests down; /api/predict/batch/ first waits at most
+# MAX_WAIT_MS for room, so keep QUEUE above the largest squad you score.
+INJURY_HISTORY_ENABLED = config('INJURY_HISTORY_ENABLED', default=True, cast=bool)
+INJURY_HISTORY_BATCH_SIZE = config('INJURY_HISTORY_BATCH_SIZE', default=500, cast=int)
+INJURY_HISTORY_FLUSH_INTERVAL = config('INJURY_HISTORY_FLUSH_INTERVAL', default=1.0, cast=float)
+INJURY_HISTORY_QUEUE = config('INJURY_HISTORY_QUEUE', default=50000, cast=int)
+INJURY_HISTORY_MAX_WAIT_MS = config('INJURY_HISTORY_MAX_WAIT_MS', default=5.0, cast=float)
+# Upper bound on players × grid points for /api/predict/sweep/
+INJURY_SWEEP_MAX_CELLS = config('INJURY_SWEEP_MAX_CELLS', default=250000, cast=int)
+# Roster import/export (/api/players/import/ and export/): rows parsed and
+# inserted per transaction, rejected rows reported, rows read per export query
+INJURY_ROSTER_IMPORT_CHUNK_ROWS = config('INJURY_ROSTER_IMPORT_CHUNK_ROWS', default=50000, cast=int)
+INJURY_ROSTER_IMPORT_MAX_ERRORS = config('INJURY_ROSTER_IMPORT_MAX_ERRORS', default=100, cast=int)
+INJURY_ROSTER_EXPORT_CHUNK_ROWS = config('INJURY_ROSTER_EXPORT_CHUNK_ROWS', default=5000, cast=int)
+# Squad re-scoring: players whose inputs changed since their last score are
+# re-scored in CHUNK_SIZE batches. INTERVAL > 0 runs it every INTERVAL seconds
+# (and after roster edits) in the one server worker per host that holds
+# LOCK_FILE (default: injury-rescore.lock in the temp dir); management
+# commands never start it. Otherwise, or with several hosts, schedule
+# `manage.py rescore_players` (cron, or --every) as a single process.
+INJURY_RESCORE_INTERVAL = config('INJURY_RESCORE_INTERVAL', default=0.0, cast=float)
+INJURY_RESCORE_CHUNK_SIZE = config('INJURY_RESCORE_CHUNK_SIZE', default=5000, cast=int)
+INJURY_RESCORE_LOCK_FILE = config('INJURY_RESCORE_LOCK_FILE', default='')
+# Prediction metrics on /api/metrics/ are per process unless METRICS_DIR is
+# set: then every worker writes its values there every FLUSH_INTERVAL seconds
+# and a scrape of any worker sums them all. Files of exited workers are folded
+# into metrics-archive.json (counters and histograms; their gauges are dropped).
+INJURY_METRICS_DIR = config('INJURY_METRICS_DIR', default='')
+INJURY_METRICS_FLUSH_INTERVAL = config('INJURY_METRICS_FLUSH_INTERVAL', default=5.0, cast=float)
+# Request profiling (injury_prediction.middleware.ProfilingMiddleware): off
+# unless SAMPLE_RATE > 0 (fraction of requests under PATHS) or TOKEN is set
+# (requests with a matching X-Profile header). Summed cProfile stats are
+# written to DIR every FLUSH_REQUESTS samples; the newest KEEP files are kept.
+INJURY_PROFILE_SAMPLE_RATE = config('INJURY_PROFILE_SAMPLE_RATE', default=0.0, cast=float)
+INJURY_PROFILE_TOKEN = config('INJURY_PROFILE_TOKEN', default='')
+INJURY_PROFILE_PATHS = config('INJURY_PROFILE_PATHS', default='/api/predict/', cast=Csv())
+INJURY_PROFILE_DIR = config('INJURY_PROFILE_DIR', default=str(BASE_DIR / 'profiles'))
+INJURY_PROFILE_FLUSH_REQUESTS = config('INJURY_PROFILE_FLUSH_REQUESTS', default=100, cast=int)
+INJURY_PROFILE_KEEP = config('INJURY_PROFILE_KEEP', default=20, cast=int)
@@ -0,0 +1,13 @@
+from django.test.runner import DiscoverRunner
+
+
+class InjuryTestRunner(DiscoverRunner):
+    """
+    Test runner that leaves out the timed benchmark tests (tag
+    ``benchmark``) unless they are asked for with ``--tag benchmark``
+    """
+
+    def __init__(self, *args, tags=None, exclude_tags=None, **kwargs):
+        if 'benchmark' not in (tags or []):
+            exclude_tags = list(exclude_tags or []) + ['benchmark']
+        super().__init__(*args, tags=tags, exclude_tags=exclude_tags, **kwargs)
@@ -15,3 +15,10 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'injury_prediction.settings')
 
 application = get_wsgi_application()
 
+# Server processes only: management commands skip the model load and
+# background re-scoring
+from api.apps import start_rescoring, warm_up_model  # noqa: E402
+
+warm_up_model()
+start_rescoring()
+
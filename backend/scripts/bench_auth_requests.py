@@ -0,0 +1,109 @@
+"""Throughput of /accounts/ auth-flow requests through the full middleware stack.
+
+Sends requests with the Django test client (anonymous and signed in, both
+carrying a session cookie) and reports requests per second, so the cost of
+AuthDebugMiddleware and auth debug logging can be compared between settings:
+
+    DEBUG=True python backend/scripts/bench_auth_requests.py 2>/dev/null
+    DEBUG=False python backend/scripts/bench_auth_requests.py
+    DEBUG=True INJURY_AUTH_DEBUG=False python backend/scripts/bench_auth_requests.py 2>/dev/null
+
+Log output goes to stderr; redirect it so terminal speed is not measured.
+
+Usage: python backend/scripts/bench_auth_requests.py [--requests 2000] [--repeat 3]
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'injury_prediction.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.contrib.sessions.middleware import SessionMiddleware  # noqa: E402
+from django.http import HttpResponse  # noqa: E402
+from django.test import Client, RequestFactory  # noqa: E402
+
+from injury_prediction.middleware import AuthDebugMiddleware  # noqa: E402
+
+BENCH_EMAIL = 'bench-auth@example.com'
+
+
+def throughput(client, path, count, repeat):
+    """Best requests/second over ``repeat`` runs of ``count`` GETs"""
+    best = 0.0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(count):
+            client.get(path)
+        best = max(best, count / (time.perf_counter() - started))
+    return best
+
+
+def middleware_throughput(session_key, count, repeat):
+    """Requests/second through SessionMiddleware + AuthDebugMiddleware around an empty view"""
+    chain = SessionMiddleware(AuthDebugMiddleware(lambda request: HttpResponse()))
+    factory = RequestFactory(HTTP_HOST='localhost')
+    factory.cookies[settings.SESSION_COOKIE_NAME] = session_key
+    best = 0.0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(count):
+            chain(factory.get('/accounts/login/'))
+        best = max(best, count / (time.perf_counter() - started))
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    user, created = get_user_model().objects.get_or_create(
+        username='bench-auth', defaults={'email': BENCH_EMAIL}
+    )
+    if created:
+        user.set_password('bench-auth-password')
+        user.save()
+
+    anonymous = Client(HTTP_HOST='localhost')
+    # A stored session, like a browser midway through the social login flow
+    anonymous.get('/accounts/login/')
+    session_key = _new_session_key()
+    anonymous.cookies[settings.SESSION_COOKIE_NAME] = session_key
+    signed_in = Client(HTTP_HOST='localhost')
+    signed_in.force_login(user)
+
+    print(f"DEBUG={settings.DEBUG} INJURY_AUTH_DEBUG={getattr(settings, 'INJURY_AUTH_DEBUG', settings.DEBUG)} "
+          f"root log level={logging.getLevelName(logging.getLogger().getEffectiveLevel())}")
+    print(f"{'request':<45} {'req/s':>10}")
+    cases = [
+        ('anonymous GET /accounts/social/success/', anonymous, '/accounts/social/success/'),
+        ('anonymous GET /accounts/login/', anonymous, '/accounts/login/'),
+        ('signed-in GET /accounts/social/success/', signed_in, '/accounts/social/success/'),
+    ]
+    for label, client, path in cases:
+        print(f"{label:<45} {throughput(client, path, args.requests, args.repeat):>10.0f}")
+    print(f"{'middleware only, empty view':<45} "
+          f"{middleware_throughput(session_key, args.requests * 5, args.repeat):>10.0f}")
+
+
+def _new_session_key():
+    from importlib import import_module
+
+    store = import_module(settings.SESSION_ENGINE).SessionStore()
+    store['bench'] = True
+    store.save()
+    return store.session_key
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""Page latency of the roster listing: keyset cursor vs OFFSET page numbers.
+
+Times the query /api/players/ issues for a page at increasing depths, using
+the same keyset predicate DRF's CursorPagination builds, against the
+OFFSET/LIMIT query PageNumberPagination would run. Seed the fixture first:
+
+    python backend/manage.py seed_players --count 1000000
+
+Usage: python backend/scripts/bench_roster_pages.py [--page-size 50] [--repeat 5]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'injury_prediction.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.test import Client  # noqa: E402
+
+from api.models import PlayerData  # noqa: E402
+from api.views import ROSTER_FIELDS  # noqa: E402
+
+
+def best_of(repeat, fn):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--page-size', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    total = PlayerData.objects.count()
+    if total < args.page_size:
+        print('Not enough players; run manage.py seed_players first.')
+        sys.exit(1)
+    print(f"{total} players, page size {args.page_size}")
+
+    ordered = PlayerData.objects.order_by('-created_at', '-id')
+    depths = [1]
+    while depths[-1] * 10 * args.page_size < total:
+        depths.append(depths[-1] * 10)
+    depths.append(total // args.page_size)
+
+    print(f"{'page':>10} {'offset ms':>10} {'keyset ms':>10}")
+    for page in depths:
+        offset = (page - 1) * args.page_size
+
+        def offset_query():
+            list(ordered.values(*ROSTER_FIELDS)[offset:offset + args.page_size])
+
+        # Boundary row of the previous page, i.e. what the cursor encodes
+        boundary = ordered.values_list('created_at', flat=True)[max(offset - 1, 0)]
+
+        def keyset_query():
+            queryset = ordered if offset == 0 else ordered.filter(created_at__lt=boundary)
+            list(queryset.values(*ROSTER_FIELDS)[:args.page_size + 1])
+
+        print(f"{page:>10} {best_of(args.repeat, offset_query):>10.2f} "
+              f"{best_of(args.repeat, keyset_query):>10.2f}")
+
+    # End to end through the API: follow cursors for the first pages
+    client = Client(HTTP_HOST='localhost')
+    url = f'/api/players/?limit={args.page_size}'
+    timings = []
+    for _ in range(20):
+        started = time.perf_counter()
+        response = client.get(url).json()
+        timings.append((time.perf_counter() - started) * 1000)
+        url = response['next']
+        if not url:
+            break
+    print(f"API cursor pages: first {timings[0]:.2f} ms, median {sorted(timings)[len(timings) // 2]:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
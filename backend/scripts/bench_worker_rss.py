@@ -0,0 +1,95 @@
+"""Compare per-worker memory of the pickle and memory-mapped model artifacts.
+
+Starts N fresh worker processes per mode. Each one loads the model the way a
+serving worker does (InjuryPredictor.warm_up), runs a few predictions and
+reports its RSS and PSS (proportional set size: shared pages are split
+between the processes mapping them). All workers stay alive until every one
+has reported, so shared pages are really shared during the measurement.
+
+Run `python manage.py convert_model` first to create the forest artifact of
+the current model version.
+
+Usage: python backend/scripts/bench_worker_rss.py [--workers 16]
+"""
+import argparse
+import multiprocessing as mp
+import os
+import sys
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(BACKEND_DIR)
+
+
+def read_memory_kib():
+    """RSS and PSS of the current process in KiB (Linux /proc)"""
+    values = {}
+    with open('/proc/self/smaps_rollup') as fh:
+        for line in fh:
+            parts = line.split()
+            if parts[0] in ('Rss:', 'Pss:'):
+                values[parts[0][:-1].lower()] = int(parts[1])
+    return values
+
+
+def worker(artifact, ready, release, results):
+    os.environ['INJURY_MODEL_ARTIFACT'] = artifact
+    os.environ.setdefault('INJURY_MODEL_BACKEND', 'compiled')
+    from api.ml.injury_predictor import InjuryPredictor, WARMUP_PLAYER
+
+    predictor = InjuryPredictor()
+    predictor.warm_up()
+    for _ in range(100):
+        predictor.predict_risk(dict(WARMUP_PLAYER))
+
+    memory = read_memory_kib()
+    memory['sklearn_imported'] = 'sklearn' in sys.modules
+    results.put(memory)
+    ready.release()
+    release.wait()
+
+
+def measure(artifact, n_workers):
+    ctx = mp.get_context('spawn')
+    ready = ctx.Semaphore(0)
+    release = ctx.Event()
+    results = ctx.Queue()
+    processes = [ctx.Process(target=worker, args=(artifact, ready, release, results))
+                 for _ in range(n_workers)]
+    for process in processes:
+        process.start()
+    for _ in processes:
+        ready.acquire()
+    # Read PSS while all workers are alive (it depends on who shares pages)
+    reports = [results.get() for _ in processes]
+    release.set()
+    for process in processes:
+        process.join()
+    return reports
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=16)
+    args = parser.parse_args()
+
+    from api.ml.compiled_forest import CompiledForest
+    from api.ml.injury_predictor import InjuryPredictor
+
+    artifact_path = InjuryPredictor().current_paths()[1]
+    if CompiledForest.current_dir(artifact_path) is None:
+        print(f"No forest artifact at '{artifact_path}'; run `python manage.py convert_model` first")
+        sys.exit(1)
+
+    print(f"{'artifact':<8} {'workers':>7} {'RSS/worker MiB':>15} {'PSS/worker MiB':>15} "
+          f"{'total PSS MiB':>14} sklearn")
+    for artifact in ('pickle', 'mmap'):
+        reports = measure(artifact, args.workers)
+        rss = sum(r['rss'] for r in reports) / len(reports) / 1024
+        pss = sum(r['pss'] for r in reports) / len(reports) / 1024
+        sklearn = any(r['sklearn_imported'] for r in reports)
+        print(f"{artifact:<8} {len(reports):>7} {rss:>15.1f} {pss:>15.1f} "
+              f"{pss * len(reports):>14.1f} {'yes' if sklearn else 'no'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""Validate the compiled forest backend against sklearn's predict_proba.
+
+Loads the current model (the registry's CURRENT version, else the bundled
+injury_model.pkl), scores synthetic training rows plus randomized
+frontend payloads with both backends, reports the largest absolute
+difference and single-row latency, and exits non-zero if parity fails.
+
+Usage: python backend/scripts/check_compiled_forest.py [--rows 5000] [--tolerance 1e-9]
+"""
+import argparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import joblib  # noqa: E402
+import numpy as np  # noqa: E402
+
+from api.ml.compiled_forest import CompiledForest  # noqa: E402
+from api.ml.injury_predictor import injury_predictor  # noqa: E402
+from stress_predict import random_player  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--tolerance', type=float, default=1e-9)
+    args = parser.parse_args()
+
+    forest = joblib.load(injury_predictor.current_paths()[0])
+    compiled = CompiledForest.from_sklearn(forest)
+    print('Compiled forest:', compiled.summary())
+
+    # Training-distribution rows plus frontend payloads mapped to features
+    X_train, _ = injury_predictor.generate_training_data(args.rows)
+    rng = random.Random(7)
+    players = [random_player(rng) for _ in range(args.rows)]
+    X_players, _ = injury_predictor._prepare_features_batch(players)
+
+    worst = 0.0
+    for name, X in (('training rows', X_train.to_numpy()), ('frontend payloads', X_players)):
+        diff = np.abs(forest.predict_proba(X)[:, 1] - compiled.predict_proba(X)).max()
+        single = max(
+            abs(forest.predict_proba(X[i:i + 1])[0, 1] - compiled.predict_proba(X[i])[0])
+            for i in range(min(200, len(X)))
+        )
+        worst = max(worst, diff, single)
+        print(f"{name}: max |diff| batch={diff:.2e} single-row={single:.2e}")
+
+    row = X_players[:1]
+    sklearn_us = timeit.timeit(lambda: forest.predict_proba(row), number=200) / 200 * 1e6
+    compiled_us = timeit.timeit(lambda: compiled.predict_proba(row), number=5000) / 5000 * 1e6
+    print(f"single-row latency: sklearn={sklearn_us:.1f}us compiled={compiled_us:.1f}us")
+
+    if worst > args.tolerance:
+        print(f"❌ parity check failed (tolerance {args.tolerance})")
+        sys.exit(1)
+    print("✅ compiled backend matches sklearn")
+
+
+if __name__ == '__main__':
+    main()
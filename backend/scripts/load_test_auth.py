@@ -0,0 +1,124 @@
+"""Dashboard-polling load test for token and session authentication.
+
+Signed-in clients (API token or session cookie) poll /api/health/ and
+/auth/user/ from a thread pool, first with the auth cache off
+(INJURY_AUTH_CACHE_TTL=0: every request looks up the token, session and
+user in the database) and then on. Reports requests per second and database
+queries per request; with a warm cache polling needs no queries at all.
+Without INJURY_AUTH_CACHE_LOCATION the "on" runs use a local-memory cache,
+which is fine for this single process (the server refuses it).
+
+Usage: python backend/scripts/load_test_auth.py [--requests 2000] [--threads 8]
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'injury_prediction.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.core.cache import caches  # noqa: E402
+from django.db import close_old_connections, connection  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.test.utils import override_settings  # noqa: E402
+from rest_framework.authtoken.models import Token  # noqa: E402
+
+POLLED_PATHS = ['/api/health/', '/auth/user/']
+
+
+def make_clients(kind, user, token, count):
+    clients = []
+    for _ in range(count):
+        if kind == 'token':
+            client = Client(HTTP_HOST='localhost', HTTP_AUTHORIZATION=f'Token {token.key}')
+        else:
+            client = Client(HTTP_HOST='localhost')
+            client.force_login(user)
+        clients.append(client)
+    return clients
+
+
+def poll(client, requests):
+    """Send ``requests`` polling GETs; returns (queries, failures)"""
+    queries = 0
+    failures = 0
+
+    def count(execute, sql, params, many, context):
+        nonlocal queries
+        queries += 1
+        return execute(sql, params, many, context)
+
+    try:
+        with connection.execute_wrapper(count):
+            for index in range(requests):
+                response = client.get(POLLED_PATHS[index % len(POLLED_PATHS)])
+                failures += response.status_code != 200
+    finally:
+        close_old_connections()
+    return queries, failures
+
+
+def run(kind, user, token, args):
+    clients = make_clients(kind, user, token, args.threads)
+    per_client = args.requests // args.threads
+    # Warm up: the first request of each client fills the cache
+    for client in clients:
+        poll(client, len(POLLED_PATHS))
+    started = time.perf_counter()
+    with ThreadPoolExecutor(args.threads) as pool:
+        results = list(pool.map(lambda client: poll(client, per_client), clients))
+    seconds = time.perf_counter() - started
+    total = per_client * len(clients)
+    queries = sum(queries for queries, _ in results)
+    failures = sum(failures for _, failures in results)
+    return total / seconds, queries / total, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--threads', type=int, default=8)
+    args = parser.parse_args()
+
+    user, created = get_user_model().objects.get_or_create(
+        username='load-test-auth', defaults={'email': 'load-test-auth@example.com'}
+    )
+    if created:
+        user.set_password('load-test-auth-password')
+        user.save()
+    token, _ = Token.objects.get_or_create(user=user)
+
+    print(f"{args.requests} polls of {', '.join(POLLED_PATHS)} from {args.threads} threads")
+    print(f"{'auth':<8} {'cache':<6} {'req/s':>8} {'queries/req':>12} {'failed':>7}")
+    for kind in ('token', 'session'):
+        for ttl in (0, settings.INJURY_AUTH_CACHE_TTL or 60.0):
+            with override_settings(INJURY_AUTH_CACHE_TTL=ttl, **cache_settings(ttl)):
+                caches[settings.INJURY_AUTH_CACHE_ALIAS].clear()
+                rate, queries, failures = run(kind, user, token, args)
+            print(f"{kind:<8} {'on' if ttl else 'off':<6} {rate:>8.0f} {queries:>12.2f} {failures:>7}")
+
+
+def cache_settings(ttl):
+    """Settings enabling the auth cache in this process for a run with ``ttl``"""
+    if not ttl:
+        return {}
+    alias = settings.INJURY_AUTH_CACHE_ALIAS
+    overrides = {'SESSION_ENGINE': 'api.sessions', 'SESSION_CACHE_ALIAS': alias}
+    if not settings.INJURY_AUTH_CACHE_LOCATION:
+        overrides['CACHES'] = dict(settings.CACHES, **{alias: {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'load-test-auth',
+        }})
+    return overrides
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""Concurrency stress check for the shared InjuryPredictor instance.
+
+Scores a set of randomized players sequentially, then again from a thread
+pool hammering the global ``injury_predictor``, and verifies every
+concurrent result is identical to its sequential counterpart.
+
+Usage: python backend/scripts/stress_predict.py [--players 500] [--threads 16] [--rounds 5]
+"""
+import argparse
+import os
+import random
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from api.ml.injury_predictor import injury_predictor  # noqa: E402
+
+POSITIONS = ['goalkeeper', 'defender', 'midfielder', 'forward']
+WEATHER = ['normal', 'rain', 'wet', 'hot', 'extreme heat', 'sunny']
+
+
+def random_player(rng):
+    matches = rng.randint(1, 40)
+    return {
+        'age': rng.randint(17, 36),
+        'position': rng.choice(POSITIONS),
+        'matches_played': matches,
+        'total_minutes_played': rng.uniform(0, 90) * matches,
+        'fatigue_level': rng.random(),
+        'training_load': rng.random(),
+        'recovery_time': rng.choice([6, 12, 24, 36, 48, 72, 96]),
+        'fitness_score': rng.random(),
+        'previous_injuries_count': rng.randint(0, 6),
+        'weather_condition': rng.choice(WEATHER),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--players', type=int, default=500)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    players = [random_player(rng) for _ in range(args.players)]
+    # use_cache=False: cached results would keep the threads out of inference
+    expected = [injury_predictor.predict_risk(p, use_cache=False) for p in players]
+
+    # Interleave players so neighbouring requests differ (e.g. rain vs. dry)
+    jobs = list(range(len(players))) * args.rounds
+    rng.shuffle(jobs)
+
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        results = list(pool.map(lambda i: (i, injury_predictor.predict_risk(players[i], use_cache=False)), jobs))
+
+    mismatches = [i for i, result in results if result != expected[i]]
+    print(f"{len(results)} concurrent predictions on {args.threads} threads, "
+          f"{len(mismatches)} mismatches")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()